@@ -0,0 +1,110 @@
+"""
+Benchmark de arranque: tiempo de importación de Control_Carrito_Interfaz
+(python -X importtime) y tiempo desde que se lanza el proceso hasta el
+primer pintado completo del menú, sin pantalla (QT_QPA_PLATFORM=offscreen).
+Cada medición corre en un proceso nuevo y se toma la mediana.
+
+Falla (código de salida 1) si alguna mediana supera la base guardada en
+benchmarks/base_arranque.json más la tolerancia. Sin base solo se aplican
+techos absolutos holgados, que atrapan regresiones groseras pero no el
+ruido entre corridas: para un umbral fino, guardar la base con --guardar.
+Uso: python benchmarks/bench_arranque.py [--repeticiones N] [--tolerancia 0.25] [--guardar]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE = os.path.join(RAIZ, "benchmarks", "base_arranque.json")
+# Techos sin base guardada (ms): varias veces lo medido (importación 160-250 ms,
+# primer pintado 200-300 ms), para que el ruido de la máquina no los dispare
+LIMITES = {"importacion_ms": 750.0, "primer_pintado_ms": 1500.0}
+
+# Corre en el proceso hijo; T_LANZADO es el time.time() del padre antes de lanzarlo
+_PRIMER_PINTADO = """
+import os, sys, time
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+sys.path.insert(0, {raiz!r})
+import Control_Carrito_Interfaz as interfaz
+from PySide6 import QtWidgets, QtCore
+app = QtWidgets.QApplication([])
+app.setStyleSheet(interfaz.DASHBOARD_STYLE)
+window = interfaz.MenuWindow(interfaz.load_settings())
+
+def pintado():
+    # Por stderr: en stdout la bitácora escribe desde su hilo y puede pisar la línea
+    sys.stderr.write("primer_pintado_ms=%r\\n" % ((time.time() - float(os.environ["T_LANZADO"])) * 1000))
+    app.quit()
+
+window.show()
+# Los eventos de pintado pendientes se atienden antes que este timer
+QtCore.QTimer.singleShot(0, pintado)
+app.exec()
+window.close()
+"""
+
+def medir_importacion():
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import Control_Carrito_Interfaz"],
+                            cwd=RAIZ, capture_output=True, text=True, check=True).stderr
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        modulos.append((int(propio), int(acumulado), nombre.strip()))
+    total = next(acumulado for _, acumulado, nombre in reversed(modulos) if nombre == "Control_Carrito_Interfaz")
+    return total / 1000, modulos
+
+def medir_primer_pintado():
+    entorno = dict(os.environ, T_LANZADO=repr(time.time()))
+    salida = subprocess.run([sys.executable, "-c", _PRIMER_PINTADO.format(raiz=RAIZ)],
+                            cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True).stderr
+    return next(float(linea.partition("=")[2]) for linea in salida.splitlines()
+                if linea.startswith("primer_pintado_ms="))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque con umbral de regresión.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="fracción permitida sobre la base")
+    parser.add_argument("--guardar", action="store_true", help="guardar lo medido como nueva base")
+    args = parser.parse_args()
+
+    importaciones, pintados, modulos = [], [], []
+    for _ in range(args.repeticiones):
+        total, modulos = medir_importacion()
+        importaciones.append(total)
+        pintados.append(medir_primer_pintado())
+    resultado = {
+        "importacion_ms": statistics.median(importaciones),
+        "primer_pintado_ms": statistics.median(pintados),
+    }
+
+    print("Módulos más lentos (propio, última corrida):")
+    for propio, acumulado, nombre in sorted(modulos, reverse=True)[:8]:
+        print(f"  {propio / 1000:>7.1f} ms  {nombre}")
+
+    if os.path.exists(BASE):
+        with open(BASE) as f:
+            base = json.load(f)
+        limites = {clave: valor * (1 + args.tolerancia) for clave, valor in base.items()}
+    else:
+        limites = LIMITES
+    regresion = False
+    for clave, valor in resultado.items():
+        excedido = valor > limites[clave]
+        regresion = regresion or excedido
+        print(f"{clave:<18} {valor:>8.1f} ms  (límite {limites[clave]:.1f} ms){'  REGRESIÓN' if excedido else ''}")
+
+    if args.guardar:
+        with open(BASE, "w") as f:
+            json.dump(resultado, f, indent=4)
+        print(f"Base guardada en {BASE}")
+    elif regresion:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
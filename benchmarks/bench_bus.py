@@ -0,0 +1,55 @@
+"""
+Benchmark del bus de telemetría en memoria compartida: costo de publish()
+en el escritor, muestras/s que obtiene un lector en otro proceso mientras
+el escritor publica sin pausa, y muestras perdidas por ese lector.
+Uso: python benchmarks/bench_bus.py [muestras]
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bus import TelemetryBus, TelemetryBusReader
+
+NOMBRE = f"bench_bus_{os.getpid()}"
+
+def lector(listo, resultado):
+    with TelemetryBusReader(NOMBRE) as reader:
+        listo.set()
+        leidas = 0
+        inicio = time.perf_counter()
+        while True:
+            muestras = reader.leer()
+            leidas += len(muestras)
+            if muestras and muestras[-1][3] == "F":
+                break
+        resultado.put((leidas, reader.perdidas, time.perf_counter() - inicio))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    bus = TelemetryBus(NOMBRE)
+    try:
+        inicio = time.perf_counter()
+        for i in range(n):
+            bus.publish(i % 400, i % 6000, "3")
+        print(f"{'publish (sin lectores)':<26} {(time.perf_counter() - inicio) / n * 1e6:>8.2f} µs/muestra")
+
+        listo = multiprocessing.Event()
+        resultado = multiprocessing.Queue()
+        proceso = multiprocessing.Process(target=lector, args=(listo, resultado))
+        proceso.start()
+        listo.wait()
+        for i in range(n):
+            bus.publish(i % 400, i % 6000, "3")
+        bus.publish(0, 0, "F")
+        leidas, perdidas, segundos = resultado.get()
+        proceso.join()
+        print(f"{'lector en otro proceso':<26} {leidas / segundos:>12,.0f} muestras/s")
+        print(f"{'perdidas por el lector':<26} {perdidas:>12,}")
+    finally:
+        bus.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark del enlace completo contra el carrito virtual (pty): muestras/s
+que llegan a on_muestra a través de AsyncSerialTransport, en texto y en
+binario, con el carrito transmitiendo a saturación del baud rate simulado.
+Uso: python benchmarks/bench_enlace.py [baud] [segundos]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carro_virtual import VirtualCar, servir_pty
+from transporte import AsyncSerialTransport
+
+def medir(baud, segundos, binario):
+    car = VirtualCar(rate=0, baud=baud, binario=binario)
+    detener = threading.Event()
+    abierto = threading.Event()
+    ruta = []
+
+    def al_abrir(r):
+        ruta.append(r)
+        abierto.set()
+
+    hilo = threading.Thread(target=servir_pty, args=(car, detener, al_abrir), daemon=True)
+    hilo.start()
+    abierto.wait(2)
+
+    recibidas = [0]
+    def contar(vel, rpm):
+        recibidas[0] += 1
+
+    transporte = AsyncSerialTransport(ruta[0], baud, on_muestra=contar)
+    transporte.start()
+    time.sleep(0.5)  # Conexión y primeras tramas
+    inicio, base = time.perf_counter(), recibidas[0]
+    time.sleep(segundos)
+    tasa = (recibidas[0] - base) / (time.perf_counter() - inicio)
+    transporte.stop()
+    detener.set()
+    hilo.join(1)
+    return tasa, car.bytes_enviados / max(car.tramas_enviadas, 1)
+
+def main():
+    baud = int(sys.argv[1]) if len(sys.argv) > 1 else 9600
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(f"Enlace simulado a {baud} baud ({baud // 10} bytes/s)")
+    for binario in (False, True):
+        tasa, bytes_trama = medir(baud, segundos, binario)
+        nombre = "binario" if binario else "texto"
+        print(f"{nombre:<8} {tasa:>10,.0f} muestras/s  ({bytes_trama:.1f} bytes/trama)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark de TestWindow.eventFilter: eventos/s que atraviesan el filtro de
+la aplicación para eventos que no son de teclado (la gran mayoría), para
+pulsaciones en modo simulado y para pulsación+liberación en modo real con
+un puerto falso en memoria. Corre sin pantalla con QT_QPA_PLATFORM=offscreen.
+Uso: python benchmarks/bench_eventos.py [eventos]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6 import QtWidgets, QtCore, QtGui
+
+from configuracion import DEFAULT_SETTINGS
+from tablero import TestWindow
+
+class PuertoFalso:
+    # Lo mínimo que usa SerialWorker: nunca llegan datos y se descartan las escrituras
+    in_waiting = 0
+
+    def read(self, n=1):
+        time.sleep(0.01)
+        return b""
+
+    def write(self, data):
+        return len(data)
+
+    def close(self):
+        pass
+
+def tecla(tipo, texto):
+    return QtGui.QKeyEvent(tipo, QtCore.Qt.Key_unknown, QtCore.Qt.NoModifier, texto)
+
+def medir(ventana, eventos, n):
+    filtro = ventana.eventFilter
+    inicio = time.perf_counter()
+    for i in range(n):
+        filtro(ventana, eventos[i % len(eventos)])
+    return n / (time.perf_counter() - inicio)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    settings = dict(DEFAULT_SETTINGS, trip_export=False)
+    otros = [QtCore.QEvent(QtCore.QEvent.MouseMove), QtCore.QEvent(QtCore.QEvent.Paint),
+             QtCore.QEvent(QtCore.QEvent.Timer), QtCore.QEvent(QtCore.QEvent.UpdateRequest)]
+
+    simulado = TestWindow(settings)
+    print(f"{'sin teclado':<22} {medir(simulado, otros, n):>12,.0f} eventos/s")
+    teclas = [tecla(QtCore.QEvent.KeyPress, t) for t in "ar3bxz"]
+    print(f"{'teclas (simulado)':<22} {medir(simulado, teclas, n):>12,.0f} eventos/s")
+    simulado.close()
+
+    real = TestWindow(settings, serialConnection=PuertoFalso())
+    teclas = [tecla(tipo, t) for t in "aid" for tipo in (QtCore.QEvent.KeyPress, QtCore.QEvent.KeyRelease)]
+    print(f"{'teclas (real)':<22} {medir(real, teclas, n):>12,.0f} eventos/s")
+    real.close()
+
+if __name__ == "__main__":
+    main()
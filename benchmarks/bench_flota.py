@@ -0,0 +1,59 @@
+"""
+Benchmark de la flota: N carritos virtuales (pty) conectados a la vez con
+flota.Fleet sobre un único SerialLoop. Informa muestras/s totales y por
+carrito, y cuántos hilos usa el proceso, para comprobar que escala a 16+
+carritos sin un loop ni un hilo lector por carrito.
+Uso: python benchmarks/bench_flota.py [carritos] [segundos] [baud]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carro_virtual import VirtualCar, servir_pty
+from flota import Fleet
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    baud = int(sys.argv[3]) if len(sys.argv) > 3 else 9600
+
+    detener = threading.Event()
+    rutas = []
+    abiertos = threading.Semaphore(0)
+    servidores = []
+    for _ in range(n):
+        car = VirtualCar(rate=0, baud=baud, binario=True)
+        hilo = threading.Thread(target=servir_pty, args=(car, detener, lambda r: (rutas.append(r), abiertos.release())),
+                                daemon=True)
+        hilo.start()
+        servidores.append(hilo)
+    for _ in range(n):
+        abiertos.acquire(timeout=2)
+
+    recibidas = [0] * n
+    def contar(i, vel, rpm):
+        recibidas[i] += 1
+
+    hilos_antes = threading.active_count()
+    fleet = Fleet(rutas, baud, on_muestra=contar)
+    fleet.start()
+    time.sleep(0.5)  # Conexiones y primeras tramas
+    hilos_flota = threading.active_count() - hilos_antes
+    inicio, base = time.perf_counter(), list(recibidas)
+    time.sleep(segundos)
+    transcurrido = time.perf_counter() - inicio
+    tasas = [(r - b) / transcurrido for r, b in zip(recibidas, base)]
+    fleet.stop()
+    detener.set()
+    for hilo in servidores:
+        hilo.join(1)
+
+    print(f"{n} carritos a {baud} baud, {hilos_flota} hilos de la flota")
+    print(f"total      {sum(tasas):>10,.0f} muestras/s")
+    print(f"por carro  {min(tasas):>10,.0f} mín  {sum(tasas) / n:>8,.0f} media  {max(tasas):>8,.0f} máx")
+
+if __name__ == "__main__":
+    main()
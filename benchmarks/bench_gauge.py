@@ -0,0 +1,88 @@
+"""
+Benchmark de GaugeWidget.paintEvent: tiempo de pintado por cuadro de la
+versión original (todo se reconstruye en cada cuadro) contra la versión con
+capa estática en caché. Corre sin pantalla con QT_QPA_PLATFORM=offscreen.
+Uso: python benchmarks/bench_gauge.py [cuadros]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6 import QtWidgets, QtCore, QtGui
+from PySide6.QtGui import QPainter, QConicalGradient, QColor, QFont, QPen
+
+from tablero import GaugeWidget
+
+class GaugeWidgetAnterior(GaugeWidget):
+    # Réplica del paintEvent original, sin cachés
+    def setValue(self, value):
+        self.current_value = value
+        self.update()
+
+    def paintEvent(self, event):
+        w = self.width()
+        h = self.height()
+        center = QtCore.QPointF(w/2, h/2)
+        radius = min(w, h) / 2 - 10
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor("#555555"), 4))
+        painter.setBrush(QColor("#000000"))
+        painter.drawEllipse(center, radius, radius)
+
+        startAngle = 45
+        spanAngle = -270
+        pen = QPen(QColor("#333333"), 20)
+        painter.setPen(pen)
+        painter.drawArc(10, 10, w-20, h-20, startAngle*16, spanAngle*16)
+
+        fraction = (self.current_value - self.min_value) / (self.max_value - self.min_value)
+        valueAngle = startAngle + fraction * spanAngle
+        gradient = QConicalGradient(center, -valueAngle)
+        gradient.setColorAt(0.0, QColor("#00b8fe"))
+        gradient.setColorAt(1.0, QColor("#41dcf4"))
+        pen.setBrush(gradient)
+        painter.setPen(pen)
+        painter.drawArc(10, 10, w-20, h-20, startAngle*16, int((valueAngle - startAngle)*16))
+
+        painter.save()
+        painter.translate(center)
+        painter.rotate(valueAngle)
+        painter.setPen(QPen(QColor("#FFFFFF"), 3))
+        painter.drawLine(0, 0, radius - 20, 0)
+        painter.restore()
+
+        painter.setPen(QColor("#FFFFFF"))
+        painter.setFont(QFont("Arial", 16, QFont.Bold))
+        painter.drawText(self.rect(), QtCore.Qt.AlignCenter, f"{int(self.current_value)}")
+        painter.setFont(QFont("Arial", 10))
+        bottom_rect = QtCore.QRect(0, int(h/2+20), w, 30)
+        painter.drawText(bottom_rect, QtCore.Qt.AlignCenter, f"Lim: {int(self.limit_value)}")
+        painter.end()
+
+def medir_pintado(clase, lado, cuadros):
+    gauge = clase("speed", 0, 400)
+    gauge.resize(lado, lado)
+    imagen = QtGui.QImage(lado, lado, QtGui.QImage.Format_ARGB32_Premultiplied)
+    gauge.render(imagen)  # Primer cuadro: construye la caché
+    inicio = time.perf_counter()
+    for i in range(cuadros):
+        gauge.setValue(i % 400)
+        gauge.render(imagen)
+    return (time.perf_counter() - inicio) / cuadros * 1e6
+
+def main():
+    cuadros = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    print(f"{'lado':>6} {'anterior µs':>14} {'caché µs':>12} {'aceleración':>12}")
+    for lado in (150, 250, 400):
+        antes = medir_pintado(GaugeWidgetAnterior, lado, cuadros)
+        despues = medir_pintado(GaugeWidget, lado, cuadros)
+        print(f"{lado:>6} {antes:>14.1f} {despues:>12.1f} {antes / despues:>11.2f}x")
+
+if __name__ == "__main__":
+    main()
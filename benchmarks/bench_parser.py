@@ -0,0 +1,79 @@
+"""
+Microbenchmark del parser de telemetría: compara el parseo por línea con
+split/dict (implementación anterior de updateFromSerial) contra
+TelemetryParser, y mide también el formato binario con CRC.
+Uso: python benchmarks/bench_parser.py [muestras] [bytes_por_lectura]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetria import TelemetryParser, empaquetar_telemetria
+
+def generar_stream(n):
+    return b"".join(b"VEL=%d RPM=%d\r\n" % (i % 400, (i * 15) % 6000) for i in range(n))
+
+def generar_stream_binario(n):
+    return b"".join(empaquetar_telemetria(i % 400, (i * 15) % 6000) for i in range(n))
+
+def trozos(data, tam):
+    return [data[i:i + tam] for i in range(0, len(data), tam)]
+
+def parser_anterior(chunks):
+    # Réplica del parseo original: decode + strip + split + dict por línea
+    pendiente = b""
+    total = suma = 0
+    for data in chunks:
+        pendiente += data
+        *lineas, pendiente = pendiente.split(b"\n")
+        for raw in lineas:
+            line = raw.decode("utf-8", errors="ignore").strip()
+            if line.startswith("VEL=") and "RPM=" in line:
+                data_dict = {}
+                for part in line.split():
+                    if "=" in part:
+                        key, val = part.split("=", 1)
+                        data_dict[key] = int(val)
+                vel, rpm = data_dict["VEL"], data_dict["RPM"]
+                total += 1
+                suma += vel + rpm
+    return total, suma
+
+def parser_incremental(chunks):
+    # Se usan los valores de cada muestra, igual que en parser_anterior
+    parser = TelemetryParser()
+    total = suma = 0
+    for data in chunks:
+        for muestra in parser.feed(data):
+            total += 1
+            suma += muestra.vel + muestra.rpm
+    return total, suma
+
+def medir(nombre, funcion, chunks, esperadas, repeticiones=5):
+    """esperadas = (muestras, suma de VEL + RPM): el parser tiene que entregar los valores."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(chunks)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    assert resultado == esperadas, f"{nombre}: {resultado} != {esperadas}"
+    fps = esperadas[0] / mejor
+    print(f"{nombre:<12} {fps:>14,.0f} frames/s")
+    return fps
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tam = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    chunks = trozos(generar_stream(n), tam)
+    print(f"{n} muestras en lecturas de {tam} bytes")
+    esperadas = (n, sum(i % 400 + (i * 15) % 6000 for i in range(n)))
+    antes = medir("anterior", parser_anterior, chunks, esperadas)
+    despues = medir("incremental", parser_incremental, chunks, esperadas)
+    print(f"aceleración: {despues / antes:.2f}x")
+    binario = trozos(generar_stream_binario(n), tam)
+    medir("binario", parser_incremental, binario, esperadas)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark de la simulación sin interfaz: pasos por segundo de VehicleSim
+(un carrito) contra FleetSim (miles de carritos vectorizados), expresado
+también en veces tiempo real. Uso: python benchmarks/bench_vehiculo.py [carritos] [pasos]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vehiculo import ACCION_ACELERAR, ACCION_ENGRANAJE, DT, GEARS, VehicleSim
+from vehiculo_lotes import FleetSim
+
+def acciones_aleatorias(carritos, pasos, semilla=0):
+    rng = np.random.default_rng(semilla)
+    acciones = rng.integers(0, ACCION_ENGRANAJE + len(GEARS), size=(pasos, carritos), dtype=np.int8)
+    # Mayormente acelerar, como un piloto real
+    acciones[rng.random((pasos, carritos)) < 0.7] = ACCION_ACELERAR
+    return acciones
+
+def main():
+    carritos = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    pasos = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    acciones = acciones_aleatorias(carritos, pasos)
+
+    sim = VehicleSim()
+    inicio = time.perf_counter()
+    for _ in range(pasos):
+        sim.accelerate()
+        sim.step()
+    escalar = pasos / (time.perf_counter() - inicio)
+
+    flota = FleetSim(carritos)
+    inicio = time.perf_counter()
+    for fila in acciones:
+        flota.step(fila)
+    lotes = pasos * carritos / (time.perf_counter() - inicio)
+
+    print(f"VehicleSim: {escalar:>14,.0f} pasos/s  ({escalar * DT:,.0f}x tiempo real)")
+    print(f"FleetSim:   {lotes:>14,.0f} pasos-carrito/s con {carritos} carritos "
+          f"({lotes / carritos * DT:,.0f}x tiempo real por carrito)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark del servidor web de telemetría: N espectadores WebSocket más uno
+lento que nunca lee, con un estado que cambia en cada tick. Informa tramas
+recibidas, bytes por trama (delta contra estado completo), los ticks en que
+se salteó al cliente lento y el CPU del proceso por segundo, que es la carga
+que los espectadores agregan junto al loop de control, separando la parte
+del hilo del servidor. A 30 Hz los buffers del kernel absorben decenas de
+segundos de tramas del lento antes de que se saltee: en corridas cortas los
+ticks salteados dan 0 (el caso lo cubre tests/test_servidor_web.py).
+Uso: python benchmarks/bench_web.py [espectadores] [segundos]
+"""
+import asyncio
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servidor_web import TelemetryServer, decodificar_delta, estado
+
+async def conectar(port, rate):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    clave = base64.b64encode(os.urandom(16))
+    writer.write(b"GET /ws?rate=%d HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Key: %s\r\nSec-WebSocket-Version: 13\r\n\r\n" % (rate, clave))
+    while await reader.readline() not in (b"\r\n", b""):
+        pass
+    return reader, writer
+
+async def espectador(port, rate, contador, hasta):
+    reader, writer = await conectar(port, rate)
+    ultimo = None
+    try:
+        while time.monotonic() < hasta:
+            try:
+                b0, largo = await asyncio.wait_for(reader.readexactly(2), max(0.01, hasta - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
+            datos = await reader.readexactly(largo)
+            if b0 & 0x0F == 0x2:
+                ultimo = decodificar_delta(ultimo, datos)
+                contador[0] += 1
+                contador[1] += len(datos)
+    finally:
+        writer.close()
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 36
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    i = [0]
+    cpu_servidor = []
+
+    def fuente():
+        # Corre en el hilo del servidor: su reloj de CPU es el del servidor
+        cpu_servidor.append(time.thread_time())
+        i[0] += 1
+        return estado(i[0] % 400, (i[0] * 15) % 6000, "3", i[0] % 20 < 10)
+
+    server = TelemetryServer(fuente, "127.0.0.1", 0, max_rate=30)
+    server.start()
+    hasta = time.monotonic() + segundos
+    contador = [0, 0]
+    # El lento se conecta y no lee nunca
+    _, lento = await conectar(server.port, 30)
+    cpu = time.process_time()
+    await asyncio.gather(*(espectador(server.port, 30 if k % 2 else 10, contador, hasta) for k in range(n)))
+    cpu = time.process_time() - cpu
+    server.stop()
+    lento.close()
+    print(f"{n} espectadores (mitad a 30 Hz, mitad a 10 Hz) durante {segundos:.0f} s")
+    print(f"tramas recibidas        {contador[0]:>10,}")
+    print(f"bytes por trama         {contador[1] / max(1, contador[0]):>10.1f}  (completa: 7)")
+    print(f"ticks salteados (lento) {server.saltados:>10,}")
+    print(f"CPU del proceso         {cpu / segundos * 1000:>10.1f} ms/s  (incluye a los clientes)")
+    print(f"CPU del hilo servidor   {(cpu_servidor[-1] - cpu_servidor[0]) / segundos * 1000:>10.1f} ms/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+"""
+Suite de regresión de rendimiento de los caminos críticos del tablero, sin
+pantalla (QT_QPA_PLATFORM=offscreen):
+  serial     muestras/s de punta a punta: puerto falso en memoria, hilo de
+             SerialWorker, señal encolada y TestWindow.updateFromSerial
+  pintado    µs por cuadro de GaugeWidget.paintEvent a varios tamaños
+  teclado    eventos/s de TestWindow.eventFilter con ráfagas de teclas
+  settings   µs por llamada de load_settings y save_settings
+  arranque   importación y lanzamiento hasta el primer pintado del menú
+
+Cada métrica es la mediana de --repeticiones corridas. Falla (código de
+salida 1) si alguna empeora más que --tolerancia respecto de la base en
+benchmarks/base_regresion.json; sin base solo se aplican los límites
+absolutos del arranque. --guardar escribe la base con lo medido (las bases
+dependen de la máquina y no se versionan).
+Uso: python benchmarks/regresion.py [--solo serial,pintado] [--repeticiones N]
+                                    [--tolerancia 0.25] [--guardar]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from PySide6 import QtWidgets, QtCore
+
+import bench_arranque as arranque
+from bench_eventos import PuertoFalso, medir as medir_filtro, tecla
+from bench_gauge import medir_pintado
+from bench_parser import generar_stream
+from bitacora import bitacora
+from configuracion import DEFAULT_SETTINGS, load_settings, save_settings
+from tablero import GaugeWidget, TestWindow
+
+BASE = os.path.join(RAIZ, "benchmarks", "base_regresion.json")
+# Unidades por las que "más alto es mejor"; el resto son tiempos
+MAYOR_ES_MEJOR = ("muestras/s", "eventos/s")
+
+class PuertoMemoria(PuertoFalso):
+    # Entrega un stream ya generado en lecturas de 'tam' bytes, como un puerto lleno
+    def __init__(self, data, tam=64):
+        self.data = data
+        self.pos = 0
+        self.tam = tam
+
+    @property
+    def in_waiting(self):
+        return min(self.tam, len(self.data) - self.pos)
+
+    def read(self, n=1):
+        if self.pos >= len(self.data):
+            return super().read(n)
+        trozo = self.data[self.pos:self.pos + min(n, self.tam)]
+        self.pos += len(trozo)
+        return trozo
+
+def bench_serial(app, n=20000):
+    puerto = PuertoMemoria(b"")
+    ventana = TestWindow(dict(DEFAULT_SETTINGS, trip_export=False), serialConnection=puerto)
+    recibidas = []
+    ventana.serialBridge.muestraRecibida.connect(lambda vel, rpm: recibidas.append(vel), QtCore.Qt.QueuedConnection)
+    # Los datos llegan recién ahora, con el contador ya conectado
+    inicio = time.perf_counter()
+    puerto.data = generar_stream(n)
+    limite = inicio + 30
+    while len(recibidas) < n and time.perf_counter() < limite:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    segundos = time.perf_counter() - inicio
+    ventana.close()
+    return {"serial_muestras_s": (len(recibidas) / segundos, "muestras/s")}
+
+def bench_pintado(app, cuadros=500):
+    return {f"gauge_{lado}px_us": (medir_pintado(GaugeWidget, lado, cuadros), "µs/cuadro")
+            for lado in (150, 250, 400)}
+
+def bench_teclado(app, n=100000):
+    settings = dict(DEFAULT_SETTINGS, trip_export=False)
+    simulado = TestWindow(settings)
+    teclas = [tecla(QtCore.QEvent.KeyPress, t) for t in "ar3bxz"]
+    resultado = {"teclas_simulado_s": (medir_filtro(simulado, teclas, n), "eventos/s")}
+    simulado.close()
+    real = TestWindow(settings, serialConnection=PuertoFalso())
+    teclas = [tecla(tipo, t) for t in "aid" for tipo in (QtCore.QEvent.KeyPress, QtCore.QEvent.KeyRelease)]
+    resultado["teclas_real_s"] = (medir_filtro(real, teclas, n), "eventos/s")
+    real.close()
+    return resultado
+
+def bench_settings(app, n=500):
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo = os.path.join(carpeta, "settings.json")
+        inicio = time.perf_counter()
+        for _ in range(n):
+            save_settings(DEFAULT_SETTINGS, archivo)
+        guardar = (time.perf_counter() - inicio) / n * 1e6
+        inicio = time.perf_counter()
+        for _ in range(n):
+            load_settings(archivo)
+        cargar = (time.perf_counter() - inicio) / n * 1e6
+    return {"save_settings_us": (guardar, "µs"), "load_settings_us": (cargar, "µs")}
+
+def bench_arranque(app):
+    importacion, _ = arranque.medir_importacion()
+    return {"importacion_ms": (importacion, "ms"),
+            "primer_pintado_ms": (arranque.medir_primer_pintado(), "ms")}
+
+GRUPOS = {
+    "serial": bench_serial,
+    "pintado": bench_pintado,
+    "teclado": bench_teclado,
+    "settings": bench_settings,
+    "arranque": bench_arranque,
+}
+
+def limite_para(clave, unidad, base, tolerancia):
+    if clave in base:
+        factor = 1 - tolerancia if unidad in MAYOR_ES_MEJOR else 1 + tolerancia
+        return base[clave] * factor
+    return arranque.LIMITES.get(clave)
+
+def main():
+    parser = argparse.ArgumentParser(description="Regresiones de rendimiento de los caminos críticos.")
+    parser.add_argument("--solo", help="grupos separados por comas: " + ",".join(GRUPOS))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="fracción permitida respecto de la base")
+    parser.add_argument("--guardar", action="store_true", help="guardar lo medido como nueva base")
+    args = parser.parse_args()
+    grupos = args.solo.split(",") if args.solo else list(GRUPOS)
+    desconocidos = set(grupos) - set(GRUPOS)
+    if desconocidos:
+        parser.error(f"grupos desconocidos: {', '.join(sorted(desconocidos))}")
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    # Sin destinos: los mensajes de la bitácora no deben medir a la consola
+    bitacora.setSinks([])
+
+    corridas = {}
+    for grupo in grupos:
+        for _ in range(args.repeticiones):
+            for clave, (valor, unidad) in GRUPOS[grupo](app).items():
+                corridas.setdefault(clave, (unidad, []))[1].append(valor)
+    resultado = {clave: (statistics.median(valores), unidad) for clave, (unidad, valores) in corridas.items()}
+
+    base = {}
+    if os.path.exists(BASE):
+        with open(BASE) as f:
+            base = json.load(f)
+    regresion = False
+    for clave, (valor, unidad) in resultado.items():
+        limite = limite_para(clave, unidad, base, args.tolerancia)
+        if limite is None:
+            excedido, texto = False, "sin base"
+        else:
+            excedido = valor < limite if unidad in MAYOR_ES_MEJOR else valor > limite
+            texto = f"límite {limite:,.1f}"
+        regresion = regresion or excedido
+        print(f"{clave:<22} {valor:>14,.1f} {unidad:<11} ({texto}){'  REGRESIÓN' if excedido else ''}")
+
+    if args.guardar:
+        # Se conservan las métricas de los grupos que no se corrieron
+        base.update({clave: valor for clave, (valor, _) in resultado.items()})
+        with open(BASE, "w") as f:
+            json.dump(base, f, indent=4)
+        print(f"Base guardada en {BASE}")
+    elif regresion:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
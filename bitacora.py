@@ -0,0 +1,287 @@
+import atexit
+import collections
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+# --- Bitácora de eventos: registrar nunca bloquea a quien registra ---
+#
+# El hilo que registra (la interfaz, el lector serial) solo arma una tupla y
+# la agrega a una cola acotada; un hilo escritor la vacía por lotes hacia los
+# destinos (consola, JSON por líneas, binario). Si la cola se llena los
+# eventos se descartan y se cuentan, y el escritor informa cuántos perdió.
+# Los mensajes se formatean en el hilo escritor, no en el que registra.
+
+DEBUG, INFO, AVISO, ERROR = 10, 20, 30, 40
+NOMBRES_NIVEL = {DEBUG: "DEBUG", INFO: "INFO", AVISO: "AVISO", ERROR: "ERROR"}
+NIVELES = {nombre.lower(): nivel for nivel, nombre in NOMBRES_NIVEL.items()}
+
+# Archivo binario: MAGIC y luego, por evento, la cabecera seguida del nombre
+# del evento y los campos en JSON (UTF-8)
+MAGIC = b"CAREVT1\0"
+EVENTO = struct.Struct("<qBBH")  # t_ns (epoch), nivel, largo del nombre, largo de los campos
+
+def nivel_de(nombre):
+    """Nivel por nombre ('debug', 'info', 'aviso', 'error') o número."""
+    return nombre if isinstance(nombre, int) else NIVELES[nombre.lower()]
+
+def formatear(t_ns, nivel, evento, plantilla, campos):
+    try:
+        texto = plantilla.format(**campos) if plantilla else evento
+    except (KeyError, IndexError, ValueError):
+        texto = f"{plantilla} {campos}"
+    return texto if nivel < AVISO else f"[{NOMBRES_NIVEL.get(nivel, nivel)}] {texto}"
+
+class ConsoleSink:
+    """Texto legible, como los print() de antes, en stdout o el stream dado."""
+    def __init__(self, stream=None, nivel=INFO):
+        self.stream = stream
+        self.nivel = nivel
+
+    def escribir(self, lote):
+        stream = self.stream or sys.stdout
+        lineas = [formatear(*registro) for registro in lote if registro[1] >= self.nivel]
+        if lineas:
+            stream.write("\n".join(lineas) + "\n")
+            stream.flush()
+
+    def close(self):
+        pass
+
+class _RotatingFile:
+    """Archivo que, al pasar max_bytes, se renombra a .1 (y .1 a .2, ...)."""
+    modo = "ab"
+
+    def __init__(self, ruta, max_bytes=1_000_000, respaldos=3, nivel=DEBUG):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.respaldos = respaldos
+        self.nivel = nivel
+        self._abrir()
+
+    def _abrir(self):
+        self._file = open(self.ruta, self.modo)
+        self._tam = self._file.tell()
+        if self._tam == 0:
+            self._tam = self._cabecera()
+
+    def _cabecera(self):
+        return 0
+
+    def _rotar(self):
+        self._file.close()
+        for i in range(self.respaldos - 1, 0, -1):
+            if os.path.exists(f"{self.ruta}.{i}"):
+                os.replace(f"{self.ruta}.{i}", f"{self.ruta}.{i + 1}")
+        if self.respaldos:
+            os.replace(self.ruta, f"{self.ruta}.1")
+        else:
+            os.remove(self.ruta)
+        self._abrir()
+
+    def escribir(self, lote):
+        datos = b"".join(self._codificar(registro) for registro in lote if registro[1] >= self.nivel)
+        if not datos:
+            return
+        if self.max_bytes and self._tam + len(datos) > self.max_bytes and self._tam:
+            self._rotar()
+        self._file.write(datos)
+        self._file.flush()
+        self._tam += len(datos)
+
+    def close(self):
+        self._file.close()
+
+class JsonLinesSink(_RotatingFile):
+    """Un objeto JSON por línea: t (epoch en s), nivel, evento y los campos."""
+    def _codificar(self, registro):
+        t_ns, nivel, evento, _, campos = registro
+        objeto = {"t": t_ns / 1e9, "nivel": NOMBRES_NIVEL.get(nivel, nivel), "evento": evento}
+        objeto.update(campos)
+        return json.dumps(objeto, ensure_ascii=False, default=str).encode() + b"\n"
+
+class BinarySink(_RotatingFile):
+    """Registros compactos (ver EVENTO); leer_binario() los recupera."""
+    def _cabecera(self):
+        self._file.write(MAGIC)
+        return len(MAGIC)
+
+    def _codificar(self, registro):
+        t_ns, nivel, evento, _, campos = registro
+        nombre = evento.encode()[:255]
+        datos = json.dumps(campos, ensure_ascii=False, default=str, separators=(",", ":")).encode() if campos else b""
+        return EVENTO.pack(t_ns, nivel, len(nombre), len(datos)) + nombre + datos
+
+def leer_binario(ruta):
+    """Genera (t_ns, nivel, evento, campos) de un archivo de BinarySink."""
+    with open(ruta, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{ruta} no es una bitácora binaria")
+        while cabecera := f.read(EVENTO.size):
+            t_ns, nivel, largo_nombre, largo_campos = EVENTO.unpack(cabecera)
+            evento = f.read(largo_nombre).decode()
+            datos = f.read(largo_campos)
+            yield t_ns, nivel, evento, json.loads(datos) if datos else {}
+
+def _nivel_minimo(sinks):
+    return min((sink.nivel for sink in sinks), default=ERROR + 1)
+
+class _CambioDeSinks:
+    """Marca en la cola: lo anterior va a los destinos viejos, lo siguiente a estos."""
+    __slots__ = ("sinks",)
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+class EventLog:
+    """
+    log() (y debug/info/aviso/error) solo encola: no formatea, no escribe
+    y no toma locks. Los eventos por debajo de 'nivel' se descartan antes de
+    armar nada. Con más de 'capacidad' eventos pendientes los nuevos se
+    descartan y se cuentan en 'descartados'. El hilo escritor arranca con el
+    primer evento y despierta cada 'intervalo' segundos.
+    """
+    def __init__(self, sinks=None, capacidad=8192, intervalo=0.05):
+        self.capacidad = capacidad
+        self.intervalo = intervalo
+        self.descartados = 0
+        self.errores_sink = 0
+        self._informados = 0
+        # deque.append y popleft son atómicas en CPython: no hacen falta locks
+        self._cola = collections.deque()
+        self._despertar = threading.Event()
+        self._vaciado = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._escribiendo = False
+        self._arranque = threading.Lock()
+        self.setSinks([ConsoleSink()] if sinks is None else sinks)
+
+    def setSinks(self, sinks):
+        anteriores, self.sinks = getattr(self, "sinks", []), list(sinks)
+        self.nivel = _nivel_minimo(self.sinks)
+        return anteriores
+
+    def configurar(self, settings, consola=None):
+        """
+        Arma los destinos según settings: consola (en 'consola' o stdout) y
+        un archivo JSON por líneas o binario con rotación. No espera al
+        escritor: el cambio viaja por la cola, así lo registrado antes va a
+        los destinos anteriores, que el escritor cierra al hacer el cambio.
+        """
+        nivel = nivel_de(settings.get("event_log_level", "info"))
+        sinks = []
+        if settings.get("event_log_console", True):
+            sinks.append(ConsoleSink(consola, nivel))
+        formato = settings.get("event_log_format", "ninguno")
+        clase = {"jsonl": JsonLinesSink, "binario": BinarySink}.get(formato)
+        if clase:
+            ruta = settings.get("event_log_file") or ("eventos.jsonl" if clase is JsonLinesSink else "eventos.carevt")
+            sinks.append(clase(ruta, settings.get("event_log_max_bytes", 1_000_000),
+                               settings.get("event_log_backups", 3), nivel))
+        self.nivel = min(self.nivel, _nivel_minimo(sinks))
+        self._cola.append(_CambioDeSinks(sinks))
+        if self._hilo is None:
+            self._iniciar()
+        self._despertar.set()
+
+    def log(self, nivel, evento, plantilla="", **campos):
+        if nivel < self.nivel:
+            return
+        cola = self._cola
+        if len(cola) >= self.capacidad:
+            self.descartados += 1
+            return
+        cola.append((time.time_ns(), nivel, evento, plantilla, campos))
+        if self._hilo is None:
+            self._iniciar()
+
+    def debug(self, evento, plantilla="", **campos):
+        self.log(DEBUG, evento, plantilla, **campos)
+
+    def info(self, evento, plantilla="", **campos):
+        self.log(INFO, evento, plantilla, **campos)
+
+    def aviso(self, evento, plantilla="", **campos):
+        self.log(AVISO, evento, plantilla, **campos)
+
+    def error(self, evento, plantilla="", **campos):
+        self.log(ERROR, evento, plantilla, **campos)
+
+    def flush(self, timeout=1.0):
+        """Espera (hasta timeout) a que el escritor vacíe la cola."""
+        limite = time.monotonic() + timeout
+        while self._hilo and self._hilo.is_alive() and (self._cola or self._escribiendo):
+            self._vaciado.clear()
+            self._despertar.set()
+            if not self._vaciado.wait(limite - time.monotonic()):
+                return False
+        return True
+
+    def close(self, timeout=1.0):
+        if self._hilo:
+            self._detener.set()
+            self._despertar.set()
+            self._hilo.join(timeout)
+        self._vaciar()
+        for sink in self.sinks:
+            sink.close()
+        self.setSinks([])
+
+    def _iniciar(self):
+        with self._arranque:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._correr, name="EventLog", daemon=True)
+                self._hilo.start()
+
+    def _correr(self):
+        while not self._detener.is_set():
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            self._vaciar()
+
+    def _vaciar(self):
+        self._escribiendo = True
+        try:
+            cola = self._cola
+            lote = []
+            while cola:
+                registro = cola.popleft()
+                if registro.__class__ is _CambioDeSinks:
+                    self._escribir(lote)
+                    lote = []
+                    self._cambiarSinks(registro.sinks)
+                else:
+                    lote.append(registro)
+            if self.descartados != self._informados:
+                perdidos = self.descartados - self._informados
+                self._informados = self.descartados
+                lote.append((time.time_ns(), AVISO, "eventos_descartados",
+                             "Bitácora saturada: {perdidos} eventos descartados", {"perdidos": perdidos}))
+            self._escribir(lote)
+        finally:
+            self._escribiendo = False
+            self._vaciado.set()
+
+    def _escribir(self, lote):
+        if lote:
+            for sink in self.sinks:
+                try:
+                    sink.escribir(lote)
+                except (OSError, ValueError):
+                    self.errores_sink += 1
+
+    def _cambiarSinks(self, sinks):
+        for sink in self.setSinks(sinks):
+            if sink not in self.sinks:
+                try:
+                    sink.close()
+                except OSError:
+                    self.errores_sink += 1
+
+# Bitácora de la aplicación; al salir se escribe lo pendiente
+bitacora = EventLog()
+atexit.register(bitacora.close)
@@ -0,0 +1,340 @@
+import hmac
+import os
+import secrets
+import socket
+import struct
+import tempfile
+import time
+from multiprocessing import shared_memory
+
+# --- Bus de telemetría en memoria compartida ---
+#
+# Un escritor (el tablero) y cualquier cantidad de lectores locales. Segmento:
+#   Cabecera (64 bytes): MAGIC | capacidad | tamaño de registro | cabeza
+#                        | buzón de comandos (seq, largo, bytes, token)
+#                        | pid del escritor (0 si ya cerró)
+#   Anillo: 'capacidad' registros de ancho fijo, cada uno con su seqlock:
+#           seq (uint32) | t_ns (int64) | VEL (int16) | RPM (uint16) | engranaje
+# La cabeza cuenta los registros escritos desde el inicio; el registro n
+# vive en la ranura n % capacidad y, ya completo, su seq vale 2 * (vuelta + 1).
+# El escritor nunca espera: el lector que se atrasa más de una vuelta
+# pierde los registros pisados (y los cuenta), sin frenar a nadie.
+#
+# Los lectores leen en el lugar con struct.unpack_from sobre el segmento, sin
+# pipes ni serialización. El orden de las escrituras lo garantiza el modelo
+# de memoria de x86; en ARM un lector puede, muy raramente, reintentar de más.
+#
+# Tras dejar un comando en el buzón el lector envía un datagrama a un socket
+# Unix del escritor (el "timbre"): así el tablero no necesita sondear el
+# buzón en reposo. Donde no hay sockets Unix de datagramas (Windows) el
+# escritor solo puede sondear.
+
+MAGIC = b"CARBUS1\0"
+HEADER = struct.Struct("<8sIIQ")           # magic, capacidad, tamaño de registro, cabeza
+BUZON = struct.Struct("<IB15s16s")          # seq, largo, comando, token
+RECORD = struct.Struct("<IqhHc7x")          # seq, t_ns, vel, rpm, engranaje
+_SEQ = struct.Struct("<I")
+_CABEZA = struct.Struct("<Q")
+_PID = struct.Struct("<I")
+OFFSET_CABEZA = 16
+OFFSET_BUZON = HEADER.size
+OFFSET_ESCRITOR = OFFSET_BUZON + BUZON.size
+OFFSET_ANILLO = 64
+MAX_COMANDO = 15
+
+# Segmentos creados por este proceso (los lectores locales no los desregistran)
+_CREADOS = set()
+
+def ruta_token(nombre):
+    """Archivo (solo legible por el dueño) con el token que autoriza comandos."""
+    return os.path.join(tempfile.gettempdir(), f"{nombre}.token")
+
+def ruta_timbre(nombre):
+    """Socket Unix de datagramas donde el escritor recibe los avisos de comando."""
+    return os.path.join(tempfile.gettempdir(), f"{nombre}.timbre")
+
+def _limitar(valor, minimo, maximo):
+    return max(minimo, min(int(valor), maximo))
+
+def _proceso_vivo(pid):
+    if os.name != "posix":
+        # En Windows el segmento desaparece con el último proceso que lo
+        # tiene abierto: si existe, alguien lo está usando
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _abrir_timbre(ruta):
+    try:
+        timbre = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    except (AttributeError, OSError):
+        return None
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        # Socket viejo de otro usuario: sin timbre, el escritor sondea
+        timbre.close()
+        return None
+    try:
+        timbre.bind(ruta)
+    except OSError:
+        timbre.close()
+        return None
+    timbre.setblocking(False)
+    return timbre
+
+def _crear_token(ruta, token):
+    # El tempdir es compartido: O_EXCL no sigue un archivo o enlace que otro
+    # haya dejado ahí. Uno viejo solo queda si su escritor ya no existe.
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+    fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(token)
+
+class BusOcupado(Exception):
+    """Otro proceso (o ventana) ya publica en un bus con ese nombre."""
+
+class TelemetryBus:
+    """
+    Lado escritor. publish() escribe una muestra en O(1) sin locks.
+    Los comandos entrantes llegan por un buzón de una sola ranura; solo se
+    aceptan si traen el token guardado en ruta_token(nombre), que se crea con
+    permisos 0600: quien puede leerlo es un consumidor autorizado.
+
+    Si ya existe un segmento con ese nombre y su escritor sigue vivo, o el
+    token no se puede crear (p. ej. lo dejó otro usuario), se lanza
+    BusOcupado; si quedó de una sesión que terminó mal se reutiliza,
+    continuando la cabeza, así los lectores que seguían conectados siguen
+    leyendo del mismo segmento. 'timbre' es el socket que recibe los avisos
+    de comando nuevo (None si la plataforma no los tiene).
+    """
+    def __init__(self, nombre="carrito", capacidad=4096):
+        self.nombre = nombre
+        self.capacidad = capacidad
+        tam = OFFSET_ANILLO + capacidad * RECORD.size
+        try:
+            self.shm = shared_memory.SharedMemory(nombre, create=True, size=tam)
+            self.buf = self.shm.buf
+            self.buf[:tam] = bytes(tam)
+            HEADER.pack_into(self.buf, 0, MAGIC, capacidad, RECORD.size, 0)
+        except FileExistsError:
+            self.shm = self._reutilizar(nombre, capacidad)
+            self.buf = self.shm.buf
+        _CREADOS.add(nombre)
+        _PID.pack_into(self.buf, OFFSET_ESCRITOR, os.getpid())
+        self.cabeza = _CABEZA.unpack_from(self.buf, OFFSET_CABEZA)[0]
+        self.rechazados = 0
+        self._buzon_seq = _SEQ.unpack_from(self.buf, OFFSET_BUZON)[0]
+        self.token = secrets.token_bytes(16)
+        self.token_path = ruta_token(nombre)
+        try:
+            _crear_token(self.token_path, self.token)
+        except OSError as e:
+            # Sin token propio no hay comandos seguros: soltar el segmento
+            _PID.pack_into(self.buf, OFFSET_ESCRITOR, 0)
+            self.buf = None
+            self.shm.close()
+            self.shm.unlink()
+            _CREADOS.discard(nombre)
+            raise BusOcupado(f"No se pudo crear el token del bus {nombre}: {e}") from e
+        self.timbre_path = ruta_timbre(nombre)
+        self.timbre = _abrir_timbre(self.timbre_path)
+
+    @staticmethod
+    def _reutilizar(nombre, capacidad):
+        shm = shared_memory.SharedMemory(nombre)
+        magic, capacidad_vieja, tam_registro, _ = HEADER.unpack_from(shm.buf, 0)
+        pid = _PID.unpack_from(shm.buf, OFFSET_ESCRITOR)[0]
+        if pid and _proceso_vivo(pid):
+            shm.close()
+            raise BusOcupado(f"El bus {nombre} ya tiene un escritor activo (pid {pid})")
+        if magic != MAGIC or tam_registro != RECORD.size or capacidad_vieja != capacidad:
+            shm.close()
+            raise ValueError(f"{nombre} existe pero no es un bus de telemetría compatible")
+        return shm
+
+    def publish(self, vel, rpm, gear, t_ns=None):
+        n = self.cabeza
+        offset = OFFSET_ANILLO + (n % self.capacidad) * RECORD.size
+        seq = 2 * (n // self.capacidad + 1)
+        buf = self.buf
+        # Impar mientras se escribe: el lector que lo vea reintenta
+        _SEQ.pack_into(buf, offset, seq - 1)
+        RECORD.pack_into(buf, offset, seq - 1,
+                         time.monotonic_ns() if t_ns is None else t_ns,
+                         _limitar(vel, -32768, 32767), _limitar(rpm, 0, 65535),
+                         gear.encode()[:1] or b"?")
+        _SEQ.pack_into(buf, offset, seq)
+        self.cabeza = n + 1
+        _CABEZA.pack_into(buf, OFFSET_CABEZA, n + 1)
+
+    def atender_timbre(self):
+        """Vacía los avisos pendientes del timbre (no None); True si había alguno."""
+        avisos = False
+        while True:
+            try:
+                self.timbre.recv(64)
+            except (BlockingIOError, InterruptedError):
+                return avisos
+            avisos = True
+
+    def comando_pendiente(self):
+        """Devuelve el comando nuevo del buzón si está autorizado, o None."""
+        if self.timbre is not None:
+            self.atender_timbre()
+        seq, largo, comando, token = BUZON.unpack_from(self.buf, OFFSET_BUZON)
+        if seq == self._buzon_seq or seq & 1:
+            return None
+        # Releer: si el consumidor escribió en el medio, esperar al próximo sondeo
+        if _SEQ.unpack_from(self.buf, OFFSET_BUZON)[0] != seq:
+            return None
+        self._buzon_seq = seq
+        if not hmac.compare_digest(token, self.token):
+            self.rechazados += 1
+            return None
+        return comando[:min(largo, MAX_COMANDO)]
+
+    def close(self):
+        # Los lectores que sigan conectados ven en la cabecera que ya no hay escritor
+        _PID.pack_into(self.buf, OFFSET_ESCRITOR, 0)
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        _CREADOS.discard(self.nombre)
+        rutas = [self.token_path]
+        if self.timbre is not None:
+            self.timbre.close()
+            rutas.append(self.timbre_path)
+        for ruta in rutas:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+
+class TelemetryBusReader:
+    """
+    Lado lector, para otro proceso. Cada lector tiene su propio cursor, así
+    que varios pueden leer a distinto ritmo. leer() devuelve las muestras
+    (t_ns, vel, rpm, engranaje) nuevas desde la llamada anterior; con
+    desde_inicio=False empieza por las que lleguen después de abrir.
+    """
+    def __init__(self, nombre="carrito", desde_inicio=False):
+        self.nombre = nombre
+        self.shm = shared_memory.SharedMemory(nombre)
+        if os.name == "posix" and nombre not in _CREADOS:
+            # Solo el escritor debe borrar el segmento al salir (Python < 3.13
+            # lo registra también para los procesos que se conectan)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.buf = self.shm.buf
+        magic, self.capacidad, tam_registro, cabeza = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or tam_registro != RECORD.size:
+            self.shm.close()
+            raise ValueError(f"{nombre} no es un bus de telemetría compatible")
+        self.cursor = max(0, cabeza - self.capacidad) if desde_inicio else cabeza
+        self.perdidas = 0
+        self._token = None
+        self._buzon_seq = 0
+        self._timbre = None
+
+    def cabeza(self):
+        return _CABEZA.unpack_from(self.buf, OFFSET_CABEZA)[0]
+
+    def activo(self):
+        """False si el escritor cerró el bus o su proceso ya no existe."""
+        pid = _PID.unpack_from(self.buf, OFFSET_ESCRITOR)[0]
+        return bool(pid) and _proceso_vivo(pid)
+
+    def leer(self, maximo=None):
+        cabeza = self.cabeza()
+        if cabeza - self.cursor > self.capacidad:
+            # Nos pasó el escritor: lo pisado ya no existe
+            self.perdidas += cabeza - self.capacidad - self.cursor
+            self.cursor = cabeza - self.capacidad
+        if maximo is not None:
+            cabeza = min(cabeza, self.cursor + maximo)
+        muestras = []
+        buf = self.buf
+        while self.cursor < cabeza:
+            n = self.cursor
+            offset = OFFSET_ANILLO + (n % self.capacidad) * RECORD.size
+            esperado = 2 * (n // self.capacidad + 1)
+            seq, t_ns, vel, rpm, gear = RECORD.unpack_from(buf, offset)
+            if seq != esperado or _SEQ.unpack_from(buf, offset)[0] != seq:
+                if seq > esperado:
+                    # Pisado mientras leíamos: saltarlo
+                    self.perdidas += 1
+                    self.cursor += 1
+                    continue
+                break  # Aún escribiéndose; queda para la próxima
+            muestras.append((t_ns, vel, rpm, gear.decode()))
+            self.cursor += 1
+        return muestras
+
+    def ultima(self):
+        """La muestra más reciente, sin mover el cursor (None si no hay)."""
+        for _ in range(8):
+            n = self.cabeza() - 1
+            if n < 0:
+                return None
+            offset = OFFSET_ANILLO + (n % self.capacidad) * RECORD.size
+            seq, t_ns, vel, rpm, gear = RECORD.unpack_from(self.buf, offset)
+            if seq == 2 * (n // self.capacidad + 1) and _SEQ.unpack_from(self.buf, offset)[0] == seq:
+                return t_ns, vel, rpm, gear.decode()
+        return None
+
+    def enviar_comando(self, comando, token=None):
+        """
+        Deja un comando (bytes del protocolo del carrito, p. ej. b"a" o b"3")
+        en el buzón. Sin token se lee de ruta_token(nombre). Un comando nuevo
+        reemplaza al anterior si el tablero aún no lo tomó.
+        """
+        if len(comando) > MAX_COMANDO:
+            raise ValueError(f"Comando de más de {MAX_COMANDO} bytes")
+        if token is None:
+            if self._token is None:
+                with open(ruta_token(self.nombre), "rb") as f:
+                    self._token = f.read()
+            token = self._token
+        seq = max(self._buzon_seq, _SEQ.unpack_from(self.buf, OFFSET_BUZON)[0]) | 1
+        _SEQ.pack_into(self.buf, OFFSET_BUZON, seq)
+        BUZON.pack_into(self.buf, OFFSET_BUZON, seq, len(comando), comando, token)
+        self._buzon_seq = seq + 1
+        _SEQ.pack_into(self.buf, OFFSET_BUZON, seq + 1)
+        self._tocar_timbre()
+
+    def _tocar_timbre(self):
+        # Sin escritor escuchando (o sin sockets Unix) el aviso se pierde y
+        # el comando queda en el buzón para el próximo sondeo
+        try:
+            if self._timbre is None:
+                self._timbre = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._timbre.setblocking(False)
+            self._timbre.sendto(b"\0", ruta_timbre(self.nombre))
+        except (AttributeError, OSError):
+            pass
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self._timbre is not None:
+            self._timbre.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
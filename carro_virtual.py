@@ -0,0 +1,262 @@
+"""
+Carrito virtual: imita al Arduino con HC-06 para medir sin el hardware.
+
+Abre un pty (Linux/macOS) o un socket TCP que pyserial puede abrir como
+'socket://host:puerto'. Entiende los mismos comandos de un byte que envía
+el tablero (a, r, i, d, p, 1-7), también en tramas binarias con número de
+secuencia, además de las tramas de acelerador/dirección proporcionales, y transmite telemetría 'VEL=... RPM=...' (o binaria) a la tasa
+pedida, sin superar lo que permite el baud rate simulado. Opcionalmente
+agrega jitter, bytes basura y cortes del enlace.
+
+Uso:
+    python carro_virtual.py --pty
+    python carro_virtual.py --tcp 7777 --rate 100 --binario --basura 0.01
+"""
+import argparse
+import os
+import random
+import selectors
+import socket
+import threading
+import time
+
+from telemetria import (ESCALA_ANALOGICA, SYNC, TIPO_ANALOGICO, TIPO_COMANDO,
+                        empaquetar_confirmacion, empaquetar_telemetria, leer_trama)
+from vehiculo import DT, GEARS, VehicleSim
+
+MOVIMIENTOS = frozenset(b"arp")
+DIRECCION = frozenset(b"id")
+
+class VirtualCar:
+    """
+    Estado y protocolo del carrito virtual, independiente del medio. 'a' y
+    'r' mantienen el acelerador hasta recibir 'p'; los dígitos cambian el
+    engranaje; 'i'/'d' solo quedan registrados como dirección.
+    """
+    def __init__(self, rate=50.0, baud=9600, binario=False, jitter=0.0,
+                 basura=0.0, cortes=0.0, duracion_corte=1.0, seed=None):
+        self.rate = rate            # Muestras/s pedidas; 0 = saturar el enlace
+        self.bytes_por_segundo = baud / 10  # 8N1: 10 bits por byte
+        self.binario = binario
+        self.jitter = jitter
+        self.basura = basura
+        self.cortes = cortes
+        self.duracion_corte = duracion_corte
+        self.random = random.Random(seed)
+        self.sim = VehicleSim("1")
+        self.acelerador = b"p"
+        self.proporcional = 0.0     # Acelerador de la última trama analógica
+        self.direccion = None
+        self.comandos_recibidos = 0
+        self.tramas_enviadas = 0
+        self.bytes_enviados = 0
+        self._entrada = bytearray()
+        self._proxima_muestra = 0.0
+        self._linea_libre = 0.0
+        self._fin_corte = 0.0
+        self._proximo_paso = 0.0
+
+    def en_corte(self, ahora):
+        return ahora < self._fin_corte
+
+    def procesar_entrada(self, data, ahora):
+        """Procesa bytes recibidos; devuelve la respuesta (confirmaciones)."""
+        if self.en_corte(ahora):
+            return b""
+        buffer = self._entrada
+        buffer += data
+        respuesta = bytearray()
+        pos = 0
+        while pos < len(buffer):
+            if buffer[pos] == SYNC:
+                tipo, campos, tam = leer_trama(buffer, pos)
+                if tam == 0:
+                    break
+                if tam < 0 or tipo not in (TIPO_COMANDO, TIPO_ANALOGICO):
+                    pos += 1
+                    continue
+                if tipo == TIPO_COMANDO:
+                    seq, comando = campos
+                    self._aplicar(comando[0])
+                else:
+                    seq, acelerador, direccion = campos
+                    self._aplicar_analogico(acelerador, direccion)
+                respuesta += empaquetar_confirmacion(seq)
+                pos += tam
+            else:
+                self._aplicar(buffer[pos])
+                pos += 1
+        del buffer[:pos]
+        return bytes(respuesta)
+
+    def _aplicar(self, comando):
+        self.comandos_recibidos += 1
+        if comando in MOVIMIENTOS:
+            self.acelerador = bytes((comando,))
+            self.proporcional = 0.0
+        elif comando in DIRECCION:
+            self.direccion = bytes((comando,))
+        elif chr(comando) in GEARS:
+            self.sim.gear = chr(comando)
+            self.sim.speed = min(self.sim.speed, self.sim.limits["maxSpeed"])
+
+    def _aplicar_analogico(self, acelerador, direccion):
+        self.comandos_recibidos += 1
+        self.acelerador = b"p"
+        self.proporcional = acelerador / ESCALA_ANALOGICA
+        self.direccion = b"d" if direccion > 0 else b"i" if direccion < 0 else None
+
+    def avanzar(self, ahora):
+        """Corre la física en pasos fijos hasta 'ahora'."""
+        if not self._proximo_paso:
+            self._proximo_paso = ahora
+        while self._proximo_paso <= ahora:
+            if self.acelerador == b"a":
+                if self.sim.gear == "N":
+                    self.sim.gear = "1"
+                self.sim.accelerate()
+            elif self.acelerador == b"r":
+                self.sim.reverse()
+            elif self.proporcional:
+                if self.sim.gear == "N" and self.proporcional > 0:
+                    self.sim.gear = "1"
+                self.sim.throttle(self.proporcional)
+            self.sim.step()
+            self._proximo_paso += DT
+
+    def trama_pendiente(self, ahora):
+        """
+        Devuelve la próxima trama si ya es momento de enviarla, o b"". Una
+        trama ocupa la línea len/bytes_por_segundo segundos, así que con
+        rate=0 se transmite a saturación del enlace.
+        """
+        if self.cortes and not self.en_corte(ahora) and self.random.random() < self.cortes * DT:
+            self._fin_corte = ahora + self.duracion_corte
+        if self.en_corte(ahora) or ahora < max(self._proxima_muestra, self._linea_libre):
+            return b""
+        self.avanzar(ahora)
+        speed, rpm = int(self.sim.speed), self.sim.rpm
+        trama = empaquetar_telemetria(speed, rpm) if self.binario else b"VEL=%d RPM=%d\n" % (speed, rpm)
+        if self.basura and self.random.random() < self.basura:
+            trama = bytes(self.random.randrange(256) for _ in range(self.random.randint(1, 8))) + trama
+        # Los plazos avanzan desde el anterior (no desde 'ahora') para no perder
+        # tasa por la latencia del bucle; un atraso largo no se recupera en ráfaga
+        self._linea_libre = max(self._linea_libre, ahora - 0.05) + len(trama) / self.bytes_por_segundo
+        if self.rate:
+            self._proxima_muestra = max(self._proxima_muestra, ahora - 0.05) + 1 / self.rate
+            if self.jitter:
+                self._proxima_muestra += self.random.uniform(0, self.jitter)
+        self.tramas_enviadas += 1
+        self.bytes_enviados += len(trama)
+        return trama
+
+    def proxima_espera(self, ahora):
+        return max(0.0, max(self._proxima_muestra, self._linea_libre, self._fin_corte) - ahora)
+
+    def servir(self, leer, escribir, selector, detener):
+        """Bucle de E/S sobre un medio ya abierto (pty o socket conectado)."""
+        while not detener.is_set():
+            ahora = time.monotonic()
+            for _ in selector.select(min(self.proxima_espera(ahora), 0.05)):
+                data = leer()
+                if data is None:
+                    continue
+                if not data:
+                    return  # El otro extremo cerró
+                respuesta = self.procesar_entrada(data, time.monotonic())
+                if respuesta:
+                    escribir(respuesta)
+            while True:
+                trama = self.trama_pendiente(time.monotonic())
+                if not trama:
+                    break
+                escribir(trama)
+
+def abrir_pty():
+    """Crea un par pty en modo crudo; devuelve (fd_maestro, fd_esclavo, ruta_esclavo)."""
+    import tty
+    maestro, esclavo = os.openpty()
+    tty.setraw(esclavo)
+    tty.setraw(maestro)
+    return maestro, esclavo, os.ttyname(esclavo)
+
+def servir_pty(car, detener, al_abrir=None):
+    maestro, esclavo, ruta = abrir_pty()
+    if al_abrir:
+        al_abrir(ruta)
+    # Sin bloqueo: si nadie lee el esclavo los bytes se pierden, como en el aire
+    os.set_blocking(maestro, False)
+    selector = selectors.DefaultSelector()
+    selector.register(maestro, selectors.EVENT_READ)
+
+    def leer():
+        try:
+            return os.read(maestro, 4096)
+        except (BlockingIOError, InterruptedError):
+            return None
+
+    def escribir(data):
+        try:
+            os.write(maestro, data)
+        except BlockingIOError:
+            pass
+
+    try:
+        car.servir(leer, escribir, selector, detener)
+    finally:
+        selector.close()
+        os.close(maestro)
+        os.close(esclavo)
+
+def servir_tcp(car, puerto, detener, host="127.0.0.1", al_abrir=None):
+    """Atiende un cliente a la vez en socket://host:puerto."""
+    with socket.create_server((host, puerto)) as servidor:
+        servidor.settimeout(0.2)
+        if al_abrir:
+            al_abrir(f"socket://{host}:{servidor.getsockname()[1]}")
+        while not detener.is_set():
+            try:
+                conexion, _ = servidor.accept()
+            except socket.timeout:
+                continue
+            with conexion:
+                conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                selector = selectors.DefaultSelector()
+                selector.register(conexion, selectors.EVENT_READ)
+                try:
+                    car.servir(lambda: conexion.recv(4096), conexion.sendall, selector, detener)
+                except OSError:
+                    pass
+                finally:
+                    selector.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Carrito Arduino virtual para pruebas.")
+    medio = parser.add_mutually_exclusive_group(required=True)
+    medio.add_argument("--pty", action="store_true", help="abrir un pseudo-terminal")
+    medio.add_argument("--tcp", type=int, metavar="PUERTO", help="escuchar en socket://127.0.0.1:PUERTO")
+    parser.add_argument("--rate", type=float, default=50, help="muestras por segundo (0 = saturar)")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--binario", action="store_true", help="telemetría en tramas binarias")
+    parser.add_argument("--jitter", type=float, default=0.0, help="retardo aleatorio máximo (s)")
+    parser.add_argument("--basura", type=float, default=0.0, help="probabilidad de bytes basura por trama")
+    parser.add_argument("--cortes", type=float, default=0.0, help="cortes del enlace por segundo")
+    parser.add_argument("--duracion-corte", type=float, default=1.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    car = VirtualCar(args.rate, args.baud, args.binario, args.jitter, args.basura,
+                     args.cortes, args.duracion_corte, args.seed)
+    detener = threading.Event()
+    anunciar = lambda ruta: print(f"Carrito virtual en {ruta}", flush=True)
+    try:
+        if args.pty:
+            servir_pty(car, detener, anunciar)
+        else:
+            servir_tcp(car, args.tcp, detener, al_abrir=anunciar)
+    except KeyboardInterrupt:
+        pass
+    print(f"Tramas enviadas: {car.tramas_enviadas}, comandos recibidos: {car.comandos_recibidos}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import time
+
+# --- Planificador de comandos: estado deseado en lugar de un byte por tecla ---
+
+PARAR = b"p"
+MOVIMIENTOS = frozenset((b"a", b"r", b"i", b"d"))
+
+class CommandScheduler:
+    """
+    Convierte pulsaciones en un estado deseado: qué comandos de movimiento
+    están mantenidos (el último pulsado manda, o 'p' si no hay ninguno) y
+    qué engranaje se quiere. tick() devuelve solo lo que cambió desde el
+    último envío, en un único bloque de bytes, más un keep-alive del
+    movimiento mantenido cada 'keepalive' segundos. Las repeticiones del
+    teclado y las pulsaciones duplicadas no generan escrituras.
+    """
+    def __init__(self, keepalive=0.5):
+        self.keepalive = keepalive
+        self._held = []
+        self._gear = None
+        self._sent_motion = PARAR
+        self._sent_gear = None
+        self._last_send = 0.0
+        self.merged = 0  # Pulsaciones que no necesitaron escritura
+
+    @property
+    def desired(self):
+        return self._held[-1] if self._held else PARAR
+
+    def press(self, comando):
+        """Un comando de movimiento pasa a estar mantenido."""
+        if comando == PARAR:
+            self.stop()
+        elif comando in self._held:
+            self.merged += 1
+        else:
+            self._held.append(comando)
+
+    def release(self, comando):
+        if comando in self._held:
+            self._held.remove(comando)
+
+    def stop(self):
+        self._held.clear()
+
+    def setGear(self, comando):
+        if comando == self._gear:
+            self.merged += 1
+        self._gear = comando
+
+    def pending(self):
+        return self.desired != self._sent_motion or self._gear != self._sent_gear
+
+    def active(self):
+        """True mientras haga falta seguir llamando a tick()."""
+        return bool(self._held) or self.pending()
+
+    def tick(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        salida = b""
+        if self._gear != self._sent_gear:
+            salida += self._gear
+            self._sent_gear = self._gear
+        desired = self.desired
+        if desired != self._sent_motion or (
+                self._held and self.keepalive and now - self._last_send >= self.keepalive):
+            salida += desired
+            self._sent_motion = desired
+        if salida:
+            self._last_send = now
+        return salida
@@ -0,0 +1,71 @@
+import json
+
+from bitacora import bitacora
+
+# --- CONFIGURACIÓN POR DEFECTO ---
+DEFAULT_SETTINGS = {
+    "input": "Input 1",
+    "forward_key": "a",     
+    "backward_key": "r",    
+    "left_key": "i",        
+    "right_key": "d",       
+    "stop_key": "p",        
+    "auto_brake_key": "b",
+    "speed_initial": 0,
+    "theme": "Aero",
+    "luces_direccion_izquierda": "q",
+    "luces_direccion_derecha": "e",
+    "speed_change_key": "c",
+    "render_fps": 60,
+    "needle_animation": True,
+    "record_telemetry": False,
+    "telemetry_bus": False,
+    "telemetry_bus_name": "carrito",
+    "trip_export": True,
+    "web_server": False,
+    "web_host": "0.0.0.0",
+    "web_port": 8765,
+    "web_max_rate": 30,
+    "event_log_level": "info",
+    "event_log_console": True,
+    "event_log_format": "ninguno",
+    "event_log_file": "",
+    "event_log_max_bytes": 1000000,
+    "event_log_backups": 3,
+    "replay_speed": 1,
+    "history_minutes": 5,
+    "default_port": "COM4",
+    "baud_rate": 9600,
+    "link_timeout": 5.0,
+    "latency_instrumentation": False,
+    "latency_overlay": False,
+    "command_tick_ms": 20,
+    "command_keepalive": 0.5,
+    "input_backend": "comandos",
+    "input_rate": 100,
+    "input_deadzone": 0.08,
+    "input_expo": 1.5,
+    "fleet_ports": [],
+    "probe_ports": True,
+    "probe_timeout": 2.0
+}
+
+def load_settings(filename="settings.json"):
+    try:
+        with open(filename, "r") as f:
+            settings = json.load(f)
+        for key, value in DEFAULT_SETTINGS.items():
+            if key not in settings:
+                settings[key] = value
+        return settings
+    except (FileNotFoundError, json.JSONDecodeError):
+        bitacora.aviso("settings_por_defecto", "Error al cargar {archivo}, usando valores por defecto.", archivo=filename)
+        return DEFAULT_SETTINGS.copy()
+
+def save_settings(settings, filename="settings.json"):
+    try:
+        with open(filename, "w") as f:
+            json.dump(settings, f, indent=4)
+        bitacora.info("settings_guardados", "Settings guardados en {archivo}", archivo=filename)
+    except Exception as e:
+        bitacora.error("settings_no_guardados", "Error guardando settings: {error}", error=str(e))
@@ -0,0 +1,156 @@
+from PySide6 import QtWidgets, QtCore
+
+from configuracion import DEFAULT_SETTINGS, save_settings
+
+# --- Ventanas Auxiliares (Ejemplos y Configuración) ---
+class ExamplesWindow(QtWidgets.QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Ejemplos de Código")
+        layout = QtWidgets.QVBoxLayout(self)
+        example_codes = {
+            "Básico": "void setup() { ... }\nvoid loop() { ... }",
+            "Avanzado": "// Ejemplo avanzado..."
+        }
+        self.code_combo = QtWidgets.QComboBox(self)
+        self.code_combo.addItems(example_codes.keys())
+        layout.addWidget(self.code_combo)
+        self.code_text = QtWidgets.QTextEdit(self)
+        self.code_text.setReadOnly(True)
+        self.code_text.setText(example_codes[self.code_combo.currentText()])
+        layout.addWidget(self.code_text)
+        self.code_combo.currentIndexChanged.connect(
+            lambda _: self.code_text.setText(example_codes[self.code_combo.currentText()])
+        )
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+class ConfigWindow(QtWidgets.QDialog):
+    # Se emite con los settings ya guardados, para que las ventanas abiertas los apliquen
+    settingsSaved = QtCore.Signal(dict)
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Configuración")
+        self.settings = settings
+        layout = QtWidgets.QVBoxLayout(self)
+
+        self.input_label = QtWidgets.QLabel("Tecla Input para velocidades:", self)
+        self.input_edit = QtWidgets.QLineEdit(self)
+        self.input_edit.setText(self.settings.get("input", "Input 1"))
+        layout.addWidget(self.input_label)
+        layout.addWidget(self.input_edit)
+
+        self.speed_init_label = QtWidgets.QLabel("Velocidad Inicial:", self)
+        self.speed_init_edit = QtWidgets.QLineEdit(self)
+        self.speed_init_edit.setText(str(self.settings.get("speed_initial", 0)))
+        layout.addWidget(self.speed_init_label)
+        layout.addWidget(self.speed_init_edit)
+
+        self.auto_brake_label = QtWidgets.QLabel("Tecla para Freno Automático:", self)
+        self.auto_brake_edit = QtWidgets.QLineEdit(self)
+        self.auto_brake_edit.setText(self.settings.get("auto_brake_key", "b"))
+        layout.addWidget(self.auto_brake_label)
+        layout.addWidget(self.auto_brake_edit)
+
+        self.speed_change_label = QtWidgets.QLabel("Tecla para cambiar Velocidades:", self)
+        self.speed_change_edit = QtWidgets.QLineEdit(self)
+        self.speed_change_edit.setText(self.settings.get("speed_change_key", "c"))
+        layout.addWidget(self.speed_change_label)
+        layout.addWidget(self.speed_change_edit)
+
+        self.render_fps_label = QtWidgets.QLabel("Cuadros por segundo del tablero:", self)
+        self.render_fps_combo = QtWidgets.QComboBox(self)
+        self.render_fps_combo.addItems(["30", "60"])
+        self.render_fps_combo.setCurrentText(str(self.settings.get("render_fps", 60)))
+        layout.addWidget(self.render_fps_label)
+        layout.addWidget(self.render_fps_combo)
+
+        self.record_check = QtWidgets.QCheckBox("Grabar telemetría en modo real", self)
+        self.record_check.setChecked(bool(self.settings.get("record_telemetry", False)))
+        layout.addWidget(self.record_check)
+        self.bus_check = QtWidgets.QCheckBox("Publicar telemetría a otros programas (memoria compartida)", self)
+        self.bus_check.setChecked(bool(self.settings.get("telemetry_bus", False)))
+        layout.addWidget(self.bus_check)
+        self.web_check = QtWidgets.QCheckBox("Servidor web de telemetría (ver la sesión desde otras máquinas)", self)
+        self.web_check.setChecked(bool(self.settings.get("web_server", False)))
+        layout.addWidget(self.web_check)
+
+        self.replay_speed_label = QtWidgets.QLabel("Velocidad de reproducción:", self)
+        self.replay_speed_combo = QtWidgets.QComboBox(self)
+        self.replay_speed_combo.addItems(["1", "2", "4", "8", "16"])
+        self.replay_speed_combo.setCurrentText(str(self.settings.get("replay_speed", 1)))
+        layout.addWidget(self.replay_speed_label)
+        layout.addWidget(self.replay_speed_combo)
+
+        # "comandos" es el control clásico de un byte por tecla; el resto envía
+        # acelerador y dirección proporcionales
+        self.input_backend_label = QtWidgets.QLabel("Entrada de control:", self)
+        self.input_backend_combo = QtWidgets.QComboBox(self)
+        self.input_backend_combo.addItems(["comandos", "teclado", "evdev", "sdl"])
+        self.input_backend_combo.setCurrentText(self.settings.get("input_backend", "comandos"))
+        layout.addWidget(self.input_backend_label)
+        layout.addWidget(self.input_backend_combo)
+
+        self.event_log_label = QtWidgets.QLabel("Bitácora de eventos (archivo / nivel):", self)
+        self.event_log_format_combo = QtWidgets.QComboBox(self)
+        self.event_log_format_combo.addItems(["ninguno", "jsonl", "binario"])
+        self.event_log_format_combo.setCurrentText(self.settings.get("event_log_format", "ninguno"))
+        self.event_log_level_combo = QtWidgets.QComboBox(self)
+        self.event_log_level_combo.addItems(["debug", "info", "aviso", "error"])
+        self.event_log_level_combo.setCurrentText(self.settings.get("event_log_level", "info"))
+        layout.addWidget(self.event_log_label)
+        layout.addWidget(self.event_log_format_combo)
+        layout.addWidget(self.event_log_level_combo)
+
+        def addSection(label_text, key_name):
+            lbl = QtWidgets.QLabel(f"{label_text}:", self)
+            le = QtWidgets.QLineEdit(self)
+            le.setText(self.settings.get(key_name, ""))
+            btn = QtWidgets.QPushButton("Cambiar", self)
+            btn.clicked.connect(lambda: self.setKey(label_text, key_name, le))
+            hbox = QtWidgets.QHBoxLayout()
+            hbox.addWidget(lbl)
+            hbox.addWidget(le)
+            hbox.addWidget(btn)
+            layout.addLayout(hbox)
+
+        addSection("Adelante", "forward_key")
+        addSection("Atrás", "backward_key")
+        addSection("Izquierda", "left_key")
+        addSection("Derecha", "right_key")
+        addSection("Parar", "stop_key")
+        addSection("Luz Izquierda", "luces_direccion_izquierda")
+        addSection("Luz Derecha", "luces_direccion_derecha")
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Save | QtWidgets.QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def setKey(self, label_text, key_name, widget):
+        key, ok = QtWidgets.QInputDialog.getText(self, f"Asigna tecla para {label_text}", "Presiona la tecla:")
+        if ok and key:
+            widget.setText(key)
+            self.settings[key_name] = key
+
+    def accept(self):
+        self.settings["input"] = self.input_edit.text()
+        try:
+            self.settings["speed_initial"] = int(self.speed_init_edit.text())
+        except ValueError:
+            self.settings["speed_initial"] = DEFAULT_SETTINGS["speed_initial"]
+        self.settings["auto_brake_key"] = self.auto_brake_edit.text()
+        self.settings["speed_change_key"] = self.speed_change_edit.text()
+        self.settings["render_fps"] = int(self.render_fps_combo.currentText())
+        self.settings["record_telemetry"] = self.record_check.isChecked()
+        self.settings["telemetry_bus"] = self.bus_check.isChecked()
+        self.settings["web_server"] = self.web_check.isChecked()
+        self.settings["replay_speed"] = int(self.replay_speed_combo.currentText())
+        self.settings["input_backend"] = self.input_backend_combo.currentText()
+        self.settings["event_log_format"] = self.event_log_format_combo.currentText()
+        self.settings["event_log_level"] = self.event_log_level_combo.currentText()
+        save_settings(self.settings)
+        self.settingsSaved.emit(self.settings)
+        super().accept()
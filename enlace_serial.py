@@ -0,0 +1,114 @@
+import collections
+import queue
+import threading
+import time
+
+from latencia import ETAPA_TECLA_SERIAL
+from telemetria import CommandEncoder, Muestra, TelemetryParser
+
+# --- Enlace serial: lectura y escritura fuera del hilo de la interfaz ---
+
+class SerialWorker:
+    """
+    Es dueño del puerto serial ya abierto. Un hilo lector entrega cada
+    muestra (texto 'VEL=<valor> RPM=<valor>' o trama binaria) a
+    on_muestra(vel, rpm) y un hilo escritor envía los comandos encolados
+    con enviar() apenas llegan.
+    Los callbacks se ejecutan en el hilo lector: la interfaz debe
+    reenviarlos a su propio hilo (p. ej. con una señal Qt encolada).
+
+    Con latency (un LatencyRecorder) se mide cada comando desde el t0 dado a
+    enviar() hasta su write(), y el instante de lectura de cada muestra queda
+    en 'arribos', en el mismo orden en que se llama a on_muestra.
+    """
+    def __init__(self, serialConnection, on_muestra, on_error=None, read_timeout=0.05):
+        self.serialConnection = serialConnection
+        self.on_muestra = on_muestra
+        self.on_error = on_error
+        # SimpleQueue no usa locks de Python en put/get (implementada en C)
+        self.comandos = queue.SimpleQueue()
+        self.parser = TelemetryParser()
+        self.encoder = CommandEncoder()
+        self.latency = None
+        self.arribos = collections.deque(maxlen=1024)
+        self._detener = threading.Event()
+        # Timeout corto para que el lector revise _detener con frecuencia
+        self.serialConnection.timeout = read_timeout
+        self._lector = threading.Thread(target=self._leer, name="SerialReader", daemon=True)
+        self._escritor = threading.Thread(target=self._escribir, name="SerialWriter", daemon=True)
+
+    def start(self):
+        self._lector.start()
+        self._escritor.start()
+
+    def stop(self, timeout=1.0):
+        self._detener.set()
+        self.comandos.put(None)  # Despierta al escritor
+        for hilo in (self._lector, self._escritor):
+            if hilo.is_alive():
+                hilo.join(timeout)
+
+    def enviar(self, comando, t0=None):
+        """Encola bytes (o un ComandoAnalogico) para el Arduino; nunca bloquea al llamador."""
+        self.comandos.put(comando if t0 is None else (comando, t0))
+
+    def _reportar_error(self, contexto, e):
+        if self.on_error:
+            self.on_error(f"{contexto}: {e}")
+
+    def _escribir(self):
+        # Termina con el None de stop(), no con _detener: lo encolado antes
+        # (p. ej. el 'p' al cerrar el tablero) se escribe igual
+        fin = False
+        while not fin:
+            comando = self.comandos.get()
+            if comando is None:
+                break
+            # Juntar lo que ya esté en cola en un solo write()
+            pendientes = [comando]
+            try:
+                while True:
+                    siguiente = self.comandos.get_nowait()
+                    if siguiente is None:
+                        fin = True
+                        break
+                    pendientes.append(siguiente)
+            except queue.Empty:
+                pass
+            marcas = [p[1] for p in pendientes if p.__class__ is tuple]
+            if marcas:
+                pendientes = [p[0] if p.__class__ is tuple else p for p in pendientes]
+            data = self.encoder.codificar_lote(pendientes)
+            if not data:
+                continue  # Comandos analógicos que no cambian nada en modo texto
+            try:
+                self.serialConnection.write(data)
+            except Exception as e:
+                self._reportar_error("Error escribiendo al serial", e)
+                continue
+            if marcas and self.latency:
+                ahora = time.monotonic_ns()
+                for t0 in marcas:
+                    self.latency.record(ETAPA_TECLA_SERIAL, ahora - t0)
+
+    def _leer(self):
+        while not self._detener.is_set():
+            try:
+                data = self.serialConnection.read(self.serialConnection.in_waiting or 1)
+            except Exception as e:
+                self._reportar_error("Error leyendo datos serial", e)
+                break
+            if not data:
+                continue
+            leido = time.monotonic_ns() if self.latency else 0
+            for registro in self.parser.feed(data):
+                if registro.__class__ is Muestra:
+                    if leido:
+                        self.arribos.append(leido)
+                    self.on_muestra(registro.vel, registro.rpm)
+                else:
+                    perdidos = self.encoder.confirmar(registro.seq)
+                    if perdidos:
+                        self._reportar_error("Comandos perdidos", perdidos)
+            # Si el Arduino habla el protocolo binario, los comandos también
+            self.encoder.binario = self.parser.binario
@@ -0,0 +1,283 @@
+import abc
+import math
+import os
+import threading
+import time
+
+from telemetria import ESCALA_ANALOGICA, ComandoAnalogico
+
+# --- Entrada proporcional: backends intercambiables y muestreo a tasa fija ---
+#
+# Un backend solo sabe leer su dispositivo: poll() devuelve (acelerador,
+# dirección) crudos en [-1, 1] y nunca bloquea. InputSampler lo muestrea en
+# su propio hilo a tasa fija, aplica zona muerta y curva, cuantiza a int8 y
+# entrega un ComandoAnalogico solo cuando cambia (más un keep-alive), así la
+# interfaz no hace ningún trabajo por muestra.
+
+def acondicionar(valor, zona_muerta=0.08, expo=1.5):
+    """
+    Recorta a [-1, 1], anula la zona muerta alrededor del centro y reescala
+    el resto para que la salida arranque en 0 justo al salir de ella. Con
+    expo > 1 la respuesta es más fina cerca del centro.
+    """
+    magnitud = abs(valor)
+    if magnitud <= zona_muerta:
+        return 0.0
+    magnitud = min(1.0, (magnitud - zona_muerta) / (1.0 - zona_muerta))
+    return math.copysign(magnitud ** expo, valor)
+
+class InputBackend(abc.ABC):
+    """Interfaz común de los backends de entrada; cada uno implementa poll()."""
+    nombre = ""
+
+    def open(self):
+        pass
+
+    @abc.abstractmethod
+    def poll(self):
+        """Devuelve (acelerador, dirección) en [-1, 1]; nunca bloquea."""
+
+    def close(self):
+        pass
+
+class KeyboardBackend(InputBackend):
+    """
+    Teclado como eje: las teclas de movimiento mantenidas fijan el objetivo
+    (±1) y el valor se acerca a él en 'rampa' segundos, así una pulsación
+    corta da un acelerador parcial. press()/release() se llaman desde el
+    hilo de la interfaz y solo tocan un dict de teclas mantenidas.
+    """
+    nombre = "teclado"
+    _EJES = {b"a": (0, 1), b"r": (0, -1), b"d": (1, 1), b"i": (1, -1)}
+
+    def __init__(self, rampa=0.4):
+        self.rampa = rampa
+        self._mantenidos = {}
+        self._valores = [0.0, 0.0]
+        self._ultimo = None
+
+    def press(self, comando):
+        if comando == b"p":
+            self._mantenidos.clear()
+            self._valores[0] = 0.0
+        elif comando in self._EJES:
+            self._mantenidos[comando] = True
+
+    def release(self, comando):
+        self._mantenidos.pop(comando, None)
+
+    def poll(self):
+        ahora = time.monotonic()
+        paso = 1.0 if self._ultimo is None or not self.rampa else (ahora - self._ultimo) / self.rampa
+        self._ultimo = ahora
+        objetivos = [0, 0]
+        for comando in list(self._mantenidos):
+            eje, signo = self._EJES[comando]
+            objetivos[eje] += signo
+        for eje, objetivo in enumerate(objetivos):
+            valor = self._valores[eje]
+            self._valores[eje] = min(valor + paso, objetivo) if objetivo > valor else max(valor - paso, objetivo)
+        return self._valores[0], self._valores[1]
+
+class EvdevBackend(InputBackend):
+    """
+    Joystick o gamepad en Linux vía python-evdev (dependencia opcional). Lee
+    la posición actual de cada eje con un ioctl (absinfo), sin consumir la
+    cola de eventos, así que poll() nunca bloquea. Por defecto usa el
+    stick izquierdo: ABS_Y (invertido) acelera y ABS_X dirige.
+    """
+    nombre = "evdev"
+
+    def __init__(self, ruta=None, eje_acelerador="ABS_Y", eje_direccion="ABS_X", invertir_acelerador=True):
+        self.ruta = ruta
+        self.eje_acelerador = eje_acelerador
+        self.eje_direccion = eje_direccion
+        self.invertir_acelerador = invertir_acelerador
+        self.device = None
+
+    def open(self):
+        import evdev
+        codigos = (evdev.ecodes.ecodes[self.eje_acelerador], evdev.ecodes.ecodes[self.eje_direccion])
+        rutas = [self.ruta] if self.ruta else evdev.list_devices()
+        for ruta in rutas:
+            device = evdev.InputDevice(ruta)
+            ejes = dict(device.capabilities().get(evdev.ecodes.EV_ABS, []))
+            if all(codigo in ejes for codigo in codigos):
+                self.device = device
+                self._codigos = codigos
+                return
+            device.close()
+        raise OSError(f"No hay un dispositivo con ejes {self.eje_acelerador} y {self.eje_direccion}")
+
+    def _normalizar(self, codigo):
+        info = self.device.absinfo(codigo)
+        centro = (info.max + info.min) / 2
+        return (info.value - centro) / ((info.max - info.min) / 2 or 1)
+
+    def poll(self):
+        acelerador = self._normalizar(self._codigos[0])
+        if self.invertir_acelerador:
+            acelerador = -acelerador
+        return acelerador, self._normalizar(self._codigos[1])
+
+    def close(self):
+        if self.device:
+            self.device.close()
+
+class SDLBackend(InputBackend):
+    """
+    Joystick vía SDL2 usando pygame (dependencia opcional), para Windows y
+    macOS. pygame.event.pump() actualiza los ejes sin esperar eventos.
+    """
+    nombre = "sdl"
+
+    def __init__(self, indice=0, eje_acelerador=1, eje_direccion=0, invertir_acelerador=True):
+        self.indice = indice
+        self.eje_acelerador = eje_acelerador
+        self.eje_direccion = eje_direccion
+        self.invertir_acelerador = invertir_acelerador
+        self.joystick = None
+
+    def open(self):
+        # Sin ventana propia: SDL solo hace falta para el joystick
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_JOYSTICK_ALLOW_BACKGROUND_EVENTS", "1")
+        import pygame
+        self._pygame = pygame
+        pygame.display.init()
+        pygame.joystick.init()
+        if pygame.joystick.get_count() <= self.indice:
+            raise OSError("No se encontró ningún joystick")
+        self.joystick = pygame.joystick.Joystick(self.indice)
+
+    def poll(self):
+        self._pygame.event.pump()
+        acelerador = self.joystick.get_axis(self.eje_acelerador)
+        if self.invertir_acelerador:
+            acelerador = -acelerador
+        return acelerador, self.joystick.get_axis(self.eje_direccion)
+
+    def close(self):
+        if self.joystick:
+            self._pygame.joystick.quit()
+            self._pygame.display.quit()
+
+class ScriptedBackend(InputBackend):
+    """
+    Reproduce una secuencia [(t, acelerador, dirección), ...] con t en
+    segundos desde open(); entre puntos interpola linealmente. Sirve para
+    pruebas y benchmarks reproducibles sin hardware; no está en BACKENDS
+    porque necesita la secuencia y no se elige desde la configuración.
+    """
+    nombre = "script"
+
+    def __init__(self, pasos, reloj=time.monotonic):
+        self.pasos = sorted(pasos)
+        self.reloj = reloj
+        self._inicio = None
+
+    def open(self):
+        self._inicio = self.reloj()
+
+    def poll(self):
+        if self._inicio is None:
+            self.open()
+        t = self.reloj() - self._inicio
+        anterior = None
+        for paso in self.pasos:
+            if paso[0] >= t:
+                if anterior is None:
+                    return paso[1], paso[2]
+                fraccion = (t - anterior[0]) / ((paso[0] - anterior[0]) or 1)
+                return (anterior[1] + (paso[1] - anterior[1]) * fraccion,
+                        anterior[2] + (paso[2] - anterior[2]) * fraccion)
+            anterior = paso
+        return (anterior[1], anterior[2]) if anterior else (0.0, 0.0)
+
+    @property
+    def terminado(self):
+        return self._inicio is not None and (not self.pasos or self.reloj() - self._inicio > self.pasos[-1][0])
+
+# Backends elegibles con settings["input_backend"]; se construyen sin argumentos
+BACKENDS = {
+    KeyboardBackend.nombre: KeyboardBackend,
+    EvdevBackend.nombre: EvdevBackend,
+    SDLBackend.nombre: SDLBackend,
+}
+
+class InputSampler:
+    """
+    Muestrea un backend a 'rate' Hz en un hilo propio con plazos fijos (no
+    acumula deriva) y llama a enviar(ComandoAnalogico) cuando el valor
+    cuantizado cambia, o cada 'keepalive' segundos si no está en reposo.
+    enviar debe ser no bloqueante (SerialWorker.enviar o el transporte).
+    Los errores del dispositivo se reportan una vez por on_error y el hilo
+    termina enviando un comando neutro, para no dejar el carrito acelerando.
+    """
+    def __init__(self, backend, enviar, rate=100, zona_muerta=0.08, expo=1.5,
+                 keepalive=0.5, on_error=None):
+        self.backend = backend
+        self.enviar = enviar
+        self.periodo = 1.0 / rate
+        self.zona_muerta = zona_muerta
+        self.expo = expo
+        self.keepalive = keepalive
+        self.on_error = on_error
+        self.ultimo = ComandoAnalogico(0, 0)
+        self.muestras = 0
+        self.enviados = 0
+        self.atrasos = 0  # Plazos perdidos (el hilo no llegó a tiempo)
+        self._ultimo_envio = 0.0
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._correr, name="InputSampler", daemon=True)
+
+    def start(self):
+        self._hilo.start()
+
+    def stop(self, timeout=1.0):
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout)
+
+    def muestrear(self, ahora):
+        """Una muestra: lee, acondiciona y envía si corresponde."""
+        acelerador, direccion = self.backend.poll()
+        comando = ComandoAnalogico(
+            round(acondicionar(acelerador, self.zona_muerta, self.expo) * ESCALA_ANALOGICA),
+            round(acondicionar(direccion, self.zona_muerta, self.expo) * ESCALA_ANALOGICA))
+        self.muestras += 1
+        en_reposo = not comando.acelerador and not comando.direccion
+        if comando != self.ultimo or (
+                not en_reposo and self.keepalive and ahora - self._ultimo_envio >= self.keepalive):
+            self.enviar(comando)
+            self.ultimo = comando
+            self._ultimo_envio = ahora
+            self.enviados += 1
+
+    def _correr(self):
+        try:
+            self.backend.open()
+        except Exception as e:
+            if self.on_error:
+                self.on_error(f"No se pudo abrir la entrada {self.backend.nombre}: {e}")
+            return
+        plazo = time.monotonic()
+        try:
+            while not self._detener.is_set():
+                ahora = time.monotonic()
+                self.muestrear(ahora)
+                plazo += self.periodo
+                espera = plazo - time.monotonic()
+                if espera < 0:
+                    # Atrasado: saltar los plazos perdidos en vez de muestrear en ráfaga
+                    self.atrasos += 1
+                    plazo = time.monotonic()
+                else:
+                    self._detener.wait(espera)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(f"Error leyendo la entrada {self.backend.nombre}: {e}")
+        finally:
+            if self.ultimo.acelerador or self.ultimo.direccion:
+                self.enviar(ComandoAnalogico(0, 0))
+            self.backend.close()
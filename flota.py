@@ -0,0 +1,63 @@
+import os
+from functools import partial
+
+import serial
+
+from comandos import CommandScheduler
+from transporte import AsyncSerialTransport, SerialLoop
+
+# --- Flota: varios carritos a la vez sobre un único event loop ---
+
+class Fleet:
+    """
+    Un AsyncSerialTransport y un CommandScheduler por carrito, todos sobre
+    el mismo SerialLoop: en POSIX las lecturas de toda la flota esperan en un
+    único selector, y un solo tick() envía los comandos pendientes de todos
+    los carritos en lugar de un timer por carrito.
+    Los callbacks reciben primero el índice del carrito y corren en el hilo
+    del loop, igual que los de AsyncSerialTransport.
+    """
+    def __init__(self, puertos, baudrate=9600, on_muestra=None, on_error=None, on_estado=None,
+                 heartbeat_timeout=5.0, keepalive=0.5, opener=serial.serial_for_url):
+        self.puertos = list(puertos)
+        n = len(self.puertos)
+        # Las aperturas (lentas con Bluetooth) van en paralelo; en Windows
+        # además cada carrito mantiene un hilo bloqueado en read()
+        hilos = n + 2 if os.name == "posix" else 2 * n + 2
+        self.serial_loop = SerialLoop(max_workers=hilos)
+        self.transportes = []
+        for i, puerto in enumerate(self.puertos):
+            self.transportes.append(AsyncSerialTransport(
+                puerto, baudrate,
+                on_muestra=partial(on_muestra, i) if on_muestra else None,
+                on_error=partial(on_error, i) if on_error else None,
+                on_estado=partial(on_estado, i) if on_estado else None,
+                heartbeat_timeout=heartbeat_timeout, opener=opener,
+                serial_loop=self.serial_loop))
+        self.comandos = [CommandScheduler(keepalive=keepalive) for _ in self.puertos]
+
+    def __len__(self):
+        return len(self.puertos)
+
+    def start(self):
+        for transporte in self.transportes:
+            transporte.start()
+
+    def stop(self, timeout=2.0):
+        # Dejar todos los carritos detenidos antes de soltar los enlaces
+        for comandos in self.comandos:
+            comandos.stop()
+        self.tick()
+        for transporte in self.transportes:
+            transporte.stop(timeout)
+        self.serial_loop.stop(timeout)
+
+    def tick(self, now=None):
+        """Envía lo pendiente de cada carrito; True mientras alguno siga activo."""
+        activo = False
+        for transporte, comandos in zip(self.transportes, self.comandos):
+            salida = comandos.tick(now)
+            if salida:
+                transporte.enviar(salida)
+            activo = activo or comandos.active()
+        return activo
@@ -0,0 +1,71 @@
+import numpy as np
+
+# --- Historial de telemetría: buffer circular preasignado ---
+
+class TelemetryHistory:
+    """
+    Guarda las últimas 'capacity' muestras (tiempo, velocidad, RPM) en arrays
+    NumPy preasignados. append() es O(1) y no crea arrays: solo escribe en la
+    posición siguiente. envelope() resume una ventana de tiempo en columnas
+    con mínimo y máximo por columna, todo vectorizado, para que el gráfico
+    dibuje siempre la misma cantidad de columnas sin importar el largo.
+    """
+    CHANNELS = ("speed", "rpm")
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._t = np.zeros(self.capacity, dtype=np.float64)
+        self._data = {canal: np.zeros(self.capacity, dtype=np.float32) for canal in self.CHANNELS}
+        self._speed = self._data["speed"]
+        self._rpm = self._data["rpm"]
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, t, speed, rpm):
+        i = self._next
+        self._t[i] = t
+        self._speed[i] = speed
+        self._rpm[i] = rpm
+        self._next = i + 1 if i + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _ordered(self, array):
+        # Vista sin copia si el buffer aún no dio la vuelta
+        if self._count < self.capacity:
+            return array[:self._count]
+        return np.concatenate((array[self._next:], array[:self._next]))
+
+    def last(self, channel):
+        if not self._count:
+            return None
+        return float(self._data[channel][self._next - 1])
+
+    def envelope(self, channel, columns, window, now):
+        """
+        Devuelve (mínimos, máximos) de 'channel' en 'columns' columnas que
+        cubren los últimos 'window' segundos hasta 'now'. Las columnas sin
+        muestras quedan en NaN.
+        """
+        mins = np.full(columns, np.nan, dtype=np.float32)
+        maxs = np.full(columns, np.nan, dtype=np.float32)
+        if not self._count:
+            return mins, maxs
+        t = self._ordered(self._t)
+        values = self._ordered(self._data[channel])
+        bordes = now - window + (np.arange(columns + 1) * (window / columns))
+        indices = np.searchsorted(t, bordes)
+        inicio, fin = indices[:-1], indices[1:]
+        llenas = fin > inicio
+        if not llenas.any():
+            return mins, maxs
+        # reduceat necesita índices válidos; se resume solo desde columnas con datos
+        inicios = inicio[llenas]
+        tramo = values[inicios[0]:fin[llenas][-1]]
+        relativos = inicios - inicios[0]
+        mins[llenas] = np.minimum.reduceat(tramo, relativos)
+        maxs[llenas] = np.maximum.reduceat(tramo, relativos)
+        return mins, maxs
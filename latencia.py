@@ -0,0 +1,98 @@
+import json
+import threading
+
+# --- Instrumentación de latencias en el camino crítico ---
+#
+# Las etapas se miden con time.monotonic_ns() y se acumulan en histogramas
+# logarítmico-lineales tipo HDR: memoria fija, record() O(1) y ~3% de
+# resolución en cualquier escala (de µs a segundos). Cuando la
+# instrumentación está apagada los llamadores no crean ninguna instancia y
+# solo pagan un "if" sobre un atributo en None.
+
+ETAPA_TECLA_SERIAL = "tecla→serial"    # KeyPress en eventFilter hasta write()
+ETAPA_SERIAL_UI = "serial→ui"          # bytes leídos hasta updateFromSerial
+ETAPA_SERIAL_PIXEL = "serial→pixel"    # bytes leídos hasta el repintado del indicador
+ETAPA_PINTADO = "pintado"              # duración de GaugeWidget.paintEvent
+
+class LatencyHistogram:
+    # Valores < 64 ns exactos; luego 32 sub-buckets por potencia de 2
+    SUB_BUCKETS = 32
+    _EXACTOS = 2 * SUB_BUCKETS
+
+    def __init__(self):
+        self.counts = [0] * (self._EXACTOS + 58 * self.SUB_BUCKETS)
+        self.count = 0
+        self.max = 0
+        self.total = 0
+
+    def _indice(self, valor):
+        if valor < self._EXACTOS:
+            return valor
+        shift = valor.bit_length() - 6
+        return self._EXACTOS + (shift - 1) * self.SUB_BUCKETS + (valor >> shift) - self.SUB_BUCKETS
+
+    def _valor(self, indice):
+        # Punto medio del bucket
+        if indice < self._EXACTOS:
+            return indice
+        shift = (indice - self._EXACTOS) // self.SUB_BUCKETS + 1
+        mantisa = (indice - self._EXACTOS) % self.SUB_BUCKETS + self.SUB_BUCKETS
+        return (mantisa << shift) + (1 << (shift - 1))
+
+    def record(self, valor_ns):
+        if valor_ns < 0:
+            valor_ns = 0
+        self.counts[self._indice(valor_ns)] += 1
+        self.count += 1
+        self.total += valor_ns
+        if valor_ns > self.max:
+            self.max = valor_ns
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        objetivo = max(1, -(-self.count * p // 100))
+        acumulado = 0
+        for indice, cantidad in enumerate(self.counts):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(self._valor(indice), self.max)
+        return self.max
+
+class LatencyRecorder:
+    """Conjunto de histogramas por etapa, seguro entre hilos."""
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, etapa, valor_ns):
+        with self._lock:
+            histograma = self.stages.get(etapa)
+            if histograma is None:
+                histograma = self.stages[etapa] = LatencyHistogram()
+            histograma.record(valor_ns)
+
+    def summary(self):
+        """Devuelve {etapa: {count, p50_us, p99_us, max_us, mean_us}}."""
+        with self._lock:
+            return {
+                etapa: {
+                    "count": h.count,
+                    "p50_us": h.percentile(50) / 1000,
+                    "p99_us": h.percentile(99) / 1000,
+                    "max_us": h.max / 1000,
+                    "mean_us": h.total / h.count / 1000 if h.count else 0.0,
+                }
+                for etapa, h in self.stages.items()
+            }
+
+    def text(self):
+        lineas = []
+        for etapa, r in self.summary().items():
+            lineas.append(f"{etapa:<13} p50 {r['p50_us']:>8.0f} µs  p99 {r['p99_us']:>8.0f} µs  "
+                          f"max {r['max_us']:>8.0f} µs  n={r['count']}")
+        return "\n".join(lineas) or "Sin mediciones"
+
+    def export(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.summary(), f, indent=4, ensure_ascii=False)
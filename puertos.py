@@ -0,0 +1,195 @@
+import os
+import select
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+import serial.tools.list_ports
+
+from telemetria import Muestra, TelemetryParser
+
+# --- Descubrimiento de puertos en segundo plano ---
+#
+# comports() puede tardar segundos con muchos puertos Bluetooth virtuales, así
+# que se enumera en un hilo propio y se guarda el resultado: el botón de
+# conectar solo lee la caché. En Linux el hilo duerme sobre inotify en /dev y
+# vuelve a enumerar solo cuando aparece o desaparece un dispositivo; en otros
+# sistemas enumera cada 'intervalo' segundos. Los candidatos nuevos se
+# sondean en paralelo escuchando su telemetría para confirmar que son un carrito.
+
+# Textos que delatan un módulo HC-05/HC-06 o un puerto serie sobre Bluetooth
+MARCAS_BLUETOOTH = ("HC-06", "HC-05", "Bluetooth", "BTHENUM")
+
+def es_puerto_bluetooth(puerto):
+    """True si el puerto de list_ports parece un módulo HC-06/HC-05."""
+    if os.path.basename(puerto.device).startswith("rfcomm"):
+        return True
+    textos = (puerto.description, puerto.hwid, puerto.manufacturer, puerto.product)
+    return any(marca in texto for texto in textos if texto for marca in MARCAS_BLUETOOTH)
+
+def encontrar_puertos_bluetooth():
+    """Todos los puertos que coinciden, en el orden de comports(). Enumera en el momento."""
+    return [puerto.device for puerto in serial.tools.list_ports.comports() if es_puerto_bluetooth(puerto)]
+
+def sondear(puerto, baudrate=9600, timeout=2.0, opener=serial.serial_for_url):
+    """
+    Confirma que en 'puerto' hay un carrito: True si en 'timeout' segundos
+    llega una muestra de telemetría válida (texto o binaria). Solo escucha,
+    no envía comandos que puedan mover el carrito.
+    """
+    parser = TelemetryParser()
+    limite = time.monotonic() + timeout
+    try:
+        with opener(puerto, baudrate=baudrate, timeout=0.1) as ser:
+            while time.monotonic() < limite:
+                data = ser.read(ser.in_waiting or 1)
+                if data and any(registro.__class__ is Muestra for registro in parser.feed(data)):
+                    return True
+    except (serial.SerialException, OSError, ValueError):
+        pass
+    return False
+
+def _inotify_dev():
+    """Descriptor de inotify que vigila altas y bajas en /dev, o None si no hay inotify."""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    # IN_ATTRIB porque udev ajusta los permisos después de crear el nodo
+    IN_ATTRIB, IN_CREATE, IN_DELETE = 0x004, 0x100, 0x200
+    if libc.inotify_add_watch(fd, b"/dev", IN_ATTRIB | IN_CREATE | IN_DELETE) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+class PortDiscovery:
+    """
+    Mantiene en caché los puertos candidatos (ver es_puerto_bluetooth) y los
+    confirmados por sondear(). candidatos y confirmados son tuplas que se
+    reemplazan enteras, así que se pueden leer desde cualquier hilo sin
+    locks. on_cambio(discovery) se llama desde el hilo de descubrimiento
+    cada vez que alguna de las dos cambia.
+    """
+    def __init__(self, baudrate=9600, sondeo=True, timeout_sondeo=2.0, intervalo=3.0,
+                 on_cambio=None, max_sondeos=8, opener=serial.serial_for_url):
+        self.baudrate = baudrate
+        self.sondeo = sondeo
+        self.timeout_sondeo = timeout_sondeo
+        self.intervalo = intervalo
+        self.on_cambio = on_cambio
+        self.opener = opener
+        self.candidatos = ()
+        self.confirmados = ()
+        self.enumeraciones = 0
+        self._sondeados = {}  # puerto -> True/False, hasta que desaparezca
+        self._resondear = False
+        self._forzar = threading.Event()
+        self._detener = threading.Event()
+        self._enumerado = threading.Event()
+        self._listo = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_sondeos, thread_name_prefix="PortProbe")
+        self._hilo = threading.Thread(target=self._correr, name="PortDiscovery", daemon=True)
+
+    def start(self):
+        self._hilo.start()
+
+    def stop(self, timeout=1.0):
+        self._detener.set()
+        self._forzar.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def refrescar(self):
+        """
+        Pide otra enumeración sin esperar a que termine, volviendo a sondear
+        los candidatos que no respondieron (p. ej. un carrito que estaba apagado).
+        """
+        self._resondear = True
+        self._forzar.set()
+
+    def esperar(self, timeout=None, sondeos=True):
+        """
+        Espera a la primera enumeración; True si ya terminó. Con sondeos=False
+        no espera a que se confirmen los candidatos, que se publican antes.
+        """
+        return (self._listo if sondeos else self._enumerado).wait(timeout)
+
+    def puertos(self):
+        """Carritos confirmados, o los candidatos si aún no se confirmó ninguno."""
+        return list(self.confirmados or self.candidatos)
+
+    def mejor_puerto(self):
+        puertos = self.confirmados or self.candidatos
+        return puertos[0] if puertos else None
+
+    def _correr(self):
+        fd = _inotify_dev()
+        try:
+            while not self._detener.is_set():
+                self._escanear()
+                self._listo.set()
+                self._esperar_cambio(fd)
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _esperar_cambio(self, fd):
+        if fd is None:
+            self._forzar.wait(self.intervalo)
+            self._forzar.clear()
+            return
+        # Con inotify se despierta por cambios en /dev, por refrescar() o, por
+        # si acaso, cada diez intervalos
+        limite = time.monotonic() + 10 * self.intervalo
+        while not self._forzar.is_set() and time.monotonic() < limite:
+            if select.select([fd], [], [], 0.25)[0]:
+                # Un enchufe genera varios eventos seguidos: juntarlos antes de enumerar
+                time.sleep(0.3)
+                self._vaciar(fd)
+                break
+        self._forzar.clear()
+
+    @staticmethod
+    def _vaciar(fd):
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _escanear(self):
+        candidatos = tuple(encontrar_puertos_bluetooth())
+        self.enumeraciones += 1
+        # Olvidar lo sondeado de los puertos que ya no están
+        resondear, self._resondear = self._resondear, False
+        for puerto, confirmado in list(self._sondeados.items()):
+            if puerto not in candidatos or (resondear and not confirmado):
+                del self._sondeados[puerto]
+        nuevos = [p for p in candidatos if p not in self._sondeados]
+        # Publicar los candidatos antes de sondear: el sondeo puede tardar
+        # timeout_sondeo y mientras tanto "Conectar" ya debe ver los puertos
+        self._publicar(candidatos, tuple(p for p in candidatos if self._sondeados.get(p)))
+        self._enumerado.set()
+        if self.sondeo and nuevos:
+            resultados = self._executor.map(
+                lambda p: sondear(p, self.baudrate, self.timeout_sondeo, self.opener), nuevos)
+            self._sondeados.update(zip(nuevos, resultados))
+        else:
+            self._sondeados.update(dict.fromkeys(nuevos, False))
+        self._publicar(candidatos, tuple(p for p in candidatos if self._sondeados.get(p)))
+
+    def _publicar(self, candidatos, confirmados):
+        if (candidatos, confirmados) != (self.candidatos, self.confirmados):
+            self.candidatos, self.confirmados = candidatos, confirmados
+            if self.on_cambio:
+                self.on_cambio(self)
@@ -0,0 +1,188 @@
+import collections
+import mmap
+import os
+import struct
+import time
+
+# --- Registro de telemetría en disco y reproducción ---
+#
+# Archivo: cabecera fija + registros de ancho fijo, solo se agrega al final.
+#   Cabecera: MAGIC (8 bytes) | inicio en epoch (float64)
+#   Registro: t_ns desde el inicio (int64) | VEL (int16) | RPM (uint16)
+#             | engranaje (1 byte) | comando (1 byte, 0 si es una muestra)
+# Al ser de ancho fijo, el registro i está en HEADER.size + i * RECORD.size.
+
+MAGIC = b"CARLOG1\0"
+HEADER = struct.Struct("<8sd")
+RECORD = struct.Struct("<qhHcc")
+SIN_COMANDO = b"\0"
+
+def _limitar(valor, minimo, maximo):
+    return max(minimo, min(int(valor), maximo))
+
+class TelemetryRecorder:
+    """
+    Agrega cada muestra y cada comando enviado a un archivo binario. Las
+    escrituras se acumulan en memoria y se vuelcan a disco cada flush_interval
+    segundos (o al cerrar), para no tocar el disco en cada muestra.
+    """
+    def __init__(self, filename, flush_interval=1.0):
+        self.filename = filename
+        self.flush_interval = flush_interval
+        tam = os.path.getsize(filename) if os.path.exists(filename) else 0
+        nuevo = tam == 0
+        if tam >= HEADER.size and (tam - HEADER.size) % RECORD.size:
+            # Un registro a medio escribir (corte de luz, proceso matado):
+            # quitarlo para que lo que se agregue quede alineado
+            os.truncate(filename, tam - (tam - HEADER.size) % RECORD.size)
+        self._file = open(filename, "ab")
+        if nuevo:
+            self._inicio_ns = time.monotonic_ns()
+            self._file.write(HEADER.pack(MAGIC, time.time()))
+        else:
+            # Continuar un registro existente: los tiempos siguen desde el último
+            with TelemetryReplay(filename) as previo:
+                ultimo = previo.timestamp(len(previo) - 1) if len(previo) else 0
+            self._inicio_ns = time.monotonic_ns() - ultimo
+        self._pendiente = bytearray()
+        self._ultimo_flush = time.monotonic()
+
+    def recordSample(self, vel, rpm, gear):
+        self._agregar(vel, rpm, gear, SIN_COMANDO)
+
+    def recordCommand(self, comando, vel, rpm, gear):
+        # Cada byte de comando es un registro propio
+        for byte in comando:
+            self._agregar(vel, rpm, gear, bytes((byte,)))
+
+    def _agregar(self, vel, rpm, gear, comando):
+        self._pendiente += RECORD.pack(
+            time.monotonic_ns() - self._inicio_ns,
+            _limitar(vel, -32768, 32767),
+            _limitar(rpm, 0, 65535),
+            gear.encode()[:1] or b"?",
+            comando,
+        )
+        if time.monotonic() - self._ultimo_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._pendiente:
+            self._file.write(self._pendiente)
+            del self._pendiente[:]
+        self._file.flush()
+        self._ultimo_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+class TelemetryReplay:
+    """
+    Abre un registro con mmap: no se lee nada al abrir, así que sesiones de
+    horas abren al instante. El acceso por índice es O(1) y la búsqueda por
+    tiempo es una bisección sobre el mapa (O(log n), sin cargar el archivo).
+    """
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        tam = os.fstat(self._file.fileno()).st_size
+        if tam < HEADER.size:
+            raise ValueError(f"{filename} no es un registro de telemetría")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.start_epoch = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{filename} no es un registro de telemetría")
+        # Un registro a medio escribir al final se ignora
+        self._count = (tam - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, i):
+        """Devuelve (t_ns, vel, rpm, gear, comando) del registro i."""
+        t_ns, vel, rpm, gear, comando = RECORD.unpack_from(self._mmap, HEADER.size + i * RECORD.size)
+        return t_ns, vel, rpm, gear.decode(), comando if comando != SIN_COMANDO else None
+
+    def timestamp(self, i):
+        return struct.unpack_from("<q", self._mmap, HEADER.size + i * RECORD.size)[0]
+
+    def seek(self, t_ns):
+        """Índice del primer registro con tiempo >= t_ns."""
+        bajo, alto = 0, self._count
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self.timestamp(medio) < t_ns:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+class ReplaySerial:
+    """
+    Imita un serial.Serial abierto reproduciendo un registro: las muestras se
+    entregan como líneas 'VEL=<valor> RPM=<valor>' cuando llega su momento,
+    a velocidad real (speed=1) o acelerada. Lo escrito se descarta, así que
+    TestWindow y SerialWorker lo usan sin saber que no hay un Arduino.
+    La marcha grabada de cada línea entregada queda en 'marchas', en el mismo
+    orden en que SerialWorker llama a on_muestra: la interfaz la saca de ahí.
+    """
+    def __init__(self, filename, speed=1.0, start_ns=0):
+        self.replay = TelemetryReplay(filename)
+        self.speed = speed
+        self.timeout = 1
+        self.port = filename
+        self._indice = self.replay.seek(start_ns)
+        self._t0_ns = start_ns
+        self._reloj0 = time.monotonic_ns()
+        self._salida = bytearray()
+        self.marchas = collections.deque()
+
+    def _ahora_ns(self):
+        return self._t0_ns + int((time.monotonic_ns() - self._reloj0) * self.speed)
+
+    def _producir(self):
+        ahora = self._ahora_ns()
+        replay = self.replay
+        while self._indice < len(replay) and replay.timestamp(self._indice) <= ahora:
+            _, vel, rpm, gear, comando = replay.record(self._indice)
+            if comando is None:
+                self._salida += b"VEL=%d RPM=%d\n" % (vel, rpm)
+                self.marchas.append(gear)
+            self._indice += 1
+
+    @property
+    def in_waiting(self):
+        self._producir()
+        return len(self._salida)
+
+    def read(self, size=1):
+        self._producir()
+        if not self._salida and self._indice < len(self.replay):
+            # Esperar al próximo registro, como mucho 'timeout' segundos
+            espera = (self.replay.timestamp(self._indice) - self._ahora_ns()) / self.speed / 1e9
+            time.sleep(max(0.0, min(espera, self.timeout or 0)))
+            self._producir()
+        elif not self._salida and self.timeout:
+            time.sleep(self.timeout)  # Fin del registro: puerto en silencio
+        data = bytes(self._salida[:size])
+        del self._salida[:size]
+        return data
+
+    def write(self, data):
+        return len(data)
+
+    def close(self):
+        self.replay.close()
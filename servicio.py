@@ -0,0 +1,328 @@
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from bitacora import bitacora
+from comandos import CommandScheduler, MOVIMIENTOS, PARAR
+from configuracion import load_settings
+from vehiculo import gearMapping, VehicleSim
+from viaje import TripComputer
+
+# --- Controlador sin interfaz: el tablero de prueba sin PySide6 ---
+#
+# Para una estación base (p. ej. una Raspberry Pi) que solo retransmite
+# comandos: la misma lógica que TestWindow (transporte serial, límites por
+# engranaje, CommandScheduler, grabación y bus de telemetría) sobre un único
+# event loop de asyncio. Las órdenes llegan como líneas de texto por stdin,
+# por un socket (TCP o Unix) o desde un archivo de guion:
+#   a r i d     mantener un movimiento (hasta 'p' o '-a', '-r', ...)
+#   p           parar (suelta todo)
+#   1..7 N R    engranaje
+#   esperar S   pausa de S segundos (útil en guiones)
+#   estado      responde 'VEL=<v> RPM=<r> ENG=<e> ENLACE=<estado>'
+#   viaje       resumen de la computadora de viaje
+#   salir       termina el servicio
+# Varias órdenes pueden ir en la misma línea separadas por espacios.
+
+ENGRANAJES = frozenset("1234567NR")
+
+class HeadlessController:
+    """
+    Estado del carrito y despacho de órdenes, sin Qt. Con un puerto usa
+    AsyncSerialTransport (que se reconecta solo); sin puerto simula el
+    carrito con VehicleSim como el modo simulado del tablero.
+    Las muestras llegan en el hilo del transporte y se pasan al loop del
+    controlador con call_soon_threadsafe, así todo el estado vive en un hilo.
+    """
+    def __init__(self, settings, port=None, baudrate=9600):
+        self.settings = settings
+        self.port = port
+        self.baudrate = baudrate
+        self.currentGear = "1"
+        self.odometer = 0
+        self.rpm = 0
+        self.estado = "simulado" if port is None else "desconectado"
+        self.muestras = 0
+        self.trip = TripComputer()
+        self.commands = CommandScheduler(keepalive=settings.get("command_keepalive", 0.5))
+        self.tick_s = settings.get("command_tick_ms", 20) / 1000
+        self.transport = None
+        self.sim = None
+        self.recorder = None
+        self.bus = None
+        self.webServer = None
+        self._loop = None
+        self._detener = None
+
+    async def run(self, fuentes):
+        """Corre hasta 'salir', Ctrl+C o hasta que terminen todas las fuentes."""
+        self._loop = asyncio.get_running_loop()
+        self._detener = asyncio.Event()
+        self._abrir()
+        tareas = [asyncio.ensure_future(self._tick())]
+        if self.settings.get("web_server", False):
+            from servidor_web import TelemetryServer, estado
+            self.webServer = TelemetryServer(
+                lambda: estado(self.odometer, self.rpm, self.currentGear),
+                self.settings.get("web_host", "0.0.0.0"), self.settings.get("web_port", 8765),
+                self.settings.get("web_max_rate", 30))
+            tareas.append(asyncio.ensure_future(self.webServer.servir()))
+        entradas = [asyncio.ensure_future(fuente(self)) for fuente in fuentes]
+        try:
+            if entradas:
+                fin = asyncio.ensure_future(asyncio.wait(entradas))
+                espera = asyncio.ensure_future(self._detener.wait())
+                await asyncio.wait([fin, espera], return_when=asyncio.FIRST_COMPLETED)
+                for tarea in (fin, espera):
+                    tarea.cancel()
+            else:
+                await self._detener.wait()
+        finally:
+            for tarea in tareas + entradas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, *entradas, return_exceptions=True)
+            self._cerrar()
+
+    def _abrir(self):
+        if self.port is None:
+            self.sim = VehicleSim(self.currentGear, self.odometer)
+            self._last_sim_time = time.monotonic()
+        else:
+            # Importación diferida: el modo simulado no necesita pyserial
+            from transporte import AsyncSerialTransport
+            call = self._loop.call_soon_threadsafe
+            self.transport = AsyncSerialTransport(
+                self.port, self.baudrate,
+                on_muestra=lambda vel, rpm: call(self.updateFromSerial, vel, rpm),
+                on_error=lambda mensaje: bitacora.error(
+                    "error_serial", "Error en la conexión serial: {mensaje}", mensaje=mensaje),
+                on_estado=lambda estado: call(setattr, self, "estado", estado),
+                heartbeat_timeout=self.settings.get("link_timeout", 5.0))
+            self.transport.start()
+            if self.settings.get("record_telemetry", False):
+                from registro import TelemetryRecorder
+                self.recorder = TelemetryRecorder(time.strftime("telemetria_%Y%m%d_%H%M%S.carlog"))
+        if self.settings.get("telemetry_bus", False):
+            from bus import BusOcupado, TelemetryBus
+            try:
+                self.bus = TelemetryBus(self.settings.get("telemetry_bus_name", "carrito"))
+            except (BusOcupado, ValueError) as e:
+                bitacora.error("bus_no_disponible", "Bus de telemetría desactivado: {error}", error=str(e))
+
+    def _cerrar(self):
+        if self.transport:
+            # Dejar el carrito detenido antes de soltar el enlace
+            self.commands.stop()
+            self.flushCommands()
+            self.transport.stop()
+        if self.recorder:
+            self.recorder.close()
+        if self.bus:
+            self.bus.close()
+        if self.trip.muestras and self.settings.get("trip_export", True):
+            filename = time.strftime("viaje_%Y%m%d_%H%M%S.json")
+            self.trip.export(filename)
+            bitacora.info("viaje_exportado", "Resumen del viaje exportado a {archivo}", archivo=filename)
+
+    def stop(self):
+        self._detener.set()
+
+    def updateFromSerial(self, vel, rpm_val):
+        # Mismos límites por engranaje que TestWindow.updateFromSerial
+        if self.recorder:
+            self.recorder.recordSample(vel, rpm_val, self.currentGear)
+        limites = gearMapping[self.currentGear]
+        self.odometer = max(0, min(vel, limites["maxSpeed"]))
+        self.rpm = max(0, min(rpm_val, limites["maxRPM"]))
+        self.recordSample(vel > limites["maxSpeed"])
+
+    def recordSample(self, clipped=False):
+        self.muestras += 1
+        self.trip.registrar(time.monotonic(), self.odometer, self.rpm, self.currentGear, clipped)
+        if self.bus:
+            self.bus.publish(self.odometer, self.rpm, self.currentGear)
+
+    async def _tick(self):
+        # Un solo timer para los comandos pendientes, el bus y la simulación
+        proximo = time.monotonic()
+        while True:
+            proximo += self.tick_s
+            self.flushCommands()
+            if self.bus:
+                comando = self.bus.comando_pendiente()
+                if comando:
+                    self.ejecutar(comando.decode(errors="ignore"))
+            if self.sim:
+                now = time.monotonic()
+                if self.sim.advance(now - self._last_sim_time):
+                    self.syncFromSim()
+                self._last_sim_time = now
+            await asyncio.sleep(max(0.0, proximo - time.monotonic()))
+
+    def flushCommands(self):
+        salida = self.commands.tick()
+        if salida and self.transport:
+            self.transport.enviar(salida)
+            bitacora.debug("comando_enviado", "Comando enviado: {comando}", comando=salida.decode())
+            if self.recorder:
+                self.recorder.recordCommand(salida, self.odometer, self.rpm, self.currentGear)
+
+    def syncFromSim(self):
+        self.currentGear = self.sim.gear
+        self.odometer = self.sim.speed
+        self.rpm = self.sim.rpm
+        self.recordSample()
+
+    def estadoTexto(self):
+        return f"VEL={self.odometer:.0f} RPM={self.rpm:.0f} ENG={self.currentGear} ENLACE={self.estado}"
+
+    async def ejecutarLinea(self, linea, responder):
+        """Ejecuta una línea de órdenes; 'responder(texto)' recibe las respuestas."""
+        for orden, argumento in _ordenes(linea):
+            if orden == "esperar":
+                try:
+                    await asyncio.sleep(float(argumento))
+                except (TypeError, ValueError):
+                    responder(f"esperar necesita segundos: {argumento!r}")
+            elif orden == "estado":
+                responder(self.estadoTexto())
+            elif orden == "viaje":
+                responder(self.trip.text())
+            elif orden == "salir":
+                self.stop()
+                return
+            elif not self.ejecutar(orden):
+                responder(f"Orden desconocida: {orden}")
+
+    def ejecutar(self, orden):
+        """Aplica una orden de movimiento o engranaje; False si no la reconoce."""
+        if orden in ENGRANAJES:
+            self.currentGear = orden
+            if self.sim:
+                self.sim.selectGear(orden)
+                self.syncFromSim()
+            elif orden.isdigit():
+                self.commands.setGear(orden.encode())
+        elif orden.encode() == PARAR:
+            if self.sim:
+                self.sim.brake()
+                self.syncFromSim()
+            self.commands.stop()
+        elif orden.encode() in MOVIMIENTOS:
+            if self.sim:
+                # El simulador no tiene dirección: 'i' y 'd' no cambian nada
+                {"a": self.sim.accelerate, "r": self.sim.reverse}.get(orden, lambda: None)()
+                self.syncFromSim()
+            self.commands.press(orden.encode())
+        elif orden[:1] == "-" and orden[1:].encode() in MOVIMIENTOS:
+            self.commands.release(orden[1:].encode())
+        else:
+            return False
+        return True
+
+def _ordenes(linea):
+    """Separa una línea en (orden, argumento); 'esperar' consume el token siguiente."""
+    tokens = linea.split("#", 1)[0].split()
+    i = 0
+    while i < len(tokens):
+        orden = tokens[i]
+        i += 1
+        argumento = None
+        if orden == "esperar":
+            argumento = tokens[i] if i < len(tokens) else None
+            i += 1
+        yield orden, argumento
+
+# --- Fuentes de órdenes: cada una es una corrutina que recibe el controlador ---
+
+def desde_stdin(controlador):
+    # Un hilo lee stdin (portátil, también en Windows) y pasa cada línea al loop
+    loop = asyncio.get_running_loop()
+    lineas = asyncio.Queue()
+
+    def leer():
+        for linea in sys.stdin:
+            loop.call_soon_threadsafe(lineas.put_nowait, linea)
+        loop.call_soon_threadsafe(lineas.put_nowait, None)
+
+    threading.Thread(target=leer, name="StdinReader", daemon=True).start()
+
+    async def consumir():
+        responder = lambda texto: print(texto, flush=True)
+        while (linea := await lineas.get()) is not None:
+            await controlador.ejecutarLinea(linea, responder)
+    return consumir()
+
+async def desde_guion(controlador, ruta):
+    responder = lambda texto: print(texto, flush=True)
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            await controlador.ejecutarLinea(linea, responder)
+
+async def desde_socket(controlador, direccion):
+    """
+    Atiende clientes por líneas en 'host:puerto' (TCP) o en una ruta (socket
+    Unix). Cada cliente recibe las respuestas a sus propias órdenes.
+    """
+    async def atender(reader, writer):
+        responder = lambda texto: writer.write(texto.encode() + b"\n")
+        try:
+            while linea := await reader.readline():
+                await controlador.ejecutarLinea(linea.decode(errors="ignore"), responder)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if ":" in direccion:
+        host, puerto = direccion.rsplit(":", 1)
+        servidor = await asyncio.start_server(atender, host or "127.0.0.1", int(puerto))
+    else:
+        if os.path.exists(direccion):
+            os.remove(direccion)
+        servidor = await asyncio.start_unix_server(atender, direccion)
+    bitacora.info("escuchando", "Escuchando órdenes en {direccion}", direccion=direccion)
+    async with servidor:
+        await servidor.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Control del carrito sin interfaz gráfica.")
+    parser.add_argument("--puerto", help="puerto serial o URL de pyserial (sin puerto: simulado)")
+    parser.add_argument("--baud", type=int, help="baudios (por defecto, los de la configuración)")
+    parser.add_argument("--socket", metavar="HOST:PUERTO|RUTA", help="aceptar órdenes por TCP o socket Unix")
+    parser.add_argument("--guion", metavar="ARCHIVO", help="ejecutar las órdenes de un archivo")
+    parser.add_argument("--sin-stdin", action="store_true", help="no leer órdenes de la entrada estándar")
+    parser.add_argument("--bus", action="store_true", help="publicar la telemetría en memoria compartida")
+    parser.add_argument("--web", type=int, metavar="PUERTO", help="servir el tablero web en PUERTO")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    # stdout queda para las respuestas: la bitácora va a stderr
+    bitacora.configurar(settings, consola=sys.stderr)
+    if args.bus:
+        settings["telemetry_bus"] = True
+    if args.web:
+        settings["web_server"] = True
+        settings["web_port"] = args.web
+    # Con guion o socket, stdin se lee solo si es una terminal o se pidió explícitamente
+    usar_stdin = not args.sin_stdin and (sys.stdin.isatty() or not (args.guion or args.socket))
+    fuentes = []
+    if args.guion:
+        fuentes.append(lambda c: desde_guion(c, args.guion))
+    if args.socket:
+        fuentes.append(lambda c: desde_socket(c, args.socket))
+    if usar_stdin:
+        fuentes.append(desde_stdin)
+
+    controlador = HeadlessController(settings, args.puerto, args.baud or settings.get("baud_rate", 9600))
+    try:
+        asyncio.run(controlador.run(fuentes))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import asyncio
+import base64
+import hashlib
+import struct
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from bitacora import bitacora
+
+# --- Servidor de telemetría para navegadores (HTTP + WebSocket, sin dependencias) ---
+#
+# Sirve una página liviana en / y transmite el estado del tablero por
+# WebSocket en /ws. Un único difusor corre a max_rate: en cada tick lee el
+# estado con fuente() (los mismos atributos que alimentan los indicadores,
+# así el tablero no hace ningún trabajo extra por los espectadores) y a cada
+# cliente al que le toca le envía solo los campos que cambiaron desde lo
+# último que recibió. Tramas binarias:
+#   máscara (uint8) | VEL (int16)? | RPM (uint16)? | engranaje (1 byte)? | luces (uint8)?
+# con un bit de la máscara por campo presente; la primera trama lleva todos.
+# Un cliente cuyo socket todavía tiene datos sin enviar se saltea en ese tick
+# (se cuenta en 'saltados'): nunca se acumulan tramas viejas en memoria. Al
+# ponerse al día recibe una trama completa, no un delta, para resincronizarse.
+# Cada cliente negocia su tasa con /ws?rate=N o enviando el texto "rate=N";
+# el servidor responde "rate=<tasa efectiva>".
+
+CAMPO_VEL, CAMPO_RPM, CAMPO_ENGRANAJE, CAMPO_LUCES = 1, 2, 4, 8
+TODOS = CAMPO_VEL | CAMPO_RPM | CAMPO_ENGRANAJE | CAMPO_LUCES
+LUZ_IZQUIERDA, LUZ_DERECHA = 1, 2
+
+# Un Struct precompilado por combinación de campos
+_FORMATOS = {
+    mascara: struct.Struct("<B" + "".join(
+        formato for bit, formato in ((CAMPO_VEL, "h"), (CAMPO_RPM, "H"), (CAMPO_ENGRANAJE, "c"), (CAMPO_LUCES, "B"))
+        if mascara & bit))
+    for mascara in range(TODOS + 1)
+}
+
+_GUID_WS = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXTO, OP_BINARIO, OP_CIERRE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_MENSAJE = 1024
+# Bytes pendientes en el socket a partir de los cuales el cliente se saltea
+LIMITE_PENDIENTE = 4096
+
+def estado(vel, rpm, gear, luz_izq=False, luz_der=False):
+    """Normaliza el estado del tablero a la tupla que se compara y codifica."""
+    luces = (LUZ_IZQUIERDA if luz_izq else 0) | (LUZ_DERECHA if luz_der else 0)
+    return (max(-32768, min(int(vel), 32767)), max(0, min(int(rpm), 65535)),
+            gear.encode()[:1] or b"?", luces)
+
+def codificar_delta(anterior, actual):
+    """Trama con los campos de 'actual' que difieren de 'anterior' (todos si es None)."""
+    if anterior is None:
+        return _FORMATOS[TODOS].pack(TODOS, *actual)
+    mascara = 0
+    valores = []
+    for bit, previo, valor in zip((CAMPO_VEL, CAMPO_RPM, CAMPO_ENGRANAJE, CAMPO_LUCES), anterior, actual):
+        if previo != valor:
+            mascara |= bit
+            valores.append(valor)
+    return _FORMATOS[mascara].pack(mascara, *valores)
+
+def decodificar_delta(anterior, trama):
+    """Inverso de codificar_delta, para clientes escritos en Python."""
+    mascara = trama[0]
+    valores = iter(_FORMATOS[mascara].unpack(trama)[1:])
+    return tuple(next(valores) if mascara & bit else previo
+                 for bit, previo in zip((CAMPO_VEL, CAMPO_RPM, CAMPO_ENGRANAJE, CAMPO_LUCES),
+                                        anterior or (0, 0, b"?", 0)))
+
+def trama_ws(opcode, datos):
+    largo = len(datos)
+    if largo < 126:
+        return bytes((0x80 | opcode, largo)) + datos
+    if largo < 65536:
+        return bytes((0x80 | opcode, 126)) + struct.pack("!H", largo) + datos
+    return bytes((0x80 | opcode, 127)) + struct.pack("!Q", largo) + datos
+
+async def _leer_trama_ws(reader):
+    b0, b1 = await reader.readexactly(2)
+    largo = b1 & 0x7F
+    if largo == 126:
+        largo = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif largo == 127:
+        largo = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if largo > MAX_MENSAJE:
+        raise ValueError("mensaje demasiado largo")
+    mascara = await reader.readexactly(4) if b1 & 0x80 else b""
+    datos = await reader.readexactly(largo)
+    if mascara:
+        datos = bytes(b ^ mascara[i % 4] for i, b in enumerate(datos))
+    return b0 & 0x0F, datos
+
+class _Cliente:
+    __slots__ = ("writer", "cada", "proximo", "ultimo", "saltados")
+
+    def __init__(self, writer, cada):
+        self.writer = writer
+        self.cada = cada
+        self.proximo = 0
+        self.ultimo = None
+        self.saltados = 0
+
+class TelemetryServer:
+    """
+    fuente() devuelve la tupla de estado(); se llama desde el hilo del
+    servidor, una vez por tick y solo si hay clientes. start()/stop() corren
+    el servidor en un hilo propio (para la interfaz Qt); servir() es la
+    corrutina, para correrlo en un loop existente (el controlador sin interfaz).
+    """
+    def __init__(self, fuente, host="0.0.0.0", port=8765, max_rate=30):
+        self.fuente = fuente
+        self.host = host
+        self.port = port
+        self.max_rate = max(1, int(max_rate))
+        self.clientes = set()
+        self.saltados = 0
+        self.tramas = 0
+        self._loop = None
+        self._tarea = None
+        self._hay_clientes = None
+        self._hilo = None
+        self._listo = threading.Event()
+
+    def start(self):
+        self._hilo = threading.Thread(target=asyncio.run, args=(self._correr(),), name="TelemetryServer", daemon=True)
+        self._hilo.start()
+        self._listo.wait(2.0)
+
+    def stop(self, timeout=2.0):
+        if self._loop and self._tarea:
+            self._loop.call_soon_threadsafe(self._tarea.cancel)
+        if self._hilo:
+            self._hilo.join(timeout)
+
+    async def _correr(self):
+        self._tarea = asyncio.current_task()
+        try:
+            await self.servir()
+        except asyncio.CancelledError:
+            pass
+        except OSError as e:
+            self._listo.set()
+            bitacora.error("servidor_web", "No se pudo iniciar el servidor web: {error}", error=str(e))
+
+    async def servir(self):
+        self._loop = asyncio.get_running_loop()
+        self._hay_clientes = asyncio.Event()
+        servidor = await asyncio.start_server(self._atender, self.host, self.port)
+        self.port = servidor.sockets[0].getsockname()[1]
+        bitacora.info("servidor_web", "Tablero web en http://{host}:{port}/", host=self.host, port=self.port)
+        self._listo.set()
+        difusor = asyncio.ensure_future(self._difundir())
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            difusor.cancel()
+            for cliente in list(self.clientes):
+                cliente.writer.close()
+
+    def _negociar(self, pedido):
+        """Divisor del tick para la tasa pedida; devuelve (cada, tasa efectiva)."""
+        try:
+            pedido = float(pedido)
+        except (TypeError, ValueError):
+            pedido = self.max_rate
+        cada = max(1, round(self.max_rate / max(pedido, 0.1)))
+        return cada, self.max_rate / cada
+
+    async def _difundir(self):
+        loop = self._loop
+        periodo = 1 / self.max_rate
+        tick = 0
+        proximo = loop.time()
+        while True:
+            if not self.clientes:
+                self._hay_clientes.clear()
+                await self._hay_clientes.wait()
+                proximo = loop.time()
+            tick += 1
+            actual = self.fuente()
+            # Casi todos los clientes vienen del mismo estado anterior: una codificación por estado
+            tramas = {}
+            for cliente in self.clientes:
+                if tick < cliente.proximo or cliente.ultimo == actual:
+                    continue
+                cliente.proximo = tick + cliente.cada
+                transporte = cliente.writer.transport
+                if transporte.is_closing():
+                    continue
+                if transporte.get_write_buffer_size() > LIMITE_PENDIENTE:
+                    cliente.saltados += 1
+                    self.saltados += 1
+                    cliente.ultimo = None
+                    continue
+                trama = tramas.get(cliente.ultimo)
+                if trama is None:
+                    trama = tramas[cliente.ultimo] = trama_ws(OP_BINARIO, codificar_delta(cliente.ultimo, actual))
+                cliente.writer.write(trama)
+                cliente.ultimo = actual
+                self.tramas += 1
+            proximo += periodo
+            espera = proximo - loop.time()
+            if espera < -periodo:
+                # Atrasados más de un tick: no recuperar a ráfagas
+                proximo = loop.time()
+            await asyncio.sleep(max(0.0, espera))
+
+    async def _atender(self, reader, writer):
+        try:
+            linea = await reader.readline()
+            encabezados = {}
+            while (renglon := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                nombre, _, valor = renglon.decode("latin-1").partition(":")
+                encabezados[nombre.strip().lower()] = valor.strip()
+                if len(encabezados) > 64:
+                    raise ValueError("demasiados encabezados")
+            partes = linea.decode("latin-1").split()
+            if len(partes) < 2 or partes[0] != "GET":
+                writer.write(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            url = urlsplit(partes[1])
+            if url.path == "/ws" and encabezados.get("upgrade", "").lower() == "websocket":
+                await self._websocket(reader, writer, encabezados, parse_qs(url.query))
+            elif url.path in ("/", "/index.html"):
+                cuerpo = PAGINA.encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                             b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(cuerpo) + cuerpo)
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Servidor deteniéndose: el cliente se cierra igual
+            pass
+        finally:
+            writer.close()
+
+    async def _websocket(self, reader, writer, encabezados, consulta):
+        clave = encabezados.get("sec-websocket-key", "").encode()
+        aceptar = base64.b64encode(hashlib.sha1(clave + _GUID_WS).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + aceptar + b"\r\n\r\n")
+        cada, tasa = self._negociar(consulta.get("rate", [self.max_rate])[0])
+        cliente = _Cliente(writer, cada)
+        writer.write(trama_ws(OP_TEXTO, f"rate={tasa:g}".encode()))
+        self.clientes.add(cliente)
+        self._hay_clientes.set()
+        try:
+            while True:
+                opcode, datos = await _leer_trama_ws(reader)
+                if opcode == OP_CIERRE:
+                    writer.write(trama_ws(OP_CIERRE, datos[:2]))
+                    break
+                if opcode == OP_PING:
+                    writer.write(trama_ws(OP_PONG, datos))
+                elif opcode == OP_TEXTO and datos.startswith(b"rate="):
+                    cliente.cada, tasa = self._negociar(datos[5:].decode(errors="ignore"))
+                    writer.write(trama_ws(OP_TEXTO, f"rate={tasa:g}".encode()))
+        finally:
+            self.clientes.discard(cliente)
+
+PAGINA = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width">
+<title>Carrito Arduino</title>
+<style>
+body{background:#1b1b1b;color:#fff;font-family:Arial,sans-serif;margin:2em}
+.fila{display:flex;gap:2em;align-items:center;flex-wrap:wrap}
+.valor{font-size:3em;font-weight:bold}.etq{color:#aaa}
+.barra{width:320px;height:14px;background:#333}.barra div{height:100%;width:0}
+#vb{background:#00b8fe}#rb{background:#fc4a1a}
+.luz{font-size:3em;color:#888}.on{animation:b 1s steps(1) infinite}
+@keyframes b{0%{color:#ff0}50%{color:#888}}
+</style></head><body>
+<div class="fila"><span id="li" class="luz">&larr;</span>
+<div><div class="etq">Velocidad</div><div class="valor" id="v">0</div><div class="barra"><div id="vb"></div></div></div>
+<div><div class="etq">RPM</div><div class="valor" id="r">0</div><div class="barra"><div id="rb"></div></div></div>
+<div><div class="etq">Engranaje</div><div class="valor" id="g">-</div></div>
+<span id="ld" class="luz">&rarr;</span></div>
+<p class="etq">Tasa: <input id="t" type="number" min="1" max="60" value="15" style="width:4em"> Hz
+<span id="e">desconectado</span></p>
+<script>
+const $=id=>document.getElementById(id);let s=[0,0,"-",0],ws;
+function pintar(){$("v").textContent=s[0];$("r").textContent=s[1];$("g").textContent=s[2];
+$("vb").style.width=Math.min(100,s[0]/4)+"%";$("rb").style.width=Math.min(100,s[1]/60)+"%";
+$("li").className="luz"+(s[3]&1?" on":"");$("ld").className="luz"+(s[3]&2?" on":"");}
+function conectar(){ws=new WebSocket(`ws://${location.host}/ws?rate=${$("t").value}`);ws.binaryType="arraybuffer";
+ws.onmessage=e=>{if(typeof e.data==="string"){$("e").textContent="("+e.data.replace("rate=","")+" Hz efectivos)";return}
+const d=new DataView(e.data),m=d.getUint8(0);let o=1;
+if(m&1){s[0]=d.getInt16(o,true);o+=2}if(m&2){s[1]=d.getUint16(o,true);o+=2}
+if(m&4){s[2]=String.fromCharCode(d.getUint8(o));o+=1}if(m&8){s[3]=d.getUint8(o)}
+requestAnimationFrame(pintar)};
+ws.onclose=()=>{$("e").textContent="desconectado";setTimeout(conectar,2000)};}
+$("t").onchange=()=>ws&&ws.readyState===1&&ws.send("rate="+$("t").value);conectar();
+</script></body></html>
+"""
@@ -0,0 +1,1183 @@
+import math
+import time
+from functools import partial
+
+from PySide6 import QtWidgets, QtCore, QtGui
+from PySide6.QtGui import QPainter, QConicalGradient, QColor, QFont, QPen
+
+from bitacora import bitacora
+from bus import BusOcupado, TelemetryBus
+from comandos import CommandScheduler
+from enlace_serial import SerialWorker
+from entrada import BACKENDS, InputSampler, KeyboardBackend
+from flota import Fleet
+from transporte import AsyncSerialTransport
+from historial import TelemetryHistory
+from latencia import ETAPA_PINTADO, ETAPA_SERIAL_PIXEL, ETAPA_SERIAL_UI, LatencyRecorder
+from registro import ReplaySerial, TelemetryRecorder
+from servidor_web import TelemetryServer, estado as estado_web
+from vehiculo import gearMapping, VehicleSim
+from viaje import TripComputer
+
+# --- Planificador de tareas periódicas: un solo timer que se apaga en reposo ---
+class TickScheduler(QtCore.QObject):
+    """
+    Corre todas las tareas periódicas de una ventana con un único timer.
+    Cada tarea corre cada 'every' períodos base de 'period_ms', o con su
+    propio period_ms (el repintado a 60 Hz, los comandos cada 20 ms). Los
+    plazos se cuentan desde un mismo origen, así las de igual período quedan
+    en fase (las dos luces direccionales parpadean juntas). Una tarea
+    devuelve True mientras tenga trabajo; las que devuelven False se duermen
+    hasta wake(). El timer se programa para el plazo más cercano de las
+    tareas despiertas y sin ninguna se detiene: en reposo no hay ningún tick.
+    """
+    def __init__(self, period_ms=100, parent=None):
+        super().__init__(parent)
+        self.period_ms = period_ms
+        self._tasks = {}   # nombre -> [callback, período (s)]
+        self._awake = {}   # nombre -> [callback, período (s), próximo plazo]
+        self._origin = 0.0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.timeout.connect(self._run)
+
+    def add(self, name, callback, every=1, awake=False, period_ms=None):
+        self._tasks[name] = [callback, (period_ms or every * self.period_ms) / 1000]
+        if awake:
+            self.wake(name)
+
+    def setPeriod(self, name, period_ms):
+        period = period_ms / 1000
+        self._tasks[name][1] = period
+        if name in self._awake:
+            self._awake[name][1] = period
+
+    def wake(self, name):
+        if name in self._awake:
+            return
+        now = time.monotonic()
+        if not self._awake:
+            self._origin = now
+        callback, period = self._tasks[name]
+        # Primer plazo: el siguiente múltiplo del período desde el origen común
+        due = self._origin + (math.floor((now - self._origin) / period) + 1) * period
+        self._awake[name] = [callback, period, due]
+        self._program(now)
+
+    def isAwake(self, name):
+        return name in self._awake
+
+    def isIdle(self):
+        return not self._awake
+
+    def stop(self):
+        self._awake.clear()
+        self._timer.stop()
+
+    def _program(self, now):
+        due = min(entry[2] for entry in self._awake.values())
+        self._timer.start(max(0, math.ceil((due - now) * 1000)))
+
+    def _run(self):
+        now = time.monotonic()
+        for name, entry in list(self._awake.items()):
+            callback, period, due = entry
+            # Un milisegundo de margen por el redondeo del timer
+            if due - now > 0.001:
+                continue
+            # Tras un atraso se sigue en fase, sin recuperar los ticks perdidos
+            entry[2] = due + (math.floor((now - due) / period) + 1) * period
+            if not callback():
+                self._awake.pop(name, None)
+        if self._awake:
+            self._program(time.monotonic())
+
+# --- Planificador de repintado: un solo "vsync" para todos los indicadores ---
+class RenderScheduler(QtCore.QObject):
+    """
+    Los widgets se marcan como sucios con markDirty() en lugar de llamar a
+    update(); a cada cuadro (30/60 Hz) se repintan solo los sucios, con el
+    último valor recibido. Así la tasa de datos entrantes no decide cuántas
+    veces se pinta. Los cuadros son la tarea "render" de un TickScheduler
+    (el de la ventana, o uno propio), que se duerme cuando no queda nada pendiente.
+    Los widgets con renderFrame(now) la reciben en cada cuadro; si devuelve
+    True siguen sucios para el siguiente (p. ej. una aguja en movimiento).
+    """
+    def __init__(self, fps=60, parent=None, ticks=None):
+        super().__init__(parent)
+        # Dos conjuntos que se alternan para no crear objetos en cada cuadro
+        self._dirty = set()
+        self._drawing = set()
+        self.ticks = ticks if ticks is not None else TickScheduler(parent=self)
+        self.fps = max(1, int(fps))
+        self.ticks.add("render", self._flush, period_ms=round(1000 / self.fps))
+
+    def setFps(self, fps):
+        self.fps = max(1, int(fps))
+        self.ticks.setPeriod("render", round(1000 / self.fps))
+
+    def markDirty(self, widget):
+        self._dirty.add(widget)
+        self.ticks.wake("render")
+
+    def _flush(self):
+        self._dirty, self._drawing = self._drawing, self._dirty
+        now = time.monotonic()
+        for widget in self._drawing:
+            renderFrame = getattr(widget, "renderFrame", None)
+            if renderFrame is None:
+                widget.update()
+            elif renderFrame(now):
+                self._dirty.add(widget)
+        self._drawing.clear()
+        return bool(self._dirty)
+
+# --- Animación de agujas: resorte críticamente amortiguado ---
+class NeedleAnimator:
+    """
+    Lleva la posición mostrada hacia el último valor recibido con un resorte
+    críticamente amortiguado (sin rebote), avanzado por tiempo real y no por
+    cantidad de muestras. Con las dos últimas muestras estima la tendencia y
+    la extrapola durante un breve hueco de telemetría; pasado ese margen la
+    aguja se asienta en el último valor real. Solo guarda floats en __slots__.
+    """
+    __slots__ = ("position", "velocity", "target", "trend",
+                 "last_sample_time", "last_step_time",
+                 "smooth_time", "max_extrapolation", "min_value", "max_value")
+
+    def __init__(self, value=0.0, min_value=0.0, max_value=100.0,
+                 smooth_time=0.12, max_extrapolation=0.25):
+        self.position = float(value)
+        self.velocity = 0.0
+        self.target = float(value)
+        self.trend = 0.0
+        self.last_sample_time = None
+        self.last_step_time = None
+        self.smooth_time = smooth_time
+        self.max_extrapolation = max_extrapolation
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def push(self, value, t):
+        """Registra una muestra con su instante (time.monotonic())."""
+        if self.last_sample_time is not None:
+            dt = t - self.last_sample_time
+            # Muestras llegadas en ráfaga no sirven para estimar la tendencia
+            if dt > 0.005:
+                self.trend = (value - self.target) / dt
+        # En reposo el reloj de integración arranca con la nueva muestra
+        if self.last_step_time is None or (self.velocity == 0.0 and self.position == self.target):
+            self.last_step_time = t
+        self.target = float(value)
+        self.last_sample_time = t
+
+    def step(self, now):
+        """Avanza hasta 'now'; devuelve True mientras la aguja siga moviéndose."""
+        if self.last_step_time is None:
+            self.last_step_time = now
+            return False
+        dt = min(now - self.last_step_time, 0.1)
+        self.last_step_time = now
+        if dt <= 0:
+            return True
+
+        # Extrapolar la tendencia solo durante un hueco corto de datos
+        gap = now - self.last_sample_time
+        goal = self.target
+        if gap < self.max_extrapolation:
+            goal += self.trend * gap
+            if goal < self.min_value:
+                goal = self.min_value
+            elif goal > self.max_value:
+                goal = self.max_value
+
+        # Integración estable para cualquier dt (aprox. de Padé de exp(-omega*dt))
+        omega = 2.0 / self.smooth_time
+        x = omega * dt
+        decay = 1.0 / (1.0 + x + 0.48 * x * x + 0.235 * x * x * x)
+        change = self.position - goal
+        temp = (self.velocity + omega * change) * dt
+        self.velocity = (self.velocity - omega * temp) * decay
+        self.position = goal + (change + temp) * decay
+
+        if gap < self.max_extrapolation:
+            return True
+        if abs(self.position - goal) < 0.05 and abs(self.velocity) < 0.5:
+            self.position = goal
+            self.velocity = 0.0
+            return False
+        return True
+
+# --- GaugeWidget: Indicador circular (odómetro o tacómetro) ---
+class GaugeWidget(QtWidgets.QWidget):
+    START_ANGLE = 45
+    SPAN_ANGLE = -270
+    GRADIENT_COLORS = {
+        "speed": ("#00b8fe", "#41dcf4"),
+        "rpm": ("#f7b733", "#fc4a1a"),
+    }
+
+    def __init__(self, gauge_type="speed", min_value=0, max_value=100, parent=None,
+                 scheduler=None, animated=False):
+        super().__init__(parent)
+        self.gauge_type = gauge_type  
+        # Si hay planificador, los repintados se agrupan en sus ticks
+        self.scheduler = scheduler
+        self.min_value = min_value
+        self.max_value = max_value
+        self.current_value = min_value
+        # La animación avanza en los ticks del planificador, así que lo requiere
+        self.animator = NeedleAnimator(min_value, min_value, max_value) if animated and scheduler else None
+        # Valor límite opcional
+        self.limit_value = max_value  
+        self.setMinimumSize(150, 150)
+
+        # Pinceles, fuentes y gradiente se crean una sola vez
+        self._bezel_pen = QPen(QColor("#555555"), 4)
+        self._background_brush = QColor("#000000")
+        self._track_pen = QPen(QColor("#333333"), 20)
+        self._value_pen = QPen(QColor("#333333"), 20)
+        self._needle_pen = QPen(QColor("#FFFFFF"), 3)
+        self._text_color = QColor("#FFFFFF")
+        self._font = QFont("Arial", 16, QFont.Bold)
+        self._font_small = QFont("Arial", 10)
+        self._gradient = QConicalGradient()
+        colors = self.GRADIENT_COLORS.get(gauge_type)
+        if colors:
+            self._gradient.setColorAt(0.0, QColor(colors[0]))
+            self._gradient.setColorAt(1.0, QColor(colors[1]))
+
+        # Capa estática (fondo, borde y pista) pre-renderizada; se invalida al redimensionar
+        self._static_layer = None
+        self._shown_value = int(round(self.current_value))
+        self._limit_text = f"Lim: {int(self.limit_value)}"
+        # Opcional: se llama con (inicio_ns, fin_ns) tras cada paintEvent
+        self.paintObserver = None
+
+    def setValue(self, value):
+        if self.animator is not None:
+            self.animator.push(value, time.monotonic())
+            self.scheduler.markDirty(self)
+            return
+        self.current_value = value
+        shown = int(round(value))
+        # Si el número visible no cambia no hace falta repintar
+        if shown == self._shown_value:
+            return
+        self._shown_value = shown
+        self.scheduleRepaint()
+
+    def setLimitValue(self, value):
+        if value == self.limit_value:
+            return
+        self.limit_value = value
+        self._limit_text = f"Lim: {int(self.limit_value)}"
+        self.scheduleRepaint()
+
+    def renderFrame(self, now):
+        # Llamado por RenderScheduler en cada cuadro mientras el widget esté sucio
+        if self.animator is None:
+            self.update()
+            return False
+        moving = self.animator.step(now)
+        if self.animator.position != self.current_value:
+            self.current_value = self.animator.position
+            self.update()
+        return moving
+
+    def scheduleRepaint(self):
+        if self.scheduler is not None:
+            self.scheduler.markDirty(self)
+        else:
+            self.update()
+
+    def resizeEvent(self, event):
+        self._static_layer = None
+        super().resizeEvent(event)
+
+    def _buildStaticLayer(self):
+        w = self.width()
+        h = self.height()
+        ratio = self.devicePixelRatioF()
+        pixmap = QtGui.QPixmap(int(w * ratio), int(h * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(QtCore.Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        center = QtCore.QPointF(w/2, h/2)
+        radius = min(w, h) / 2 - 10
+
+        # Fondo y borde
+        painter.setPen(self._bezel_pen)
+        painter.setBrush(self._background_brush)
+        painter.drawEllipse(center, radius, radius)
+
+        # Pista del arco
+        painter.setPen(self._track_pen)
+        painter.drawArc(10, 10, w-20, h-20, self.START_ANGLE*16, self.SPAN_ANGLE*16)
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        started = time.monotonic_ns() if self.paintObserver else 0
+        if self._static_layer is None:
+            self._static_layer = self._buildStaticLayer()
+
+        w = self.width()
+        h = self.height()
+        center = QtCore.QPointF(w/2, h/2)
+        radius = min(w, h) / 2 - 10
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._static_layer)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        startAngle = self.START_ANGLE
+        fraction = (self.current_value - self.min_value) / (self.max_value - self.min_value)
+        valueAngle = startAngle + fraction * self.SPAN_ANGLE
+
+        self._gradient.setCenter(center)
+        self._gradient.setAngle(-valueAngle)
+        self._value_pen.setBrush(self._gradient)
+        painter.setPen(self._value_pen)
+        painter.drawArc(10, 10, w-20, h-20, startAngle*16, int((valueAngle - startAngle)*16))
+
+        # Aguja
+        painter.save()
+        painter.translate(center)
+        painter.rotate(valueAngle)
+        painter.setPen(self._needle_pen)
+        painter.drawLine(0, 0, radius - 20, 0)
+        painter.restore()
+
+        # Texto central (valor actual)
+        painter.setPen(self._text_color)
+        painter.setFont(self._font)
+        painter.drawText(self.rect(), QtCore.Qt.AlignCenter, f"{int(self.current_value)}")
+
+        # Texto inferior: muestra el límite
+        painter.setFont(self._font_small)
+        bottom_rect = QtCore.QRect(0, int(h/2+20), w, 30)
+        painter.drawText(bottom_rect, QtCore.Qt.AlignCenter, self._limit_text)
+
+        painter.end()
+        if started:
+            self.paintObserver(started, time.monotonic_ns())
+
+# --- StripChartWidget: historial de velocidad y RPM ---
+class StripChartWidget(QtWidgets.QWidget):
+    # (canal, valor máximo de la escala, color)
+    CHANNELS = (
+        ("speed", 400, "#00b8fe"),
+        ("rpm", 6000, "#fc4a1a"),
+    )
+    COLUMN_WIDTH = 2
+
+    def __init__(self, history, window, parent=None, scheduler=None):
+        super().__init__(parent)
+        self.history = history
+        # Segundos que abarca el gráfico completo
+        self.window = window
+        self.scheduler = scheduler
+        self._pens = {canal: QPen(QColor(color), self.COLUMN_WIDTH) for canal, _, color in self.CHANNELS}
+        self._border_pen = QPen(QColor("#555555"), 1)
+        self._background = QColor("#000000")
+        self._text_color = QColor("#FFFFFF")
+        self._font_small = QFont("Arial", 9)
+
+    def sampleAdded(self):
+        if self.scheduler is not None:
+            self.scheduler.markDirty(self)
+        else:
+            self.update()
+
+    def paintEvent(self, event):
+        w = self.width()
+        h = self.height()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self._background)
+        painter.setPen(self._border_pen)
+        painter.drawRect(0, 0, w - 1, h - 1)
+
+        columns = max(1, w // self.COLUMN_WIDTH)
+        now = time.monotonic()
+        # Posición x de cada columna, igual para todos los canales
+        xs = [i * self.COLUMN_WIDTH + self.COLUMN_WIDTH / 2 for i in range(columns)]
+        for canal, maximo, _ in self.CHANNELS:
+            mins, maxs = self.history.envelope(canal, columns, self.window, now)
+            # Escalar a píxeles de una vez; las columnas vacías siguen en NaN
+            y_top = h - 1 - (maxs / maximo).clip(0, 1) * (h - 2)
+            y_bottom = h - 1 - (mins / maximo).clip(0, 1) * (h - 2)
+            lines = [
+                QtCore.QLineF(x, top, x, bottom + 1)
+                for x, top, bottom in zip(xs, y_top.tolist(), y_bottom.tolist())
+                if top == top  # Descarta NaN
+            ]
+            painter.setPen(self._pens[canal])
+            painter.drawLines(lines)
+
+        painter.setPen(self._text_color)
+        painter.setFont(self._font_small)
+        painter.drawText(6, 14, f"Vel / RPM · últimos {int(self.window // 60)} min")
+        painter.end()
+
+# --- Variables Globales ---
+# Tasa máxima de muestras prevista para dimensionar el historial
+HISTORY_MAX_RATE = 200
+
+_KEY_PRESS = QtCore.QEvent.KeyPress
+_KEY_RELEASE = QtCore.QEvent.KeyRelease
+
+# --- Puente entre el hilo serial y la interfaz ---
+class SerialBridge(QtCore.QObject):
+    # Se emiten desde los hilos de SerialWorker; al conectarse con
+    # QueuedConnection los slots corren en el hilo de la interfaz.
+    muestraRecibida = QtCore.Signal(int, int)
+    errorSerial = QtCore.Signal(str)
+    estadoEnlace = QtCore.Signal(str)
+
+# --- Ventana de Control Real (modo Bluetooth) ---
+class ControlWindow(QtWidgets.QMainWindow):
+    def __init__(self, serialConnection, settings, app):
+        super().__init__()
+        self.serialConnection = serialConnection
+        self.settings = settings
+        self.setWindowTitle("Dashboard")
+        self.setFixedSize(800, 600)
+        self.app = app
+        self.interface = TestWindow(settings, serialConnection, parent=self)
+        self.setCentralWidget(self.interface)
+
+# --- TestWindow: Dashboard (simulado y real) ---
+class TestWindow(QtWidgets.QMainWindow):
+    def __init__(self, settings, serialConnection=None, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.serialConnection = serialConnection  # Si hay datos reales del Arduino
+        self.setWindowTitle("Dashboard")
+        self.setFixedSize(800, 600)
+        
+        # Variables del tablero
+        self.currentGear = "1"   # Engranaje inicial (manual)
+        self.odometer = settings.get("speed_initial", 0)   # Velocidad actual
+        self.rpm = 0             # RPM actual
+        
+        # Límites asignados según el engranaje actual
+        self.limit_speed = gearMapping[self.currentGear]["maxSpeed"]
+        self.limit_rpm = gearMapping[self.currentGear]["maxRPM"]
+        
+        # Variables para luces direccionales
+        self.leftLightOn = False
+        self.rightLightOn = False
+        self.blinkOn = False  # Fase del parpadeo, común a las dos luces
+        
+        central = QtWidgets.QWidget(self)
+        self.setCentralWidget(central)
+        layout = QtWidgets.QVBoxLayout(central)
+        
+        # Encabezado
+        header = QtWidgets.QLabel("Dashboard", self)
+        header.setObjectName("TitleLabel")
+        header.setAlignment(QtCore.Qt.AlignCenter)
+        layout.addWidget(header)
+        
+        # Sección superior: D-Pad (izquierda), Indicadores (centro), Luces direccionales (derecha)
+        top_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(top_layout)
+        
+        # D-Pad
+        dpad = QtWidgets.QWidget(self)
+        dpad_layout = QtWidgets.QGridLayout(dpad)
+        btn_size = 50
+        self.btnUp = QtWidgets.QPushButton("↑")
+        self.btnDown = QtWidgets.QPushButton("↓")
+        self.btnLeft = QtWidgets.QPushButton("←")
+        self.btnRight = QtWidgets.QPushButton("→")
+        self.btnStop = QtWidgets.QPushButton("■")
+        for btn in [self.btnUp, self.btnDown, self.btnLeft, self.btnRight, self.btnStop]:
+            btn.setFixedSize(btn_size, btn_size)
+            btn.setStyleSheet("font-size: 16px;")
+        dpad_layout.addWidget(self.btnUp, 0, 1)
+        dpad_layout.addWidget(self.btnLeft, 1, 0)
+        dpad_layout.addWidget(self.btnStop, 1, 1)
+        dpad_layout.addWidget(self.btnRight, 1, 2)
+        dpad_layout.addWidget(self.btnDown, 2, 1)
+        top_layout.addWidget(dpad)
+        
+        # Indicadores: Odómetro y Tacómetro
+        gauges = QtWidgets.QWidget(self)
+        gauges_layout = QtWidgets.QVBoxLayout(gauges)
+        # Un solo timer para el repintado, los comandos, el bus, la inercia,
+        # el parpadeo y el overlay de latencias; en reposo se detiene por completo
+        self.ticks = TickScheduler(100, self)
+        self.renderScheduler = RenderScheduler(settings.get("render_fps", 60), self, ticks=self.ticks)
+        animated = settings.get("needle_animation", True)
+        self.speedGauge = GaugeWidget("speed", 0, 400, self, scheduler=self.renderScheduler, animated=animated)
+        self.tachGauge = GaugeWidget("rpm", 0, 6000, self, scheduler=self.renderScheduler, animated=animated)
+        gauges_layout.addWidget(self.speedGauge)
+        gauges_layout.addWidget(self.tachGauge)
+        top_layout.addWidget(gauges)
+        
+        # Luces direccionales (inicialmente con color inactivo)
+        lights = QtWidgets.QWidget(self)
+        lights_layout = QtWidgets.QVBoxLayout(lights)
+        self.labelLuzIzq = QtWidgets.QLabel("←", self)
+        self.labelLuzDer = QtWidgets.QLabel("→", self)
+        # Paletas precalculadas: parpadear solo cambia de paleta, sin
+        # volver a parsear una hoja de estilo en cada cambio
+        self._lightPaletteOff = QtGui.QPalette(self.labelLuzIzq.palette())
+        self._lightPaletteOff.setColor(QtGui.QPalette.WindowText, QColor("#888888"))
+        self._lightPaletteOn = QtGui.QPalette(self._lightPaletteOff)
+        self._lightPaletteOn.setColor(QtGui.QPalette.WindowText, QColor("yellow"))
+        for label in (self.labelLuzIzq, self.labelLuzDer):
+            font = label.font()
+            font.setPixelSize(24)
+            label.setFont(font)
+            label.setPalette(self._lightPaletteOff)
+        lights_layout.addWidget(self.labelLuzIzq)
+        lights_layout.addWidget(self.labelLuzDer)
+        top_layout.addWidget(lights)
+        
+        # Sección central: historial de velocidad y RPM, y computadora de viaje
+        center = QtWidgets.QWidget(self)
+        center_layout = QtWidgets.QHBoxLayout(center)
+        history_window = settings.get("history_minutes", 5) * 60
+        self.history = TelemetryHistory(history_window * HISTORY_MAX_RATE)
+        self.historyChart = StripChartWidget(self.history, history_window, self, scheduler=self.renderScheduler)
+        self.historyChart.setFixedSize(400, 200)
+        center_layout.addWidget(self.historyChart, alignment=QtCore.Qt.AlignCenter)
+        self.trip = TripComputer()
+        self.tripPanel = QtWidgets.QLabel(self.trip.text(), self)
+        self.tripPanel.setStyleSheet("color: #ddd; font-family: monospace; font-size: 11px;")
+        center_layout.addWidget(self.tripPanel)
+        layout.addWidget(center)
+        
+        # Sección inferior: Panel de funciones
+        bottom = QtWidgets.QWidget(self)
+        bottom_layout = QtWidgets.QHBoxLayout(bottom)
+        self.btnFrenoAuto = QtWidgets.QPushButton("Freno Automático", self)
+        self.btnLucesDireccionales = QtWidgets.QPushButton("Luces Direccionales", self)
+        self.btnPanelVel = QtWidgets.QPushButton("Panel Velocidad (N-1-7)", self)
+        self.btnAutomatico = QtWidgets.QPushButton("Automático", self)
+        self.btnRR4 = QtWidgets.QPushButton("R-R4", self)
+        for btn in [self.btnFrenoAuto, self.btnLucesDireccionales, self.btnPanelVel, self.btnAutomatico, self.btnRR4]:
+            btn.setStyleSheet("font-size: 14px; padding: 10px;")
+            bottom_layout.addWidget(btn)
+        layout.addWidget(bottom)
+        
+        self.app = QtWidgets.QApplication.instance()
+        self.app.installEventFilter(self)
+        
+        # Modo simulado: el modelo del carrito vive en VehicleSim
+        self.sim = None
+        if not self.serialConnection:
+            self.sim = VehicleSim(self.currentGear, self.odometer)
+            self.odometer = self.sim.speed
+            self.rpm = self.sim.rpm
+        self._last_sim_time = time.monotonic()
+
+        self.ticks.add("inercia", self.decelerate_gauges)
+        self.ticks.add("luces", self.blinkLights, every=5)
+        # El panel de viaje se refresca a 2 Hz como máximo, y solo si hubo muestras
+        self.ticks.add("viaje", self.updateTripPanel, every=5)
+        self.wakeInertia()
+        
+        # Instrumentación de latencias (apagada: ningún costo en el camino crítico)
+        self.latency = LatencyRecorder() if settings.get("latency_instrumentation", False) else None
+        self._pending_arrival_ns = 0
+        if self.latency:
+            self.speedGauge.paintObserver = self.gaugePainted
+            self.tachGauge.paintObserver = self.gaugePainted
+            if settings.get("latency_overlay", False):
+                self.latencyOverlay = QtWidgets.QLabel(self)
+                self.latencyOverlay.setStyleSheet(
+                    "background-color: rgba(0,0,0,0.7); color: #0f0; font-family: monospace; font-size: 10px; padding: 4px;")
+                self.latencyOverlay.move(8, 8)
+                self.latencyOverlay.show()
+                self.ticks.add("latencias", self.updateLatencyOverlay, every=5, awake=True)
+
+        # Si hay conexión serial, un hilo dedicado lee la telemetría y
+        # escribe los comandos; la interfaz solo recibe muestras ya parseadas
+        self.serialWorker = None
+        if self.serialConnection:
+            self.serialBridge = SerialBridge(self)
+            self.serialBridge.muestraRecibida.connect(self.updateFromSerial, QtCore.Qt.QueuedConnection)
+            self.serialBridge.errorSerial.connect(self.reportSerialError, QtCore.Qt.QueuedConnection)
+            self.serialBridge.estadoEnlace.connect(self.reportLinkState, QtCore.Qt.QueuedConnection)
+            if isinstance(self.serialConnection, AsyncSerialTransport):
+                # El transporte ya es dueño del puerto y se reconecta solo
+                self.serialWorker = self.serialConnection
+                self.serialWorker.on_muestra = self.serialBridge.muestraRecibida.emit
+                self.serialWorker.on_error = self.serialBridge.errorSerial.emit
+                self.serialWorker.on_estado = self.serialBridge.estadoEnlace.emit
+            else:
+                self.serialWorker = SerialWorker(
+                    self.serialConnection,
+                    on_muestra=self.serialBridge.muestraRecibida.emit,
+                    on_error=self.serialBridge.errorSerial.emit,
+                )
+            self.serialWorker.latency = self.latency
+            self.serialWorker.start()
+
+        # Estado deseado de los comandos: se envía solo lo que cambia,
+        # agrupado en un write() por tick, más un keep-alive si hay teclas mantenidas
+        self.commands = CommandScheduler(keepalive=settings.get("command_keepalive", 0.5))
+        self._command_t0 = None
+        self.ticks.add("comandos", self.flushCommands, period_ms=settings.get("command_tick_ms", 20))
+
+        # Entrada proporcional opcional: un hilo muestrea el joystick (o el
+        # teclado con rampa) a tasa fija y encola tramas analógicas sin pasar por la interfaz
+        self.inputSampler = None
+        self.keyboardInput = None
+        backend_class = BACKENDS.get(settings.get("input_backend", "comandos"))
+        if self.serialWorker and backend_class:
+            backend = backend_class()
+            if isinstance(backend, KeyboardBackend):
+                self.keyboardInput = backend
+            self.inputSampler = InputSampler(
+                backend, self.serialWorker.enviar,
+                rate=settings.get("input_rate", 100),
+                zona_muerta=settings.get("input_deadzone", 0.08),
+                expo=settings.get("input_expo", 1.5),
+                keepalive=settings.get("command_keepalive", 0.5),
+                on_error=self.serialBridge.errorSerial.emit)
+            self.inputSampler.start()
+
+        # Mapear teclas según settings (se recompila solo al guardar la configuración)
+        self.rebuildKeymap()
+
+        # Grabación opcional de la sesión real (no se graba una reproducción)
+        self.recorder = None
+        if (self.serialConnection and self.settings.get("record_telemetry", False)
+                and not isinstance(self.serialConnection, ReplaySerial)):
+            self.recorder = TelemetryRecorder(time.strftime("telemetria_%Y%m%d_%H%M%S.carlog"))
+
+        # Bus en memoria compartida para otros procesos locales (registradores,
+        # pilotos automáticos): cada muestra se publica y se aceptan comandos autorizados
+        self.bus = None
+        if settings.get("telemetry_bus", False):
+            try:
+                self.bus = TelemetryBus(settings.get("telemetry_bus_name", "carrito"))
+            except (BusOcupado, ValueError) as e:
+                bitacora.error("bus_no_disponible", "Bus de telemetría desactivado: {error}", error=str(e))
+        if self.bus:
+            # El buzón se revisa en un tick del planificador cuando suena el
+            # timbre del bus; sin timbre, con cada muestra publicada
+            self.ticks.add("bus", self.pollBusCommands, period_ms=settings.get("command_tick_ms", 20))
+            if self.bus.timbre is not None:
+                self.busNotifier = QtCore.QSocketNotifier(
+                    self.bus.timbre.fileno(), QtCore.QSocketNotifier.Read, self)
+                self.busNotifier.activated.connect(self.busRang)
+
+        # Servidor web para seguir la sesión desde otras máquinas: lee en su
+        # propio hilo los mismos valores que muestran los indicadores
+        self.webServer = None
+        if settings.get("web_server", False):
+            self.webServer = TelemetryServer(
+                lambda: estado_web(self.odometer, self.rpm, self.currentGear, self.leftLightOn, self.rightLightOn),
+                settings.get("web_host", "0.0.0.0"), settings.get("web_port", 8765),
+                settings.get("web_max_rate", 30))
+            self.webServer.start()
+        
+        # Establecer valores iniciales en los gauges
+        self.speedGauge.setLimitValue(self.limit_speed)
+        self.tachGauge.setLimitValue(self.limit_rpm)
+        self.speedGauge.setValue(self.odometer)
+        self.tachGauge.setValue(self.rpm)
+
+    def updateFromSerial(self, vel, rpm_val):
+        """
+        Recibe (en el hilo de la interfaz) una muestra 'VEL=<valor> RPM=<valor>'
+        ya parseada por SerialWorker y actualiza el odómetro y el tacómetro.
+        """
+        if self.latency and self.serialWorker.arribos:
+            arrival = self.serialWorker.arribos.popleft()
+            self.latency.record(ETAPA_SERIAL_UI, time.monotonic_ns() - arrival)
+            self._pending_arrival_ns = self._pending_arrival_ns or arrival
+        if self.recorder:
+            self.recorder.recordSample(vel, rpm_val, self.currentGear)
+        # Una reproducción trae la marcha grabada y muestra los valores tal
+        # como se grabaron, sin recortarlos a la marcha del teclado
+        replay = isinstance(self.serialConnection, ReplaySerial)
+        if replay and self.serialConnection.marchas:
+            gear = self.serialConnection.marchas.popleft()
+            if gear in gearMapping:
+                self.currentGear = gear
+
+        # --- Actualizar velocidad ---
+        # Asegurar dentro del límite del engranaje actual
+        lim_speed = gearMapping[self.currentGear]["maxSpeed"]
+        clipped = vel > lim_speed and not replay
+        if not replay:
+            vel = max(0, min(vel, lim_speed))
+        self.odometer = vel
+        self.speedGauge.setLimitValue(lim_speed)
+        self.speedGauge.setValue(self.odometer)
+
+        # --- Actualizar RPM ---
+        lim_rpm = gearMapping[self.currentGear]["maxRPM"]
+        if not replay:
+            rpm_val = max(0, min(rpm_val, lim_rpm))
+        self.rpm = rpm_val
+        self.tachGauge.setLimitValue(lim_rpm)
+        self.tachGauge.setValue(self.rpm)
+        self.recordHistory(clipped)
+        self.wakeInertia()
+
+    def recordHistory(self, clipped=False):
+        now = time.monotonic()
+        self.history.append(now, self.odometer, self.rpm)
+        self.historyChart.sampleAdded()
+        self.trip.registrar(now, self.odometer, self.rpm, self.currentGear, clipped)
+        self.ticks.wake("viaje")
+        if self.bus:
+            self.bus.publish(self.odometer, self.rpm, self.currentGear)
+            if self.bus.timbre is None:
+                self.ticks.wake("bus")
+
+    def busRang(self):
+        # Vaciar el timbre ya: el notifier avisa mientras queden datos sin leer
+        self.bus.atender_timbre()
+        self.ticks.wake("bus")
+
+    def pollBusCommands(self):
+        """Tarea "bus" de TickScheduler: un comando nuevo la vuelve a despertar."""
+        comando = self.bus.comando_pendiente()
+        if comando:
+            self.applyExternalCommand(comando)
+        return False
+
+    def applyExternalCommand(self, comando):
+        """
+        Aplica un comando llegado por el bus con los mismos bytes del
+        protocolo del carrito: a/r/i/d se mantienen hasta un 'p', los
+        dígitos cambian de marcha. En modo simulado se traduce a VehicleSim.
+        """
+        if self.serialConnection:
+            for byte in comando:
+                tecla = bytes((byte,))
+                if tecla in b"1234567":
+                    self.commands.setGear(tecla)
+                elif tecla in (b"a", b"r", b"i", b"d", b"p"):
+                    self.commands.press(tecla)
+            if self.commands.pending():
+                self.scheduleCommands()
+            return
+        acciones = {"a": self.sim.accelerate, "r": self.sim.reverse, "p": self.sim.brake}
+        for tecla in comando.decode(errors="ignore"):
+            if tecla in acciones:
+                acciones[tecla]()
+            elif tecla in "1234567NR":
+                self.sim.selectGear(tecla)
+        self.syncFromSim()
+        self.wakeInertia()
+
+    def reportSerialError(self, mensaje):
+        bitacora.error("error_serial", "Error en la conexión serial: {mensaje}", mensaje=mensaje)
+
+    def reportLinkState(self, estado):
+        self.statusBar().showMessage(f"Enlace: {estado}")
+
+    def gaugePainted(self, started, finished):
+        self.latency.record(ETAPA_PINTADO, finished - started)
+        # La muestra más vieja aún no pintada define la latencia hasta el pixel
+        if self._pending_arrival_ns:
+            self.latency.record(ETAPA_SERIAL_PIXEL, finished - self._pending_arrival_ns)
+            self._pending_arrival_ns = 0
+
+    def updateLatencyOverlay(self):
+        self.latencyOverlay.setText(self.latency.text())
+        self.latencyOverlay.adjustSize()
+        self.latencyOverlay.raise_()
+        return True
+
+    def scheduleCommands(self, t0=None):
+        if self._command_t0 is None:
+            self._command_t0 = t0
+        # Un cambio aislado sale de inmediato; los siguientes esperan al tick
+        if not self.ticks.isAwake("comandos") and self.flushCommands():
+            self.ticks.wake("comandos")
+
+    def flushCommands(self):
+        """Tarea "comandos" de TickScheduler: True mientras haya teclas mantenidas o cambios."""
+        salida = self.commands.tick()
+        if salida:
+            self.enviarComando(salida, self._command_t0)
+            self._command_t0 = None
+            bitacora.info("comando_enviado", "Comando enviado: {comando}", comando=salida.decode())
+        return self.commands.active()
+
+    def enviarComando(self, comando, t0=None):
+        # Solo encola: el hilo escritor de SerialWorker hace el write()
+        if self.serialWorker:
+            self.serialWorker.enviar(comando, t0)
+        if self.recorder:
+            self.recorder.recordCommand(comando, self.odometer, self.rpm, self.currentGear)
+
+
+    def syncFromSim(self):
+        # Copia el estado de VehicleSim al tablero
+        if self.sim.gear != self.currentGear:
+            self.currentGear = self.sim.gear
+            gear_limits = gearMapping[self.currentGear]
+            self.speedGauge.setLimitValue(gear_limits["maxSpeed"])
+            self.tachGauge.setLimitValue(gear_limits["maxRPM"])
+        self.odometer = self.sim.speed
+        self.rpm = self.sim.rpm
+        self.speedGauge.setValue(self.odometer)
+        self.tachGauge.setValue(self.rpm)
+
+    def decelerate_gauges(self):
+        """Tarea de inercia de TickScheduler: True mientras el carrito se mueva."""
+        now = time.monotonic()
+        elapsed = now - self._last_sim_time
+        self._last_sim_time = now
+        if self.sim:
+            # En modo simulado el historial se muestrea a la tasa de este timer
+            self.sim.advance(elapsed)
+            self.syncFromSim()
+            self.recordHistory()
+            return self.sim.speed > 0
+        if isinstance(self.serialConnection, ReplaySerial):
+            # El registro ya trae la frenada; la inercia llevaría a "N" entre muestras
+            return False
+        changed = False
+        # En modo simulado se desacelera gradualmente si no se mantiene presionado
+        if self.odometer > 0:
+            self.odometer = max(0, self.odometer - 2)
+            changed = True
+        if self.rpm > 0:
+            self.rpm = max(0, self.rpm - 150)
+            changed = True
+        if changed:
+            self.speedGauge.setValue(self.odometer)
+            self.tachGauge.setValue(self.rpm)
+            if self.odometer == 0:
+                self.currentGear = "N"
+                self.speedGauge.setLimitValue(gearMapping["N"]["maxSpeed"])
+                self.tachGauge.setLimitValue(gearMapping["N"]["maxRPM"])
+            self.trip.registrar(now, self.odometer, self.rpm, self.currentGear)
+            self.ticks.wake("viaje")
+        return self.odometer > 0 or self.rpm > 0
+
+    def updateTripPanel(self):
+        self.tripPanel.setText(self.trip.text())
+        return False
+
+    def blinkLights(self):
+        # Alterna entre amarillo e inactivo las luces encendidas, en fase
+        self.blinkOn = not self.blinkOn
+        palette = self._lightPaletteOn if self.blinkOn else self._lightPaletteOff
+        if self.leftLightOn:
+            self.labelLuzIzq.setPalette(palette)
+        if self.rightLightOn:
+            self.labelLuzDer.setPalette(palette)
+        return self.leftLightOn or self.rightLightOn
+        
+    def rebuildKeymap(self):
+        """
+        Precompila las tablas tecla → manejadores que usa eventFilter, para no
+        reconstruir diccionarios ni leer settings en cada pulsación.
+        """
+        self.map_forward = self.settings.get("forward_key", "r")
+        self.map_backward = self.settings.get("backward_key", "a")
+        self.map_stop = self.settings.get("stop_key", "p")
+        self.map_luz_izq = self.settings.get("luces_direccion_izquierda", "q")
+        self.map_luz_der = self.settings.get("luces_direccion_derecha", "e")
+        self.speed_change_key = self.settings.get("speed_change_key", "c")
+        handlers = {}
+        self._releaseHandlers = {}
+        if self.serialConnection:
+            # Modo real: se envían comandos al Arduino
+            movement_keys = {
+                self.map_forward: b'a',
+                self.map_backward: b'r',
+                self.settings.get("left_key", "i"): b'i',
+                self.settings.get("right_key", "d"): b'd',
+            }
+            movement_keys[' '] = b'p'
+            # Con el teclado como entrada proporcional el movimiento va al backend
+            movement = self.keyboardInput or self.commands
+            for key, comando in movement_keys.items():
+                handlers[key] = [partial(movement.press, comando)]
+                if comando != b'p':
+                    self._releaseHandlers[key] = partial(movement.release, comando)
+            for key in '1234567':
+                handlers.setdefault(key, []).append(partial(self.commands.setGear, key.encode()))
+            handlers.setdefault(self.speed_change_key, []).append(self.cycleGear)
+        else:
+            # Modo simulado: una sola acción del carrito por tecla, en este orden de prioridad
+            actions = [
+                (self.map_forward, self.sim.accelerate),
+                (self.map_backward, self.sim.reverse),
+                (self.map_stop, self.sim.brake),
+                (self.settings.get("auto_brake_key", "b"), self.sim.brake),
+            ] + [(key, partial(self.sim.selectGear, key)) for key in '1234567NR']
+            for key, action in actions:
+                if key not in handlers:
+                    handlers[key] = [partial(self.simulate, action)]
+            # Soporte para luces direccionales: se activa o desactiva al pulsar su tecla
+            handlers.setdefault(self.map_luz_izq, []).append(self.toggleLeftLight)
+            handlers.setdefault(self.map_luz_der, []).append(self.toggleRightLight)
+        self._pressHandlers = {key: tuple(fs) for key, fs in handlers.items()}
+
+    def simulate(self, action):
+        action()
+        self.syncFromSim()
+        self.wakeInertia()
+
+    def wakeInertia(self):
+        if not self.ticks.isAwake("inercia"):
+            # Tras el reposo la simulación sigue desde ahora, no desde el último tick
+            self._last_sim_time = time.monotonic()
+            self.ticks.wake("inercia")
+
+    def cycleGear(self):
+        current_index = int(self.currentGear) if self.currentGear.isdigit() else 1
+        new_index = current_index + 1 if current_index < 7 else 1
+        self.currentGear = str(new_index)
+        gear_limits = gearMapping[self.currentGear]
+        self.odometer = gear_limits["maxSpeed"]
+        self.rpm = gear_limits["maxRPM"]
+        self.speedGauge.setValue(self.odometer)
+        self.tachGauge.setValue(self.rpm)
+        self.speedGauge.setLimitValue(gear_limits["maxSpeed"])
+        self.tachGauge.setLimitValue(gear_limits["maxRPM"])
+        bitacora.info("cambio_velocidad", "Cambio de velocidad: {marcha}", marcha=self.currentGear)
+        self.commands.setGear(self.currentGear.encode())
+        self.wakeInertia()
+
+    def toggleLeftLight(self):
+        self.leftLightOn = not self.leftLightOn
+        if self.leftLightOn:
+            self.ticks.wake("luces")
+        else:
+            self.labelLuzIzq.setPalette(self._lightPaletteOff)
+
+    def toggleRightLight(self):
+        self.rightLightOn = not self.rightLightOn
+        if self.rightLightOn:
+            self.ticks.wake("luces")
+        else:
+            self.labelLuzDer.setPalette(self._lightPaletteOff)
+
+    def eventFilter(self, obj, event):
+        # Filtro a nivel de aplicación: ve todos los eventos de todos los
+        # objetos, así que lo que no es teclado sale antes de cualquier trabajo
+        event_type = event.type()
+        if event_type == _KEY_PRESS:
+            handlers = self._pressHandlers.get(event.text())
+            if handlers:
+                t0 = time.monotonic_ns() if self.latency else None
+                for handler in handlers:
+                    handler()
+                if self.serialConnection and self.commands.pending():
+                    self.scheduleCommands(t0)
+        elif event_type == _KEY_RELEASE and self.serialConnection:
+            # Se filtra a nivel de aplicación para no perder la liberación si
+            # el foco está en otro widget (la tecla quedaría "mantenida")
+            handler = self._releaseHandlers.get(event.text())
+            if handler and not event.isAutoRepeat():
+                t0 = time.monotonic_ns() if self.latency else None
+                handler()
+                if self.commands.pending():
+                    self.scheduleCommands(t0)
+        return False
+
+    def closeEvent(self, event):
+        self.app.removeEventFilter(self)
+        self.ticks.stop()
+        if self.serialConnection:
+            # Dejar el carrito detenido antes de soltar el enlace
+            self.commands.stop()
+            self.flushCommands()
+        if self.inputSampler:
+            # Al terminar envía acelerador y dirección en cero
+            self.inputSampler.stop()
+        if self.serialWorker:
+            self.serialWorker.stop()
+        if self.recorder:
+            self.recorder.close()
+        if self.bus:
+            if self.bus.timbre is not None:
+                self.busNotifier.setEnabled(False)
+            self.bus.close()
+        if self.webServer:
+            self.webServer.stop()
+        if isinstance(self.serialConnection, ReplaySerial):
+            self.serialConnection.close()
+        if self.latency:
+            filename = time.strftime("latencias_%Y%m%d_%H%M%S.json")
+            self.latency.export(filename)
+            bitacora.info("latencias_exportadas", "Latencias exportadas a {archivo}", archivo=filename)
+        if self.trip.muestras and self.settings.get("trip_export", True):
+            filename = time.strftime("viaje_%Y%m%d_%H%M%S.json")
+            self.trip.export(filename)
+            bitacora.info("viaje_exportado", "Resumen del viaje exportado a {archivo}", archivo=filename)
+        super().closeEvent(event)
+
+# --- Flota: varios carritos en una grilla ---
+class FleetBridge(QtCore.QObject):
+    # Como SerialBridge, con el índice del carrito como primer argumento
+    muestraRecibida = QtCore.Signal(int, int, int)
+    errorSerial = QtCore.Signal(int, str)
+    estadoEnlace = QtCore.Signal(int, str)
+
+class FleetTile(QtWidgets.QFrame):
+    """Un carrito de la flota: puerto, estado del enlace e indicadores."""
+    clicked = QtCore.Signal(int)
+
+    def __init__(self, index, port, scheduler, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.currentGear = "1"
+        self.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        layout = QtWidgets.QVBoxLayout(self)
+        self.title = QtWidgets.QLabel(f"{index + 1}: {port}", self)
+        self.title.setAlignment(QtCore.Qt.AlignCenter)
+        self.state = QtWidgets.QLabel("desconectado", self)
+        self.state.setAlignment(QtCore.Qt.AlignCenter)
+        layout.addWidget(self.title)
+        layout.addWidget(self.state)
+        gauges = QtWidgets.QHBoxLayout()
+        self.speedGauge = GaugeWidget("speed", 0, 400, self, scheduler=scheduler)
+        self.tachGauge = GaugeWidget("rpm", 0, 6000, self, scheduler=scheduler)
+        for gauge in (self.speedGauge, self.tachGauge):
+            gauge.setMinimumSize(110, 110)
+            gauges.addWidget(gauge)
+        layout.addLayout(gauges)
+        self.setGear(self.currentGear)
+
+    def setGear(self, gear):
+        self.currentGear = gear
+        self.speedGauge.setLimitValue(gearMapping[gear]["maxSpeed"])
+        self.tachGauge.setLimitValue(gearMapping[gear]["maxRPM"])
+
+    def setSelected(self, selected):
+        self.setStyleSheet("FleetTile { border: 2px solid #41dcf4; }" if selected else "")
+
+    def updateSample(self, vel, rpm_val):
+        limits = gearMapping[self.currentGear]
+        self.speedGauge.setValue(max(0, min(vel, limits["maxSpeed"])))
+        self.tachGauge.setValue(max(0, min(rpm_val, limits["maxRPM"])))
+
+    def mousePressEvent(self, event):
+        self.clicked.emit(self.index)
+        super().mousePressEvent(event)
+
+class FleetWindow(QtWidgets.QMainWindow):
+    """
+    Un tablero compacto por carrito en una grilla. Toda la E/S de la flota
+    corre en un único SerialLoop (ver flota.Fleet), y un solo TickScheduler
+    repinta los indicadores y envía los comandos de todos los carritos. El teclado controla el carrito seleccionado (clic en su
+    recuadro) o a todos a la vez.
+    """
+    def __init__(self, settings, ports, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.setWindowTitle(f"Flota ({len(ports)} carritos)")
+        central = QtWidgets.QWidget(self)
+        self.setCentralWidget(central)
+        layout = QtWidgets.QVBoxLayout(central)
+        self.allCheck = QtWidgets.QCheckBox("Controlar todos los carritos", self)
+        layout.addWidget(self.allCheck)
+        grid = QtWidgets.QGridLayout()
+        layout.addLayout(grid)
+
+        self.ticks = TickScheduler(parent=self)
+        self.renderScheduler = RenderScheduler(settings.get("render_fps", 60), self, ticks=self.ticks)
+        columns = max(1, math.ceil(math.sqrt(len(ports))))
+        self.tiles = []
+        for i, port in enumerate(ports):
+            tile = FleetTile(i, port, self.renderScheduler, self)
+            tile.clicked.connect(self.selectCar)
+            grid.addWidget(tile, i // columns, i % columns)
+            self.tiles.append(tile)
+        self.selected = 0
+        self.selectCar(0)
+
+        self.bridge = FleetBridge(self)
+        self.bridge.muestraRecibida.connect(self.updateFromSerial, QtCore.Qt.QueuedConnection)
+        self.bridge.errorSerial.connect(self.reportSerialError, QtCore.Qt.QueuedConnection)
+        self.bridge.estadoEnlace.connect(self.reportLinkState, QtCore.Qt.QueuedConnection)
+        self.fleet = Fleet(ports, settings.get("baud_rate", 9600),
+            on_muestra=self.bridge.muestraRecibida.emit,
+            on_error=self.bridge.errorSerial.emit,
+            on_estado=self.bridge.estadoEnlace.emit,
+            heartbeat_timeout=settings.get("link_timeout", 5.0),
+            keepalive=settings.get("command_keepalive", 0.5))
+
+        self.ticks.add("comandos", self.flushCommands, period_ms=settings.get("command_tick_ms", 20))
+
+        self.rebuildKeymap()
+        self.app = QtWidgets.QApplication.instance()
+        self.app.installEventFilter(self)
+        self.fleet.start()
+
+    def rebuildKeymap(self):
+        movement_keys = {
+            self.settings.get("forward_key", "r"): b'a',
+            self.settings.get("backward_key", "a"): b'r',
+            self.settings.get("left_key", "i"): b'i',
+            self.settings.get("right_key", "d"): b'd',
+        }
+        self._releaseCommands = dict(movement_keys)
+        movement_keys[' '] = b'p'
+        self._pressCommands = movement_keys
+        self._gearKeys = frozenset('1234567')
+
+    def selectCar(self, index):
+        self.tiles[self.selected].setSelected(False)
+        self.selected = index
+        self.tiles[index].setSelected(True)
+
+    def targets(self):
+        return range(len(self.tiles)) if self.allCheck.isChecked() else (self.selected,)
+
+    def updateFromSerial(self, index, vel, rpm_val):
+        self.tiles[index].updateSample(vel, rpm_val)
+
+    def reportSerialError(self, index, mensaje):
+        bitacora.error("error_serial", "Error en la conexión serial ({puerto}): {mensaje}",
+                       puerto=self.fleet.puertos[index], mensaje=mensaje)
+
+    def reportLinkState(self, index, estado):
+        self.tiles[index].state.setText(estado)
+
+    def flushCommands(self):
+        return self.fleet.tick()
+
+    def eventFilter(self, obj, event):
+        event_type = event.type()
+        if event_type == _KEY_PRESS:
+            key = event.text()
+            comando = self._pressCommands.get(key)
+            if comando:
+                for i in self.targets():
+                    self.fleet.comandos[i].press(comando)
+            elif key in self._gearKeys:
+                for i in self.targets():
+                    self.fleet.comandos[i].setGear(key.encode())
+                    self.tiles[i].setGear(key)
+            else:
+                return False
+        elif event_type == _KEY_RELEASE and not event.isAutoRepeat():
+            comando = self._releaseCommands.get(event.text())
+            if not comando:
+                return False
+            for i in self.targets():
+                self.fleet.comandos[i].release(comando)
+        else:
+            return False
+        # Igual que TestWindow: el primer cambio sale de inmediato y los siguientes en el tick
+        if not self.ticks.isAwake("comandos") and self.flushCommands():
+            self.ticks.wake("comandos")
+        return False
+
+    def closeEvent(self, event):
+        self.app.removeEventFilter(self)
+        self.ticks.stop()
+        self.fleet.stop()
+        super().closeEvent(event)
@@ -0,0 +1,267 @@
+import re
+import struct
+
+# --- Telemetría del Arduino: parser incremental ---
+#
+# El Arduino puede enviar dos formatos por el mismo enlace:
+#   Texto:   b"VEL=155 RPM=1200\n"                        (~17 bytes)
+#   Binario: SYNC | TIPO | payload (struct) | CRC8         (7 bytes)
+# El byte SYNC (0xA5) nunca aparece en el texto ASCII, así que el parser
+# distingue ambos formatos sin configuración. El CRC8 cubre TIPO + payload.
+
+SYNC = 0xA5
+TIPO_TELEMETRIA = 0x01    # Arduino -> PC: vel, rpm
+TIPO_CONFIRMACION = 0x02  # Arduino -> PC: seq del último comando recibido
+TIPO_COMANDO = 0x10       # PC -> Arduino: seq, byte de comando
+TIPO_ANALOGICO = 0x11     # PC -> Arduino: seq, acelerador, dirección (int8, ±127)
+
+_FORMATOS = {
+    TIPO_TELEMETRIA: struct.Struct("<HH"),
+    TIPO_CONFIRMACION: struct.Struct("<B"),
+    TIPO_COMANDO: struct.Struct("<Bc"),
+    TIPO_ANALOGICO: struct.Struct("<Bbb"),
+}
+# Largo total de cada trama: SYNC + TIPO + payload + CRC
+_LARGOS = {tipo: fmt.size + 3 for tipo, fmt in _FORMATOS.items()}
+
+# Una línea válida empieza (tras espacios opcionales) con 'VEL=<n> RPM=<n>'
+_RE_MUESTRA = re.compile(rb"^[ \t\r]*VEL=(-?\d+)[ \t]+RPM=(-?\d+)", re.MULTILINE)
+
+def _tabla_crc8(polinomio=0x07):
+    tabla = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = ((crc << 1) ^ polinomio) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        tabla.append(crc)
+    return bytes(tabla)
+
+_CRC8 = _tabla_crc8()
+
+def crc8(data, inicio=0, fin=None):
+    """CRC-8 (polinomio 0x07, valor inicial 0) de data[inicio:fin]."""
+    crc = 0
+    tabla = _CRC8
+    for i in range(inicio, len(data) if fin is None else fin):
+        crc = tabla[crc ^ data[i]]
+    return crc
+
+def empaquetar(tipo, *campos):
+    """Arma una trama binaria completa con su CRC."""
+    cuerpo = bytes((tipo,)) + _FORMATOS[tipo].pack(*campos)
+    return bytes((SYNC,)) + cuerpo + bytes((crc8(cuerpo),))
+
+def leer_trama(buffer, pos=0):
+    """
+    Lee la trama binaria que empieza en buffer[pos] (un byte SYNC).
+    Devuelve (tipo, campos, largo): largo 0 si aún faltan bytes y -1 si no
+    es una trama válida (tipo desconocido o CRC incorrecto).
+    """
+    if len(buffer) - pos < 2:
+        return None, None, 0
+    tipo = buffer[pos + 1]
+    tam = _LARGOS.get(tipo)
+    if tam is None:
+        return tipo, None, -1
+    if len(buffer) - pos < tam:
+        return tipo, None, 0
+    if crc8(buffer, pos + 1, pos + tam - 1) != buffer[pos + tam - 1]:
+        return tipo, None, -1
+    return tipo, _FORMATOS[tipo].unpack_from(buffer, pos + 2), tam
+
+def empaquetar_telemetria(vel, rpm):
+    return empaquetar(TIPO_TELEMETRIA, vel, rpm)
+
+def empaquetar_confirmacion(seq):
+    return empaquetar(TIPO_CONFIRMACION, seq)
+
+class Muestra:
+    """Registro compacto de una muestra de telemetría."""
+    __slots__ = ("vel", "rpm")
+
+    def __init__(self, vel, rpm):
+        self.vel = vel
+        self.rpm = rpm
+
+    def __repr__(self):
+        return f"Muestra(vel={self.vel}, rpm={self.rpm})"
+
+class Confirmacion:
+    """El Arduino confirma haber recibido el comando con número seq."""
+    __slots__ = ("seq",)
+
+    def __init__(self, seq):
+        self.seq = seq
+
+    def __repr__(self):
+        return f"Confirmacion(seq={self.seq})"
+
+ESCALA_ANALOGICA = 127  # Valor máximo (en módulo) de los ejes en TIPO_ANALOGICO
+
+class ComandoAnalogico:
+    """Acelerador y dirección proporcionales, en enteros de -127 a 127."""
+    __slots__ = ("acelerador", "direccion")
+
+    def __init__(self, acelerador, direccion):
+        self.acelerador = acelerador
+        self.direccion = direccion
+
+    def __eq__(self, otro):
+        return (otro.__class__ is ComandoAnalogico and self.acelerador == otro.acelerador
+                and self.direccion == otro.direccion)
+
+    def __repr__(self):
+        return f"ComandoAnalogico(acelerador={self.acelerador}, direccion={self.direccion})"
+
+# Con firmware de solo texto el comando analógico se degrada a los de un byte
+UMBRAL_TEXTO = 32
+
+class TelemetryParser:
+    """
+    Recibe bytes crudos tal como llegan del puerto (en cualquier partición)
+    y devuelve los registros de las líneas y tramas completas. Los bytes se
+    acumulan en un único bytearray reutilizable y las líneas se reconocen con
+    una sola pasada del regex sobre el buffer, sin decodificar a str ni armar
+    dicts. Las tramas binarias se leen en el lugar con struct.unpack_from.
+    """
+    def __init__(self, max_buffer=4096):
+        self._buffer = bytearray()
+        # Si llega basura sin saltos de línea no se acumula indefinidamente
+        self.max_buffer = max_buffer
+        # Pasa a True con la primera trama binaria válida
+        self.binario = False
+        self.errores_crc = 0
+
+    def feed(self, data):
+        buffer = self._buffer
+        buffer += data
+        if buffer.find(SYNC) < 0:
+            # Camino rápido: solo texto
+            fin = buffer.rfind(b"\n")
+            if fin < 0:
+                if len(buffer) > self.max_buffer:
+                    del buffer[:]
+                return []
+            registros = [Muestra(int(vel), int(rpm)) for vel, rpm in _RE_MUESTRA.findall(buffer, 0, fin)]
+            # Conservar solo la línea incompleta del final
+            del buffer[:fin + 1]
+            return registros
+        registros = []
+        pos = self._feed_mixto(buffer, registros)
+        del buffer[:pos]
+        if len(buffer) > self.max_buffer:
+            del buffer[:]
+        return registros
+
+    def _feed_mixto(self, buffer, registros):
+        pos = 0
+        largo = len(buffer)
+        while pos < largo:
+            sync = buffer.find(SYNC, pos)
+            fin_texto = largo if sync < 0 else sync
+            fin = buffer.rfind(b"\n", pos, fin_texto)
+            if fin >= 0:
+                # La vista hace que '^' coincida en pos aunque venga de una trama
+                with memoryview(buffer) as vista:
+                    pares = _RE_MUESTRA.findall(vista[pos:fin])
+                registros.extend(Muestra(int(vel), int(rpm)) for vel, rpm in pares)
+                pos = fin + 1
+            if sync < 0:
+                break
+            # Texto sin fin de línea antes de una trama: línea cortada, se descarta
+            pos = sync
+            tipo, campos, tam = leer_trama(buffer, pos)
+            if tam == 0:
+                break  # Trama incompleta, esperar más bytes
+            if tam < 0:
+                # Falso SYNC o trama dañada: seguir buscando desde el byte siguiente
+                if tipo in _LARGOS:
+                    self.errores_crc += 1
+                pos += 1
+                continue
+            if tipo == TIPO_TELEMETRIA:
+                registros.append(Muestra(*campos))
+            elif tipo == TIPO_CONFIRMACION:
+                registros.append(Confirmacion(campos[0]))
+            self.binario = True
+            pos += tam
+        return pos
+
+    def reset(self):
+        del self._buffer[:]
+
+class CommandEncoder:
+    """
+    Codifica los comandos de un byte (b'a', b'r', b'1'...) para el enlace.
+    Mientras el Arduino hable texto se envían tal cual; cuando responde en
+    binario cada comando viaja en una trama con número de secuencia y el
+    Arduino lo confirma, lo que permite contar comandos perdidos.
+    """
+    def __init__(self):
+        self.binario = False
+        self.seq = 0
+        self._ultimo_texto = None
+        self.ultimo_confirmado = None
+        self.perdidos = 0
+
+    def codificar(self, comandos):
+        if not self.binario:
+            return comandos
+        tramas = bytearray()
+        for comando in comandos:
+            self.seq = (self.seq + 1) & 0xFF
+            tramas += empaquetar(TIPO_COMANDO, self.seq, bytes((comando,)))
+        return bytes(tramas)
+
+    def codificar_analogico(self, comando):
+        """
+        En binario, una trama de 6 bytes con acelerador y dirección. En texto
+        se traduce a los comandos de un byte ('a'/'r'/'p', 'i'/'d') y solo se
+        envía cuando esa traducción cambia.
+        """
+        if self.binario:
+            self.seq = (self.seq + 1) & 0xFF
+            return empaquetar(TIPO_ANALOGICO, self.seq, comando.acelerador, comando.direccion)
+        if comando.acelerador > UMBRAL_TEXTO:
+            texto = b"a"
+        elif comando.acelerador < -UMBRAL_TEXTO:
+            texto = b"r"
+        else:
+            texto = b"p"
+        if comando.direccion > UMBRAL_TEXTO:
+            texto += b"d"
+        elif comando.direccion < -UMBRAL_TEXTO:
+            texto += b"i"
+        if texto == self._ultimo_texto:
+            return b""
+        self._ultimo_texto = texto
+        return texto
+
+    def codificar_lote(self, pendientes):
+        """
+        Codifica lo que juntó la cola de envío: bytes de comandos y
+        ComandoAnalogico. De los analógicos solo vale el último del lote.
+        """
+        comandos = []
+        analogico = None
+        for p in pendientes:
+            if p.__class__ is ComandoAnalogico:
+                analogico = p
+            else:
+                comandos.append(p)
+        data = self.codificar(b"".join(comandos))
+        if analogico is not None:
+            data += self.codificar_analogico(analogico)
+        return data
+
+    def confirmar(self, seq):
+        """Registra una confirmación; devuelve cuántos comandos se saltaron."""
+        saltados = 0
+        if self.ultimo_confirmado is not None:
+            saltados = (seq - self.ultimo_confirmado - 1) & 0xFF
+            # Un salto "hacia atrás" es una confirmación repetida, no una pérdida
+            if saltados > 128:
+                return 0
+        self.ultimo_confirmado = seq
+        self.perdidos += saltados
+        return saltados
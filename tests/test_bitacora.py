@@ -0,0 +1,64 @@
+import json
+import time
+
+from bitacora import INFO, BinarySink, EventLog, leer_binario
+
+class SinkLento:
+    """Destino que tarda en escribir, como un disco o una consola saturados."""
+    def __init__(self, demora=0.3, nivel=INFO):
+        self.demora = demora
+        self.nivel = nivel
+        self.eventos = []
+        self.cerrado = False
+
+    def escribir(self, lote):
+        time.sleep(self.demora)
+        self.eventos += [registro[2] for registro in lote]
+
+    def close(self):
+        self.cerrado = True
+
+def test_configurar_no_espera_al_escritor(tmp_path):
+    lento = SinkLento()
+    log = EventLog([lento], intervalo=0.01)
+    try:
+        log.info("antes")
+        time.sleep(0.05)  # El escritor ya está dentro del sink lento
+        log.info("pendiente")
+        ruta = tmp_path / "eventos.jsonl"
+        inicio = time.perf_counter()
+        log.configurar({"event_log_console": False, "event_log_format": "jsonl",
+                        "event_log_file": str(ruta)})
+        assert time.perf_counter() - inicio < 0.05
+        log.info("despues", valor=1)
+        assert log.flush(2.0)
+        # Lo registrado antes del cambio fue a los destinos anteriores, que se cerraron
+        assert lento.eventos == ["antes", "pendiente"]
+        assert lento.cerrado
+        lineas = [json.loads(linea) for linea in ruta.read_text().splitlines()]
+        assert [(l["evento"], l.get("valor")) for l in lineas] == [("despues", 1)]
+    finally:
+        log.close()
+
+def test_flush_sin_escritor_no_espera():
+    log = EventLog([])
+    assert log.flush(0.0)
+
+def test_flush_respeta_el_timeout():
+    log = EventLog([SinkLento(demora=0.5)], intervalo=0.01)
+    try:
+        log.info("lento")
+        inicio = time.perf_counter()
+        assert not log.flush(0.05)
+        assert time.perf_counter() - inicio < 0.3
+    finally:
+        log.close()
+
+def test_binario_ida_y_vuelta(tmp_path):
+    ruta = tmp_path / "eventos.carevt"
+    log = EventLog([BinarySink(str(ruta))])
+    log.info("cambio_velocidad", "Cambio de velocidad: {marcha}", marcha="3")
+    log.error("error_serial", mensaje="sin datos")
+    log.close()
+    eventos = [(nombre, campos) for _, _, nombre, campos in leer_binario(str(ruta))]
+    assert eventos == [("cambio_velocidad", {"marcha": "3"}), ("error_serial", {"mensaje": "sin datos"})]
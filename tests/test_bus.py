@@ -0,0 +1,188 @@
+import os
+import select
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+shared_memory = pytest.importorskip("multiprocessing.shared_memory")
+
+from bus import (OFFSET_ANILLO, OFFSET_ESCRITOR, RECORD, BusOcupado, TelemetryBus,
+                 TelemetryBusReader, _PID, _SEQ, ruta_timbre, ruta_token)
+
+@pytest.fixture
+def nombre():
+    return f"test_bus_{uuid.uuid4().hex[:12]}"
+
+@pytest.fixture
+def bus(nombre):
+    bus = TelemetryBus(nombre, capacidad=8)
+    yield bus
+    if bus.buf is not None:
+        bus.close()
+
+def publicar(bus, desde, hasta):
+    for i in range(desde, hasta):
+        bus.publish(i, 10 * i, "3", t_ns=i)
+
+def vels(muestras):
+    return [vel for _, vel, _, _ in muestras]
+
+def pid_muerto():
+    proceso = subprocess.Popen([sys.executable, "-c", "pass"])
+    proceso.wait()
+    return proceso.pid
+
+def test_ida_y_vuelta(bus, nombre):
+    with TelemetryBusReader(nombre) as reader:
+        bus.publish(120, 2100, "3", t_ns=42)
+        bus.publish(-40000, 70000, "R", t_ns=43)  # Se limitan al formato
+        assert reader.leer() == [(42, 120, 2100, "3"), (43, -32768, 65535, "R")]
+        assert reader.leer() == []
+        assert reader.ultima() == (43, -32768, 65535, "R")
+
+def test_cada_lector_tiene_su_cursor(bus, nombre):
+    publicar(bus, 0, 3)
+    with TelemetryBusReader(nombre) as nuevo, TelemetryBusReader(nombre, desde_inicio=True) as viejo:
+        publicar(bus, 3, 5)
+        assert vels(nuevo.leer()) == [3, 4]
+        assert vels(viejo.leer(maximo=2)) == [0, 1]
+        assert vels(viejo.leer()) == [2, 3, 4]
+
+def test_lector_atrasado_cuenta_perdidas(bus, nombre):
+    with TelemetryBusReader(nombre) as reader:
+        publicar(bus, 0, 20)
+        # Solo sobrevive la última vuelta del anillo de 8
+        assert vels(reader.leer()) == list(range(12, 20))
+        assert reader.perdidas == 12
+        publicar(bus, 20, 22)
+        assert vels(reader.leer()) == [20, 21]
+        assert reader.perdidas == 12
+
+def test_registro_a_medio_escribir_se_reintenta(bus, nombre):
+    with TelemetryBusReader(nombre) as reader:
+        publicar(bus, 0, 3)
+        # El escritor quedó entre el seq impar y el par en la ranura 1
+        offset = OFFSET_ANILLO + RECORD.size
+        completo = _SEQ.unpack_from(bus.buf, offset)[0]
+        _SEQ.pack_into(bus.buf, offset, completo - 1)
+        assert vels(reader.leer()) == [0]
+        assert reader.perdidas == 0
+        _SEQ.pack_into(bus.buf, offset, completo)
+        assert vels(reader.leer()) == [1, 2]
+
+def test_registro_pisado_durante_la_lectura_se_salta(bus, nombre):
+    with TelemetryBusReader(nombre, desde_inicio=True) as reader:
+        publicar(bus, 0, 5)
+        # El lector leyó la cabeza (5) justo antes de que el escritor diera la vuelta
+        reader.cabeza = lambda: 5
+        publicar(bus, 5, 13)
+        assert reader.leer() == []
+        assert reader.perdidas == 5
+        del reader.cabeza
+        assert vels(reader.leer()) == list(range(5, 13))
+
+def test_comandos_con_token_y_timbre(bus, nombre):
+    with TelemetryBusReader(nombre) as reader:
+        reader.enviar_comando(b"a")
+        if bus.timbre is not None:
+            assert select.select([bus.timbre], [], [], 1.0)[0]
+        assert bus.comando_pendiente() == b"a"
+        assert bus.comando_pendiente() is None
+        if bus.timbre is not None:
+            assert not bus.atender_timbre()  # comando_pendiente() ya lo vació
+        reader.enviar_comando(b"p", token=b"x" * 16)
+        assert bus.comando_pendiente() is None
+        assert bus.rechazados == 1
+        with pytest.raises(ValueError):
+            reader.enviar_comando(b"a" * 16)
+
+def test_segundo_escritor_no_rompe_el_bus_vivo(bus, nombre):
+    with TelemetryBusReader(nombre) as reader:
+        with pytest.raises(BusOcupado):
+            TelemetryBus(nombre, capacidad=8)
+        # El primero sigue publicando en el mismo segmento
+        publicar(bus, 0, 2)
+        assert vels(reader.leer()) == [0, 1]
+        assert reader.activo()
+        assert os.path.exists(bus.token_path)
+
+def remove_denegado(monkeypatch, ruta):
+    """Simula un archivo de otro usuario en el tempdir: no se puede borrar."""
+    remove = os.remove
+
+    def falso(camino):
+        if camino == ruta:
+            raise PermissionError(13, "Permission denied", camino)
+        remove(camino)
+    monkeypatch.setattr(os, "remove", falso)
+
+def test_timbre_ajeno_deja_al_bus_sin_timbre(nombre, monkeypatch):
+    remove_denegado(monkeypatch, ruta_timbre(nombre))
+    bus = TelemetryBus(nombre, capacidad=8)
+    try:
+        assert bus.timbre is None
+        # Sin timbre los comandos se toman sondeando el buzón
+        with TelemetryBusReader(nombre) as reader:
+            reader.enviar_comando(b"a")
+            assert bus.comando_pendiente() == b"a"
+    finally:
+        bus.close()
+
+def test_token_no_sigue_un_enlace_plantado(nombre, tmp_path):
+    victima = tmp_path / "victima"
+    victima.write_bytes(b"intacto")
+    os.symlink(victima, ruta_token(nombre))
+    bus = TelemetryBus(nombre, capacidad=8)
+    try:
+        assert victima.read_bytes() == b"intacto"
+        assert not os.path.islink(bus.token_path)
+        assert os.stat(bus.token_path).st_mode & 0o777 == 0o600
+        with open(bus.token_path, "rb") as f:
+            assert f.read() == bus.token
+    finally:
+        bus.close()
+
+def test_token_ajeno_suelta_el_segmento(nombre, monkeypatch):
+    with open(ruta_token(nombre), "wb") as f:
+        f.write(b"de otro usuario")
+    try:
+        remove_denegado(monkeypatch, ruta_token(nombre))
+        with pytest.raises(BusOcupado):
+            TelemetryBus(nombre, capacidad=8)
+        monkeypatch.undo()
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(nombre)
+    finally:
+        os.remove(ruta_token(nombre))
+
+def test_segmento_abandonado_se_reutiliza(nombre):
+    viejo = TelemetryBus(nombre, capacidad=8)
+    reader = TelemetryBusReader(nombre)
+    publicar(viejo, 0, 3)
+    # Simula un tablero que murió sin cerrar el bus
+    _PID.pack_into(viejo.buf, OFFSET_ESCRITOR, pid_muerto())
+    assert not reader.activo()
+    viejo.buf = None
+    viejo.shm.close()
+    with pytest.raises(ValueError):
+        TelemetryBus(nombre, capacidad=16)
+    nuevo = TelemetryBus(nombre, capacidad=8)
+    try:
+        assert nuevo.cabeza == 3
+        assert reader.activo()
+        publicar(nuevo, 3, 5)
+        assert vels(reader.leer()) == [0, 1, 2, 3, 4]
+    finally:
+        reader.close()
+        nuevo.close()
+
+def test_cerrar_avisa_a_los_lectores(nombre):
+    bus = TelemetryBus(nombre, capacidad=8)
+    with TelemetryBusReader(nombre) as reader:
+        assert reader.activo()
+        bus.close()
+        assert not reader.activo()
+        # El nombre quedó libre para un tablero nuevo
+        TelemetryBus(nombre, capacidad=8).close()
@@ -0,0 +1,32 @@
+import threading
+import time
+
+from enlace_serial import SerialWorker
+
+class PuertoFalso:
+    """Puerto serial mínimo: read() sin datos y write() lento que guarda lo escrito."""
+    def __init__(self, demora=0.05):
+        self.timeout = None
+        self.in_waiting = 0
+        self.escrito = bytearray()
+        self.demora = demora
+        self._lock = threading.Lock()
+
+    def read(self, n):
+        time.sleep(self.timeout or 0)
+        return b""
+
+    def write(self, data):
+        time.sleep(self.demora)
+        with self._lock:
+            self.escrito += data
+
+def test_stop_escribe_lo_encolado():
+    puerto = PuertoFalso()
+    worker = SerialWorker(puerto, on_muestra=lambda vel, rpm: None)
+    worker.start()
+    worker.enviar(b"a")
+    time.sleep(0.01)  # La 'a' se está escribiendo
+    worker.enviar(b"p")
+    worker.stop()
+    assert bytes(puerto.escrito) == b"ap"
@@ -0,0 +1,60 @@
+import pytest
+
+from entrada import BACKENDS, InputBackend, InputSampler, KeyboardBackend, ScriptedBackend, acondicionar
+from telemetria import ESCALA_ANALOGICA, ComandoAnalogico
+
+class Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+def test_backend_sin_poll_no_se_puede_instanciar():
+    class Incompleto(InputBackend):
+        nombre = "incompleto"
+
+    with pytest.raises(TypeError):
+        Incompleto()
+    assert all(issubclass(clase, InputBackend) for clase in BACKENDS.values())
+    assert ScriptedBackend.nombre not in BACKENDS
+
+def test_acondicionar_zona_muerta_y_extremos():
+    assert acondicionar(0.05) == 0.0
+    assert acondicionar(-0.08) == 0.0
+    assert acondicionar(1.0) == 1.0
+    assert acondicionar(-3.0) == -1.0
+    assert 0 < acondicionar(0.5) < 0.5
+
+def test_script_interpola_entre_pasos():
+    reloj = Reloj()
+    backend = ScriptedBackend([(1.0, 1.0, -1.0), (0.0, 0.0, 0.0)], reloj=reloj)
+    backend.open()
+    assert backend.poll() == (0.0, 0.0)
+    reloj.t = 0.5
+    assert backend.poll() == (0.5, -0.5)
+    assert not backend.terminado
+    reloj.t = 2.0
+    assert backend.poll() == (1.0, -1.0)
+    assert backend.terminado
+
+def test_sampler_envia_solo_cambios_y_keepalive():
+    reloj = Reloj()
+    enviados = []
+    backend = ScriptedBackend([(0.0, 1.0, 0.0), (10.0, 1.0, 0.0)], reloj=reloj)
+    sampler = InputSampler(backend, enviados.append, keepalive=0.5)
+    backend.open()
+    for ahora in (0.1, 0.2, 0.3, 0.7):
+        reloj.t = ahora
+        sampler.muestrear(ahora)
+    assert enviados == [ComandoAnalogico(ESCALA_ANALOGICA, 0)] * 2
+    assert sampler.muestras == 4 and sampler.enviados == 2
+
+def test_teclado_rampa_hacia_el_objetivo():
+    teclado = KeyboardBackend(rampa=0)
+    teclado.press(b"a")
+    teclado.press(b"d")
+    assert teclado.poll() == (1, 1)
+    teclado.press(b"p")
+    teclado.release(b"d")
+    assert teclado.poll() == (0.0, 0)
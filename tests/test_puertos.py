@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+pytest.importorskip("serial")
+
+import puertos
+from puertos import PortDiscovery
+
+def test_candidatos_se_publican_antes_de_sondear(monkeypatch):
+    # Un sondeo que no termina hasta que el test lo suelte
+    soltar = threading.Event()
+    def sondear(puerto, baudrate, timeout, opener):
+        soltar.wait(5)
+        return True
+    monkeypatch.setattr(puertos, "encontrar_puertos_bluetooth", lambda: ["/dev/rfcomm0"])
+    monkeypatch.setattr(puertos, "sondear", sondear)
+    discovery = PortDiscovery(intervalo=60)
+    discovery.start()
+    try:
+        assert discovery.esperar(2.0, sondeos=False)
+        assert discovery.mejor_puerto() == "/dev/rfcomm0"
+        assert discovery.confirmados == ()
+        assert not discovery.esperar(0.05)
+        soltar.set()
+        assert discovery.esperar(2.0)
+        assert discovery.confirmados == ("/dev/rfcomm0",)
+    finally:
+        soltar.set()
+        discovery.stop()
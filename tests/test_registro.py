@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from registro import HEADER, MAGIC, RECORD, ReplaySerial, TelemetryRecorder, TelemetryReplay
+
+def escribir_registro(ruta, tiempos, extra=b""):
+    """Un .carlog con una muestra por tiempo (ns): vel = i, rpm = 10 * i."""
+    with open(ruta, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 1000.0))
+        for i, t_ns in enumerate(tiempos):
+            f.write(RECORD.pack(t_ns, i, 10 * i, b"3", b"\0"))
+        f.write(extra)
+
+def test_grabar_y_leer(tmp_path):
+    ruta = tmp_path / "sesion.carlog"
+    recorder = TelemetryRecorder(str(ruta), flush_interval=60)
+    recorder.recordSample(120, 2100, "3")
+    recorder.recordCommand(b"ap", 120, 2100, "3")
+    recorder.recordSample(-5, 99999, "R")  # Fuera de rango: se limita
+    recorder.close()
+    with TelemetryReplay(str(ruta)) as replay:
+        assert len(replay) == 4
+        registros = [replay.record(i) for i in range(4)]
+    assert [r[1:] for r in registros] == [(120, 2100, "3", None), (120, 2100, "3", b"a"),
+                                          (120, 2100, "3", b"p"), (-5, 65535, "R", None)]
+    tiempos = [r[0] for r in registros]
+    assert tiempos == sorted(tiempos)
+
+def test_cola_truncada_se_ignora(tmp_path):
+    ruta = tmp_path / "cortado.carlog"
+    escribir_registro(ruta, [0, 10, 20], extra=RECORD.pack(30, 3, 30, b"3", b"\0")[:5])
+    with TelemetryReplay(str(ruta)) as replay:
+        assert len(replay) == 3
+        assert replay.record(2) == (20, 2, 20, "3", None)
+
+def test_continuar_registro_con_cola_truncada(tmp_path):
+    ruta = tmp_path / "cortado.carlog"
+    escribir_registro(ruta, [0, 10, 20], extra=b"\x01\x02\x03")
+    recorder = TelemetryRecorder(str(ruta))
+    recorder.recordSample(77, 770, "4")
+    recorder.close()
+    with TelemetryReplay(str(ruta)) as replay:
+        assert len(replay) == 4
+        t_ns, vel, rpm, gear, comando = replay.record(3)
+    assert (vel, rpm, gear, comando) == (77, 770, "4", None)
+    assert t_ns >= 20
+
+def test_cabecera_invalida(tmp_path):
+    ruta = tmp_path / "otro.carlog"
+    ruta.write_bytes(b"NOESUNLOG" + bytes(20))
+    with pytest.raises(ValueError):
+        TelemetryReplay(str(ruta))
+    ruta.write_bytes(b"CAR")
+    with pytest.raises(ValueError):
+        TelemetryReplay(str(ruta))
+
+def test_seek_por_biseccion(tmp_path):
+    ruta = tmp_path / "largo.carlog"
+    tiempos = [0, 5, 5, 5, 9, 100, 101, 5000]
+    escribir_registro(ruta, tiempos)
+    with TelemetryReplay(str(ruta)) as replay:
+        for t_ns in range(-1, 5002):
+            esperado = next((i for i, t in enumerate(tiempos) if t >= t_ns), len(tiempos))
+            assert replay.seek(t_ns) == esperado
+
+def test_seek_registro_vacio(tmp_path):
+    ruta = tmp_path / "vacio.carlog"
+    escribir_registro(ruta, [])
+    with TelemetryReplay(str(ruta)) as replay:
+        assert len(replay) == 0
+        assert replay.seek(123) == 0
+
+def test_replay_serial_entrega_muestras_como_texto(tmp_path):
+    ruta = tmp_path / "rapido.carlog"
+    escribir_registro(ruta, [0, 1000, 2000])
+    replay = ReplaySerial(str(ruta), speed=1000.0, start_ns=1000)
+    replay.timeout = 0.01
+    data = b""
+    while data.count(b"\n") < 2:
+        data += replay.read(64)
+    replay.close()
+    assert data == b"VEL=1 RPM=10\nVEL=2 RPM=20\n"
+
+def test_reproduccion_en_el_tablero_conserva_marcha_y_valores(tmp_path, monkeypatch):
+    QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    monkeypatch.chdir(tmp_path)
+    from tablero import TestWindow
+
+    ruta = tmp_path / "marcha3.carlog"
+    recorder = TelemetryRecorder(str(ruta))
+    for _ in range(20):
+        recorder.recordSample(150, 3000, "3")
+    recorder.recordCommand(b"a", 150, 3000, "3")
+    recorder.close()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    window = TestWindow({"trip_export": False}, serialConnection=ReplaySerial(str(ruta), speed=100))
+    try:
+        limite = time.monotonic() + 5.0
+        while window.trip.muestras < 20 and time.monotonic() < limite:
+            app.processEvents()
+            time.sleep(0.01)
+        assert window.trip.muestras == 20
+        # Sin inercia entre muestras: el tablero queda en lo grabado
+        fin = time.monotonic() + 0.3
+        while time.monotonic() < fin:
+            app.processEvents()
+            time.sleep(0.01)
+        assert (window.currentGear, window.odometer, window.rpm) == ("3", 150, 3000)
+        assert window.speedGauge.limit_value == 200
+        assert window.trip.vel_max == 150 and window.trip.rpm_max == 3000
+        assert window.trip.recortes == 0
+    finally:
+        window.close()
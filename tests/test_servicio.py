@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bloquea los paquetes pesados antes de importar, como en una Raspberry Pi
+# que solo tiene la biblioteca estándar (y pyserial, que se carga perezoso)
+_SIN_DEPENDENCIAS = """
+import sys
+
+class _Bloqueo:
+    def find_spec(self, nombre, path=None, target=None):
+        if nombre.split(".")[0] in ("numpy", "PySide6", "serial"):
+            raise ModuleNotFoundError(f"No module named {nombre!r}", name=nombre)
+        return None
+
+sys.meta_path.insert(0, _Bloqueo())
+import servicio
+import vehiculo
+print(vehiculo.rpm_para(50, "1"), vehiculo.VehicleSim().rpm)
+"""
+
+def test_servicio_importa_sin_numpy():
+    resultado = subprocess.run([sys.executable, "-c", _SIN_DEPENDENCIAS], cwd=RAIZ,
+                               capture_output=True, text=True, timeout=30)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.split() == ["1250", "0"]
@@ -0,0 +1,158 @@
+import base64
+import itertools
+import os
+import socket
+import struct
+import threading
+import time
+
+import servidor_web
+from servidor_web import (CAMPO_LUCES, CAMPO_RPM, CAMPO_VEL, OP_BINARIO, TODOS, TelemetryServer,
+                          codificar_delta, decodificar_delta, estado)
+
+def test_primera_trama_lleva_todos_los_campos():
+    actual = estado(-155, 1200, "D", luz_izq=True)
+    trama = codificar_delta(None, actual)
+    assert trama[0] == TODOS
+    assert decodificar_delta(None, trama) == actual
+
+def test_delta_lleva_solo_lo_que_cambio():
+    anterior = estado(10, 800, "N")
+    actual = estado(12, 800, "N", luz_der=True)
+    trama = codificar_delta(anterior, actual)
+    assert trama[0] == CAMPO_VEL | CAMPO_LUCES
+    assert len(trama) == 1 + 2 + 1
+    assert decodificar_delta(anterior, trama) == actual
+    siguiente = estado(12, 2500, "N", luz_der=True)
+    trama = codificar_delta(actual, siguiente)
+    assert trama[0] == CAMPO_RPM
+    assert len(trama) == 1 + 2
+    assert decodificar_delta(actual, trama) == siguiente
+    assert codificar_delta(actual, actual) == b"\x00"
+    assert decodificar_delta(actual, b"\x00") == actual
+
+def test_delta_ida_y_vuelta_en_secuencia():
+    estados = [estado(v, r, g, i, d) for v, r, g, i, d in
+               itertools.product((-32768, 0, 40000), (0, 65535), ("N", "R"), (False, True), (False, True))]
+    visto = None
+    previo = None
+    for actual in estados:
+        trama = codificar_delta(previo, actual)
+        assert trama[0] & ~TODOS == 0
+        visto = decodificar_delta(visto, trama)
+        assert visto == actual
+        previo = actual
+    assert estado(40000, -5, "")[:3] == (32767, 0, b"?")
+
+class ClienteWS:
+    """Cliente WebSocket mínimo y bloqueante, solo para leer tramas del servidor."""
+    def __init__(self, port, rcvbuf=None):
+        self.sock = socket.socket()
+        if rcvbuf:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.sock.settimeout(5.0)
+        self.sock.connect(("127.0.0.1", port))
+        clave = base64.b64encode(os.urandom(16))
+        self.sock.sendall(b"GET /ws HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          b"Sec-WebSocket-Key: " + clave + b"\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        self.datos = b""
+        while b"\r\n\r\n" not in self.datos:
+            self.datos += self.sock.recv(4096)
+        respuesta, self.datos = self.datos.split(b"\r\n\r\n", 1)
+        assert respuesta.startswith(b"HTTP/1.1 101")
+
+    def trama(self):
+        while True:
+            if len(self.datos) >= 2:
+                largo = self.datos[1] & 0x7F
+                inicio = 2
+                if largo == 126:
+                    largo = struct.unpack("!H", self.datos[2:4])[0] if len(self.datos) >= 4 else None
+                    inicio = 4
+                if largo is not None and len(self.datos) >= inicio + largo:
+                    opcode = self.datos[0] & 0x0F
+                    datos = self.datos[inicio:inicio + largo]
+                    self.datos = self.datos[inicio + largo:]
+                    return opcode, datos
+            recibido = self.sock.recv(65536)
+            if not recibido:
+                raise ConnectionError("servidor cerró la conexión")
+            self.datos += recibido
+
+    def close(self):
+        self.sock.close()
+
+def test_cliente_lento_se_saltea_y_resincroniza_con_trama_completa(monkeypatch):
+    monkeypatch.setattr(servidor_web, "LIMITE_PENDIENTE", 256)
+    contador = itertools.count()
+    # Solo cambia la velocidad: los deltas llevan CAMPO_VEL y una trama completa se distingue
+    server = TelemetryServer(lambda: estado(next(contador) % 30000, 1000, "N"),
+                             host="127.0.0.1", port=0, max_rate=1000)
+    server.start()
+    rapido = lento = None
+    try:
+        lento = ClienteWS(server.port, rcvbuf=1024)
+        rapido = ClienteWS(server.port)
+        limite = time.monotonic() + 5.0
+        while len(server.clientes) < 2 and time.monotonic() < limite:
+            time.sleep(0.01)
+        # Achicar también el buffer de envío del lado del servidor para el cliente lento
+        local = lento.sock.getsockname()
+        for cliente in list(server.clientes):
+            if cliente.writer.get_extra_info("peername") == local:
+                cliente.writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024)
+                del_lento = cliente
+            else:
+                del_rapido = cliente
+
+        recibidas = []
+        corriendo = threading.Event()
+        corriendo.set()
+
+        def leer_rapido():
+            while corriendo.is_set():
+                try:
+                    opcode, datos = rapido.trama()
+                except OSError:
+                    return
+                if opcode == OP_BINARIO:
+                    recibidas.append(datos)
+
+        hilo = threading.Thread(target=leer_rapido, daemon=True)
+        hilo.start()
+
+        limite = time.monotonic() + 10.0
+        while del_lento.saltados == 0 and time.monotonic() < limite:
+            time.sleep(0.02)
+        assert del_lento.saltados > 0
+        # Mientras el lento no lee, el rápido sigue recibiendo y nunca se saltea
+        antes = len(recibidas)
+        time.sleep(0.3)
+        assert len(recibidas) > antes
+        assert del_rapido.saltados == 0
+
+        # El lento se pone al día: tras lo salteado llega otra trama completa, no un delta
+        completas = 0
+        visto = None
+        limite = time.monotonic() + 10.0
+        while completas < 2 and time.monotonic() < limite:
+            opcode, datos = lento.trama()
+            if opcode != OP_BINARIO:
+                continue
+            visto = decodificar_delta(visto, datos)
+            if datos[0] == TODOS:
+                completas += 1
+            else:
+                assert datos[0] == CAMPO_VEL
+        assert completas == 2
+        assert visto[1:] == (1000, b"N", 0)
+
+        corriendo.clear()
+        assert recibidas[0][0] == TODOS
+        assert all(datos[0] == CAMPO_VEL for datos in recibidas[1:])
+        assert server.saltados == del_lento.saltados
+    finally:
+        for cliente in (rapido, lento):
+            if cliente:
+                cliente.close()
+        server.stop()
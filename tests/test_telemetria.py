@@ -0,0 +1,108 @@
+import pytest
+
+from telemetria import (SYNC, TIPO_ANALOGICO, TIPO_COMANDO, TIPO_TELEMETRIA, CommandEncoder,
+                        ComandoAnalogico, Muestra, TelemetryParser, crc8,
+                        empaquetar_confirmacion, empaquetar_telemetria, leer_trama)
+
+def valores(registros):
+    return [(r.vel, r.rpm) if r.__class__ is Muestra else ("ack", r.seq) for r in registros]
+
+def test_crc8_valor_conocido():
+    # CRC-8/SMBUS (polinomio 0x07, inicial 0) de "123456789"
+    assert crc8(b"123456789") == 0xF4
+    assert crc8(b"xx123456789xx", 2, 11) == 0xF4
+
+def test_trama_ida_y_vuelta():
+    trama = empaquetar_telemetria(155, 1200)
+    assert len(trama) == 7 and trama[0] == SYNC
+    assert leer_trama(trama) == (TIPO_TELEMETRIA, (155, 1200), 7)
+    assert leer_trama(b"\x00" + trama, 1) == (TIPO_TELEMETRIA, (155, 1200), 7)
+
+def test_trama_incompleta_pide_mas_bytes():
+    trama = empaquetar_telemetria(10, 20)
+    for corte in range(len(trama)):
+        assert leer_trama(trama[:corte])[2] == 0
+
+def test_trama_con_crc_incorrecto_se_rechaza():
+    trama = bytearray(empaquetar_telemetria(155, 1200))
+    trama[3] ^= 0x01
+    assert leer_trama(trama) == (TIPO_TELEMETRIA, None, -1)
+    assert leer_trama(bytes((SYNC, 0x7F, 0, 0))) == (0x7F, None, -1)
+
+def test_parser_texto_y_binario_mezclados():
+    parser = TelemetryParser()
+    data = (b"VEL=10 RPM=250\n" + empaquetar_telemetria(20, 500) + b"VEL=30 RPM=750\n"
+            + empaquetar_confirmacion(7))
+    assert valores(parser.feed(data)) == [(10, 250), (20, 500), (30, 750), ("ack", 7)]
+    assert parser.binario
+
+@pytest.mark.parametrize("paso", [1, 2, 3, 5, 7])
+def test_parser_lecturas_partidas(paso):
+    data = (empaquetar_telemetria(1, 2) + b"VEL=3 RPM=4\n" + empaquetar_telemetria(5, 6)) * 3
+    parser = TelemetryParser()
+    registros = []
+    for i in range(0, len(data), paso):
+        registros += parser.feed(data[i:i + paso])
+    assert valores(registros) == [(1, 2), (3, 4), (5, 6)] * 3
+
+def test_parser_descarta_crc_malo_y_cuenta_el_error():
+    mala = bytearray(empaquetar_telemetria(99, 99))
+    mala[-1] ^= 0xFF
+    parser = TelemetryParser()
+    registros = parser.feed(bytes(mala) + empaquetar_telemetria(1, 2))
+    assert valores(registros) == [(1, 2)]
+    assert parser.errores_crc == 1
+
+def test_parser_se_resincroniza_tras_basura():
+    # Basura con SYNC sueltos y una línea cortada antes de tramas válidas
+    basura = bytes((SYNC, 0x33, SYNC)) + b"VEL=1 RP" + bytes((0xFF, SYNC, TIPO_TELEMETRIA))
+    parser = TelemetryParser()
+    registros = parser.feed(basura + empaquetar_telemetria(40, 800))
+    registros += parser.feed(b"VEL=50 RPM=900\n")
+    assert valores(registros) == [(40, 800), (50, 900)]
+
+def test_parser_no_acumula_basura_sin_fin():
+    parser = TelemetryParser(max_buffer=64)
+    assert parser.feed(b"x" * 100) == []
+    assert valores(parser.feed(b"\nVEL=1 RPM=2\n")) == [(1, 2)]
+
+def test_encoder_texto_pasa_tal_cual():
+    encoder = CommandEncoder()
+    assert encoder.codificar_lote([b"3", b"a"]) == b"3a"
+
+def test_encoder_binario_numera_y_se_decodifica():
+    encoder = CommandEncoder()
+    encoder.binario = True
+    data = encoder.codificar_lote([b"a", b"p", ComandoAnalogico(-127, 64)])
+    tramas = []
+    pos = 0
+    while pos < len(data):
+        tipo, campos, tam = leer_trama(data, pos)
+        assert tam > 0
+        tramas.append((tipo, campos))
+        pos += tam
+    assert tramas == [(TIPO_COMANDO, (1, b"a")), (TIPO_COMANDO, (2, b"p")),
+                      (TIPO_ANALOGICO, (3, -127, 64))]
+
+def test_encoder_secuencia_da_la_vuelta():
+    encoder = CommandEncoder()
+    encoder.binario = True
+    encoder.seq = 255
+    assert leer_trama(encoder.codificar(b"a"))[1] == (0, b"a")
+
+def test_encoder_cuenta_confirmaciones_perdidas():
+    encoder = CommandEncoder()
+    assert encoder.confirmar(1) == 0
+    assert encoder.confirmar(4) == 2
+    assert encoder.confirmar(3) == 0  # Repetida, no es pérdida
+    assert encoder.perdidos == 2
+
+    encoder = CommandEncoder()
+    encoder.confirmar(254)
+    assert encoder.confirmar(1) == 2  # 255 y 0, dando la vuelta
+
+def test_encoder_analogico_en_texto_solo_envia_cambios():
+    encoder = CommandEncoder()
+    assert encoder.codificar_analogico(ComandoAnalogico(100, 0)) == b"a"
+    assert encoder.codificar_analogico(ComandoAnalogico(90, 10)) == b""
+    assert encoder.codificar_analogico(ComandoAnalogico(0, -100)) == b"pi"
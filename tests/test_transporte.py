@@ -0,0 +1,137 @@
+import sys
+import threading
+import time
+
+import pytest
+
+serial = pytest.importorskip("serial")
+
+if sys.platform == "win32":
+    pytest.skip("el carrito virtual usa un pty", allow_module_level=True)
+
+from carro_virtual import VirtualCar, servir_pty
+from transporte import ESTADO_CONECTADO, AsyncSerialTransport
+
+def esperar_hasta(condicion, timeout=3.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.01)
+    return condicion()
+
+@pytest.fixture
+def carrito():
+    """Un VirtualCar sirviendo en un pty; devuelve (car, ruta)."""
+    car = VirtualCar(rate=100, baud=115200)
+    # Cada comando que llega al carrito, en orden
+    car.recibidos = []
+    aplicar = car._aplicar
+    def registrar(comando):
+        car.recibidos.append(bytes((comando,)))
+        aplicar(comando)
+    car._aplicar = registrar
+    detener = threading.Event()
+    abierto = threading.Event()
+    rutas = []
+    def al_abrir(ruta):
+        rutas.append(ruta)
+        abierto.set()
+    hilo = threading.Thread(target=servir_pty, args=(car, detener, al_abrir), daemon=True)
+    hilo.start()
+    assert abierto.wait(2.0)
+    yield car, rutas[0]
+    detener.set()
+    hilo.join(2.0)
+
+def test_conecta_y_recibe_telemetria(carrito):
+    car, ruta = carrito
+    muestras, estados = [], []
+    transporte = AsyncSerialTransport(ruta, on_muestra=lambda v, r: muestras.append((v, r)),
+                                      on_estado=estados.append)
+    transporte.start()
+    try:
+        assert esperar_hasta(lambda: len(muestras) >= 3)
+        assert transporte.estado == ESTADO_CONECTADO
+        assert estados[:2] == ["conectando", ESTADO_CONECTADO]
+        transporte.enviar(b"a")
+        assert esperar_hasta(lambda: car.recibidos == [b"a"])
+    finally:
+        transporte.stop()
+
+class PuertoLento:
+    """Envuelve un puerto de pyserial con un write() lento, como un HC-06 saturado."""
+    def __init__(self, ser, demora=0.1):
+        self._ser = ser
+        self._demora = demora
+
+    def write(self, data):
+        time.sleep(self._demora)
+        return self._ser.write(data)
+
+    def __getattr__(self, nombre):
+        return getattr(self._ser, nombre)
+
+    def __setattr__(self, nombre, valor):
+        if nombre.startswith("_"):
+            object.__setattr__(self, nombre, valor)
+        else:
+            setattr(self._ser, nombre, valor)
+
+def test_stop_entrega_el_ultimo_comando(carrito):
+    car, ruta = carrito
+    transporte = AsyncSerialTransport(
+        ruta, opener=lambda puerto, **kwargs: PuertoLento(serial.serial_for_url(puerto, **kwargs)))
+    transporte.start()
+    assert esperar_hasta(lambda: transporte.estado == ESTADO_CONECTADO)
+    transporte.enviar(b"a")
+    # Como al cerrar el tablero: el 'p' se encola mientras se escribe la 'a'
+    time.sleep(0.02)
+    transporte.enviar(b"p")
+    transporte.stop()
+    assert esperar_hasta(lambda: car.recibidos == [b"a", b"p"], 1.0)
+
+def test_reconecta_con_espera_exponencial(carrito):
+    car, ruta = carrito
+    intentos = []
+    def opener(puerto, **kwargs):
+        intentos.append(time.monotonic())
+        if len(intentos) <= 3:
+            raise serial.SerialException("puerto ocupado")
+        return serial.serial_for_url(puerto, **kwargs)
+    errores = []
+    transporte = AsyncSerialTransport(ruta, on_error=errores.append, opener=opener,
+                                      backoff_inicial=0.05, backoff_max=0.1)
+    transporte.start()
+    try:
+        assert esperar_hasta(lambda: transporte.estado == ESTADO_CONECTADO)
+        assert len(intentos) == 4 and len(errores) == 3
+        esperas = [b - a for a, b in zip(intentos, intentos[1:])]
+        # 0.05, 0.1 y luego el tope de 0.1
+        assert esperas[0] >= 0.05
+        assert esperas[1] >= 0.1
+        assert 0.1 <= esperas[2] < 0.19
+    finally:
+        transporte.stop()
+
+def test_silencio_reconecta_y_repite_engranaje_y_parada(carrito):
+    car, ruta = carrito
+    errores = []
+    transporte = AsyncSerialTransport(ruta, on_error=errores.append, heartbeat_timeout=0.3,
+                                      backoff_inicial=0.05)
+    transporte.start()
+    try:
+        assert esperar_hasta(lambda: transporte.estado == ESTADO_CONECTADO)
+        transporte.enviar(b"3a")
+        assert esperar_hasta(lambda: car.recibidos == [b"3", b"a"])
+
+        # El carrito sigue escuchando pero deja de transmitir por más que el heartbeat
+        car._proxima_muestra = time.monotonic() + 0.5
+        assert esperar_hasta(lambda: transporte.reconexiones == 1)
+        assert any("sin datos" in error for error in errores)
+        assert esperar_hasta(lambda: transporte.estado == ESTADO_CONECTADO)
+        # Tras reconectar se repite el engranaje y se para el carrito
+        assert esperar_hasta(lambda: car.recibidos == [b"3", b"a", b"3", b"p"])
+        assert car.sim.gear == "3" and car.acelerador == b"p"
+    finally:
+        transporte.stop()
@@ -0,0 +1,294 @@
+import asyncio
+import collections
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+
+from latencia import ETAPA_TECLA_SERIAL
+from telemetria import CommandEncoder, Muestra, TelemetryParser
+
+# --- Transporte serial asíncrono con reconexión automática ---
+
+ESTADO_CONECTANDO = "conectando"
+ESTADO_CONECTADO = "conectado"
+ESTADO_DESCONECTADO = "desconectado"
+
+# Comandos de engranaje que se reenvían tras reconectar
+COMANDOS_ENGRANAJE = frozenset(b"1234567")
+
+class LinkLost(Exception):
+    """El enlace dejó de responder (error de lectura/escritura o sin datos)."""
+
+def descriptor_lectura(ser):
+    """
+    Descriptor del puerto para esperar datos con el selector del event loop,
+    o None si no se puede (Windows, o URLs de pyserial sin descriptor como
+    loop://); en ese caso la lectura bloquea un hilo del executor.
+    """
+    if os.name != "posix":
+        return None
+    try:
+        return ser.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+class SerialLoop:
+    """
+    Un event loop de asyncio en su propio hilo más el executor para las
+    llamadas bloqueantes de pyserial (abrir, escribir y leer donde no hay
+    descriptor). Cada transporte suelto crea el suyo; una flota comparte uno
+    solo, así 16 carritos no necesitan 16 loops ni 32 hilos.
+    """
+    def __init__(self, max_workers=2):
+        self.loop = None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SerialIO")
+        self._listo = threading.Event()
+        self._hilo = threading.Thread(target=self._correr, name="SerialLoop", daemon=True)
+
+    def start(self):
+        if not self._hilo.is_alive():
+            self._hilo.start()
+            self._listo.wait()
+
+    def stop(self, timeout=2.0):
+        if self.loop and self._hilo.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._hilo.join(timeout)
+        self.executor.shutdown(wait=False)
+
+    def run(self, coro, timeout=None):
+        """Corre una corrutina en el loop desde otro hilo y espera su resultado."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def _correr(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._listo.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+class AsyncSerialTransport:
+    """
+    Conecta al puerto sin bloquear a quien lo crea: un event loop de asyncio
+    corre en su propio hilo (equivalente a integrarlo con qasync, sin la
+    dependencia) y las llamadas bloqueantes de pyserial van a un executor.
+    Con serial_loop varios transportes comparten el mismo SerialLoop; en
+    POSIX la lectura espera en el selector del loop, sin ocupar un hilo.
+    Se considera perdido el enlace ante un error de E/S o si pasan
+    heartbeat_timeout segundos sin recibir bytes (el Arduino transmite
+    telemetría continuamente); entonces se reconecta con espera exponencial.
+    Tras reconectar se reenvía el último engranaje y un 'p' para que el
+    carrito no siga con un movimiento viejo. stop() espera, con un plazo,
+    a que se escriba lo ya encolado, así el 'p' final llega al carrito.
+
+    Tiene la misma interfaz que SerialWorker: on_muestra, on_error, enviar(),
+    start(), stop(), latency y arribos, más on_estado(estado) para informar
+    la conexión.
+    Los callbacks se ejecutan en el hilo del transporte.
+    """
+    def __init__(self, port, baudrate=9600, on_muestra=None, on_error=None, on_estado=None,
+                 heartbeat_timeout=5.0, backoff_inicial=0.5, backoff_max=10.0,
+                 opener=serial.serial_for_url, serial_loop=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.on_muestra = on_muestra
+        self.on_error = on_error
+        self.on_estado = on_estado
+        self.heartbeat_timeout = heartbeat_timeout
+        self.backoff_inicial = backoff_inicial
+        self.backoff_max = backoff_max
+        self.opener = opener
+        self.estado = ESTADO_DESCONECTADO
+        self.reconexiones = 0
+        self._ultimo_engranaje = None
+        self.latency = None
+        self.arribos = collections.deque(maxlen=1024)
+        # Sin loop compartido: uno propio, con un hilo para read() y otro para abrir y escribir
+        self._propio = serial_loop is None
+        self.serial_loop = SerialLoop() if self._propio else serial_loop
+        self._executor = self.serial_loop.executor
+        self._loop = None
+        self._cola = None
+        self._tarea = None
+
+    def start(self):
+        self.serial_loop.start()
+        self._loop = self.serial_loop.loop
+        self.serial_loop.run(self._iniciar())
+
+    def stop(self, timeout=2.0):
+        if self._tarea:
+            try:
+                # La mitad del plazo para que salga lo encolado (el 'p' final)
+                self.serial_loop.run(self._detener(timeout / 2), timeout)
+            except (TimeoutError, RuntimeError):
+                pass
+        if self._propio:
+            self.serial_loop.stop(timeout)
+
+    def enviar(self, comando, t0=None):
+        """Encola bytes (o un ComandoAnalogico) desde cualquier hilo; nunca bloquea."""
+        if comando.__class__ is bytes:
+            for byte in comando:
+                if byte in COMANDOS_ENGRANAJE:
+                    self._ultimo_engranaje = bytes((byte,))
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._cola.put_nowait, comando if t0 is None else (comando, t0))
+
+    async def _iniciar(self):
+        self._cola = asyncio.Queue()
+        self._tarea = asyncio.ensure_future(self._supervisar())
+
+    async def _detener(self, espera):
+        # enviar() encola con call_soon_threadsafe, igual que esta corrutina:
+        # lo enviado antes de stop() ya está en la cola al llegar acá
+        if self.estado == ESTADO_CONECTADO:
+            try:
+                await asyncio.wait_for(self._cola.join(), espera)
+            except TimeoutError:
+                pass
+        self._tarea.cancel()
+        await asyncio.gather(self._tarea, return_exceptions=True)
+
+    def _cambiar_estado(self, estado):
+        self.estado = estado
+        if self.on_estado:
+            self.on_estado(estado)
+
+    def _reportar_error(self, contexto, e):
+        if self.on_error:
+            self.on_error(f"{contexto}: {e}")
+
+    async def _supervisar(self):
+        loop = asyncio.get_running_loop()
+        espera = self.backoff_inicial
+        while True:
+            self._cambiar_estado(ESTADO_CONECTANDO)
+            try:
+                ser = await loop.run_in_executor(
+                    self._executor, lambda: self.opener(self.port, baudrate=self.baudrate, timeout=0.1))
+            except (serial.SerialException, OSError, ValueError) as e:
+                self._reportar_error(f"No se pudo abrir {self.port}", e)
+                self._cambiar_estado(ESTADO_DESCONECTADO)
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, self.backoff_max)
+                continue
+
+            espera = self.backoff_inicial
+            self._cambiar_estado(ESTADO_CONECTADO)
+            try:
+                await self._sesion(ser)
+            except LinkLost as e:
+                self._reportar_error("Enlace perdido", e)
+                self.reconexiones += 1
+            finally:
+                await loop.run_in_executor(self._executor, ser.close)
+                self._cambiar_estado(ESTADO_DESCONECTADO)
+
+    async def _sesion(self, ser):
+        parser = TelemetryParser()
+        encoder = CommandEncoder()
+        # Descartar comandos viejos acumulados mientras no había enlace
+        while not self._cola.empty():
+            self._cola.get_nowait()
+            self._cola.task_done()
+        if self._ultimo_engranaje:
+            self._cola.put_nowait(self._ultimo_engranaje)
+            self._cola.put_nowait(b"p")
+
+        self._ultimo_dato = time.monotonic()
+        tareas = [
+            asyncio.ensure_future(self._leer(ser, parser, encoder)),
+            asyncio.ensure_future(self._escribir(ser, encoder)),
+        ]
+        if self.heartbeat_timeout:
+            tareas.append(asyncio.ensure_future(self._vigilar()))
+        try:
+            terminadas, _ = await asyncio.wait(tareas, return_when=asyncio.FIRST_EXCEPTION)
+            for tarea in terminadas:
+                tarea.result()  # Propaga LinkLost
+        finally:
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+
+    async def _leer(self, ser, parser, encoder):
+        loop = asyncio.get_running_loop()
+        fd = descriptor_lectura(ser)
+        if fd is not None:
+            # El selector avisa cuando hay datos y read() no espera nunca
+            hay_datos = asyncio.Event()
+            await loop.run_in_executor(self._executor, setattr, ser, "timeout", 0)
+            loop.add_reader(fd, hay_datos.set)
+        try:
+            while True:
+                try:
+                    if fd is None:
+                        data = await loop.run_in_executor(self._executor, lambda: ser.read(ser.in_waiting or 1))
+                    else:
+                        await hay_datos.wait()
+                        hay_datos.clear()
+                        data = ser.read(ser.in_waiting or 1)
+                except (serial.SerialException, OSError, TypeError) as e:
+                    # pyserial puede dar TypeError si el puerto se cierra a mitad de lectura
+                    raise LinkLost(f"error de lectura ({e})")
+                if data:
+                    self._procesar(data, parser, encoder)
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+
+    def _procesar(self, data, parser, encoder):
+        self._ultimo_dato = time.monotonic()
+        leido = time.monotonic_ns() if self.latency else 0
+        for registro in parser.feed(data):
+            if registro.__class__ is Muestra:
+                if leido:
+                    self.arribos.append(leido)
+                if self.on_muestra:
+                    self.on_muestra(registro.vel, registro.rpm)
+            else:
+                perdidos = encoder.confirmar(registro.seq)
+                if perdidos:
+                    self._reportar_error("Comandos perdidos", perdidos)
+        encoder.binario = parser.binario
+
+    async def _escribir(self, ser, encoder):
+        loop = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self._cola.get()]
+            # Juntar lo que ya esté en cola en un solo write()
+            while not self._cola.empty():
+                pendientes.append(self._cola.get_nowait())
+            marcas = [p[1] for p in pendientes if p.__class__ is tuple]
+            if marcas:
+                pendientes = [p[0] if p.__class__ is tuple else p for p in pendientes]
+            try:
+                data = encoder.codificar_lote(pendientes)
+                if not data:
+                    continue
+                try:
+                    await loop.run_in_executor(self._executor, ser.write, data)
+                except (serial.SerialException, OSError) as e:
+                    raise LinkLost(f"error de escritura ({e})")
+            finally:
+                # Escritos o perdidos con el enlace: _detener() no debe esperarlos
+                for _ in pendientes:
+                    self._cola.task_done()
+            if marcas and self.latency:
+                ahora = time.monotonic_ns()
+                for t0 in marcas:
+                    self.latency.record(ETAPA_TECLA_SERIAL, ahora - t0)
+
+    async def _vigilar(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 4)
+            silencio = time.monotonic() - self._ultimo_dato
+            if silencio > self.heartbeat_timeout:
+                raise LinkLost(f"sin datos por {silencio:.1f} s")
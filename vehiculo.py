@@ -0,0 +1,93 @@
+# --- Modelo del carrito: límites por engranaje y simulación sin interfaz ---
+
+# --- Diccionario de límites por engranaje ---
+gearMapping = {
+    "N": {"maxSpeed": 0,   "maxRPM": 0},
+    "R": {"maxSpeed": 40,  "maxRPM": 2000},
+    "1": {"maxSpeed": 100,  "maxRPM": 2500},
+    "2": {"maxSpeed": 125,  "maxRPM": 3000},
+    "3": {"maxSpeed": 200,  "maxRPM": 3500},
+    "4": {"maxSpeed": 225,  "maxRPM": 4000},
+    "5": {"maxSpeed": 300, "maxRPM": 4500},
+    "6": {"maxSpeed": 325, "maxRPM": 5000},
+    "7": {"maxSpeed": 400, "maxRPM": 6000}
+}
+
+GEARS = tuple(gearMapping)  # Orden: N, R, 1..7
+
+ACC_STEP = 10    # Incremento en velocidad por pulsación
+DT = 0.1         # Paso fijo de simulación (s)
+DRAG = 20.0      # Desaceleración por inercia (velocidad/s), -2 por paso
+
+# Acciones para el modo por lotes; ACCION_ENGRANAJE + i elige GEARS[i]
+ACCION_NINGUNA = 0
+ACCION_ACELERAR = 1
+ACCION_RETROCEDER = 2
+ACCION_FRENAR = 3
+ACCION_ENGRANAJE = 4
+
+def rpm_para(speed, gear):
+    """RPM del motor a 'speed' en 'gear': proporcional dentro del rango del engranaje."""
+    limites = gearMapping[gear]
+    if not limites["maxSpeed"]:
+        return 0
+    return round(min(speed, limites["maxSpeed"]) * limites["maxRPM"] / limites["maxSpeed"])
+
+class VehicleSim:
+    """
+    Carrito simulado con paso fijo, sin dependencias de Qt. Las acciones
+    (acelerar, retroceder, frenar, elegir engranaje) son instantáneas como
+    las pulsaciones de tecla; step() aplica la inercia de un paso DT y
+    advance() corre tantos pasos fijos como quepan en el tiempo transcurrido.
+    Las RPM siempre se derivan de la velocidad y el engranaje actual.
+    """
+    def __init__(self, gear="1", speed=0):
+        self.gear = gear
+        self.speed = 0
+        self._acumulado = 0.0
+        self._setSpeed(speed)
+
+    @property
+    def rpm(self):
+        return rpm_para(self.speed, self.gear)
+
+    @property
+    def limits(self):
+        return gearMapping[self.gear]
+
+    def _setSpeed(self, speed):
+        self.speed = max(0, min(speed, self.limits["maxSpeed"]))
+
+    def accelerate(self):
+        self._setSpeed(self.speed + ACC_STEP)
+
+    def throttle(self, fraccion):
+        """Acelerador proporcional: fraccion en [-1, 1] de un paso ACC_STEP."""
+        self._setSpeed(self.speed + ACC_STEP * fraccion)
+
+    def reverse(self):
+        self._setSpeed(self.speed - ACC_STEP)
+
+    def brake(self):
+        self.speed = 0
+        self.gear = "N"
+
+    def selectGear(self, gear):
+        # Igual que el tablero: al elegir un engranaje se va a su velocidad máxima
+        self.gear = gear
+        self.speed = gearMapping[gear]["maxSpeed"]
+
+    def step(self):
+        if self.speed > 0:
+            self.speed = max(0, self.speed - DRAG * DT)
+            if self.speed == 0:
+                self.gear = "N"
+
+    def advance(self, elapsed):
+        """Avanza 'elapsed' segundos en pasos fijos; devuelve cuántos pasos dio."""
+        self._acumulado += elapsed
+        pasos = int(self._acumulado / DT)
+        self._acumulado -= pasos * DT
+        for _ in range(pasos):
+            self.step()
+        return pasos
@@ -0,0 +1,60 @@
+import numpy as np
+
+from vehiculo import (ACC_STEP, ACCION_ACELERAR, ACCION_ENGRANAJE, ACCION_FRENAR,
+                      ACCION_RETROCEDER, DRAG, DT, GEARS, gearMapping)
+
+# --- Simulación por lotes: muchos carritos vectorizados con NumPy ---
+#
+# Separada de vehiculo.py para que VehicleSim, rpm_para y el controlador sin
+# interfaz (servicio.py) sigan usando solo la biblioteca estándar.
+
+class FleetSim:
+    """
+    Versión por lotes de VehicleSim: n carritos en arrays NumPy, avanzados
+    todos juntos con operaciones vectorizadas. Sirve para probar lógica de
+    control con miles de autos a muchas veces tiempo real.
+    """
+    _MAX_SPEED = np.array([gearMapping[g]["maxSpeed"] for g in GEARS], dtype=np.float64)
+    _MAX_RPM = np.array([gearMapping[g]["maxRPM"] for g in GEARS], dtype=np.float64)
+    _NEUTRAL = GEARS.index("N")
+
+    def __init__(self, n, gear="1", speed=0):
+        self.n = n
+        self.gear = np.full(n, GEARS.index(gear), dtype=np.int8)
+        self.speed = np.zeros(n, dtype=np.float64)
+        np.clip(np.full(n, speed, dtype=np.float64), 0, self._MAX_SPEED[self.gear], out=self.speed)
+
+    @property
+    def rpm(self):
+        max_speed = self._MAX_SPEED[self.gear]
+        con_rango = max_speed > 0
+        rpm = np.zeros(self.n, dtype=np.float64)
+        np.divide(np.minimum(self.speed, max_speed) * self._MAX_RPM[self.gear], max_speed,
+                  out=rpm, where=con_rango)
+        return np.round(rpm)
+
+    def apply(self, actions):
+        """Aplica un array de acciones (una por carrito, ver ACCION_*)."""
+        actions = np.asarray(actions)
+        max_speed = self._MAX_SPEED[self.gear]
+        acelerar = actions == ACCION_ACELERAR
+        retroceder = actions == ACCION_RETROCEDER
+        self.speed[acelerar] = np.minimum(self.speed[acelerar] + ACC_STEP, max_speed[acelerar])
+        self.speed[retroceder] = np.maximum(self.speed[retroceder] - ACC_STEP, 0)
+
+        frenar = actions == ACCION_FRENAR
+        self.speed[frenar] = 0
+        self.gear[frenar] = self._NEUTRAL
+
+        cambio = actions >= ACCION_ENGRANAJE
+        if cambio.any():
+            nuevos = (actions[cambio] - ACCION_ENGRANAJE).astype(np.int8)
+            self.gear[cambio] = nuevos
+            self.speed[cambio] = self._MAX_SPEED[nuevos]
+
+    def step(self, actions=None):
+        if actions is not None:
+            self.apply(actions)
+        moviendo = self.speed > 0
+        np.maximum(self.speed - DRAG * DT, 0, out=self.speed)
+        self.gear[moviendo & (self.speed == 0)] = self._NEUTRAL
@@ -0,0 +1,114 @@
+import json
+import math
+
+from vehiculo import GEARS, gearMapping
+
+# --- Computadora de viaje: estadísticas incrementales de la telemetría ---
+#
+# Cada muestra se procesa en O(1) y la memoria no crece con la sesión:
+# distancia integrada por trapecios, tiempo por engranaje, velocidad máxima,
+# media y desvío con el algoritmo de Welford, histograma de RPM con bins
+# fijos y conteo de las lecturas recortadas por el límite del engranaje.
+
+# La velocidad del tablero se toma en km/h
+SEGUNDOS_POR_HORA = 3600.0
+# Un hueco mayor (enlace caído, tablero en reposo) no se integra como si
+# el carrito hubiera seguido a la misma velocidad todo ese tiempo
+MAX_DT = 1.0
+# Bins de RPM: 0 a la máxima de la tabla de engranajes, más uno de desborde
+RPM_BIN = 250
+RPM_MAX = max(limites["maxRPM"] for limites in gearMapping.values())
+RPM_BINS = RPM_MAX // RPM_BIN + 1
+_BARRAS = " ▁▂▃▄▅▆▇█"
+
+class TripComputer:
+    """
+    registrar(t, vel, rpm, gear, recortada) por cada lectura ya limitada;
+    't' en segundos de time.monotonic(). El tiempo entre dos muestras se
+    atribuye al engranaje de la primera. resumen() y export() entregan el
+    estado acumulado; text() es la versión corta para el panel del tablero.
+    """
+    def __init__(self):
+        self.muestras = 0
+        self.distancia_km = 0.0
+        self.tiempo = 0.0
+        self.tiempo_por_marcha = dict.fromkeys(GEARS, 0.0)
+        self.vel_max = 0
+        self._media = 0.0
+        self._m2 = 0.0
+        self.rpm_max = 0
+        self.rpm_hist = [0] * RPM_BINS
+        self.recortes = 0
+        self._t = None
+        self._vel = 0
+        self._gear = None
+
+    def registrar(self, t, vel, rpm, gear, recortada=False):
+        if self._t is not None:
+            dt = t - self._t
+            if dt > 0:
+                self.tiempo += dt
+                if self._gear in self.tiempo_por_marcha:
+                    self.tiempo_por_marcha[self._gear] += dt
+                if dt <= MAX_DT:
+                    self.distancia_km += (self._vel + vel) * 0.5 * dt / SEGUNDOS_POR_HORA
+                else:
+                    self.distancia_km += self._vel * MAX_DT / SEGUNDOS_POR_HORA
+        self._t = t
+        self._vel = vel
+        self._gear = gear
+
+        # Welford: media y varianza sin guardar las muestras
+        self.muestras += 1
+        delta = vel - self._media
+        self._media += delta / self.muestras
+        self._m2 += delta * (vel - self._media)
+        if vel > self.vel_max:
+            self.vel_max = vel
+        if rpm > self.rpm_max:
+            self.rpm_max = rpm
+        self.rpm_hist[min(int(rpm) // RPM_BIN, RPM_BINS - 1) if rpm > 0 else 0] += 1
+        if recortada:
+            self.recortes += 1
+
+    @property
+    def vel_media(self):
+        return self._media
+
+    @property
+    def vel_desvio(self):
+        return math.sqrt(self._m2 / (self.muestras - 1)) if self.muestras > 1 else 0.0
+
+    def resumen(self):
+        return {
+            "muestras": self.muestras,
+            "duracion_s": self.tiempo,
+            "distancia_km": self.distancia_km,
+            "vel_max": self.vel_max,
+            "vel_media": self.vel_media,
+            "vel_desvio": self.vel_desvio,
+            # Media ponderada por tiempo (no depende de la tasa de muestras)
+            "vel_media_tiempo": self.distancia_km * SEGUNDOS_POR_HORA / self.tiempo if self.tiempo else 0.0,
+            "tiempo_por_marcha_s": dict(self.tiempo_por_marcha),
+            "rpm_max": self.rpm_max,
+            "rpm_histograma": {"bin": RPM_BIN, "cuentas": list(self.rpm_hist)},
+            "recortes_limite": self.recortes,
+            "recortes_fraccion": self.recortes / self.muestras if self.muestras else 0.0,
+        }
+
+    def text(self):
+        if not self.muestras:
+            return "Viaje: sin muestras"
+        marchas = "  ".join(f"{gear} {segundos:.0f}s" for gear, segundos in self.tiempo_por_marcha.items()
+                            if segundos >= 0.5)
+        pico = max(self.rpm_hist)
+        barras = "".join(_BARRAS[round(cuenta * (len(_BARRAS) - 1) / pico)] for cuenta in self.rpm_hist)
+        return (f"Distancia {self.distancia_km:.3f} km   Vel. máx {self.vel_max:.0f}   "
+                f"media {self.vel_media:.0f} ± {self.vel_desvio:.0f}\n"
+                f"Tiempo por marcha: {marchas or '-'}\n"
+                f"RPM 0-{RPM_MAX} |{barras}|\n"
+                f"Recortes por límite: {self.recortes} ({self.recortes / self.muestras:.1%})")
+
+    def export(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.resumen(), f, indent=4, ensure_ascii=False)